@@ -0,0 +1,12 @@
+"""
+Alerts package exports.
+"""
+from .outbox import outbox_values
+from .rules import RULE_KINDS, RoundResult, evaluate_alert_rules
+
+__all__ = [
+    "outbox_values",
+    "RULE_KINDS",
+    "RoundResult",
+    "evaluate_alert_rules",
+]
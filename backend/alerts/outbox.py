@@ -0,0 +1,44 @@
+"""
+Outbox row construction shared by check_price and the bulk rule evaluator.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from config import DIGEST_WINDOW_MINUTES
+from utils import build_alert_message
+
+
+def outbox_values(
+    *,
+    user_id: int,
+    recipient: str,
+    alert_delivery: str,
+    tracker_id: int,
+    product_title: str,
+    product_url: str,
+    old_price: Optional[float],
+    new_price: float,
+    reason: str,
+    now: datetime,
+) -> Dict[str, Any]:
+    """
+    Column values for one NotificationOutbox row.
+    Digest users' alerts become due after DIGEST_WINDOW_MINUTES instead of immediately.
+    """
+    subject, body = build_alert_message(
+        product_title=product_title,
+        old_price=old_price,
+        new_price=new_price,
+        url=product_url,
+        reason=reason,
+    )
+    digest = alert_delivery == "digest"
+    return {
+        "user_id": user_id,
+        "tracker_id": tracker_id,
+        "recipient": recipient,
+        "subject": subject,
+        "body": body,
+        "digest": digest,
+        "next_attempt_at": now + timedelta(minutes=DIGEST_WINDOW_MINUTES) if digest else now,
+    }
@@ -0,0 +1,276 @@
+"""
+Set-based evaluation of alert rules.
+
+Every rule kind is evaluated with one SQL statement covering all active rules
+of that kind whose tracker has fresh prices; fire / re-arm decisions are then
+taken with NumPy over the result columns, and state changes and outbox rows are
+written back in bulk. The number of queries per round depends on the number of
+rule kinds, not on the number of rules or trackers.
+
+Kinds:
+- percent_drop: price at least `threshold_pct` below the highest price of the
+  last `window_days`; re-arms once the drop is back under
+  threshold_pct - ALERT_REARM_PERCENT (but never under half the threshold, so
+  small thresholds can re-arm too)
+- all_time_low: a price seen since the last evaluation is below every earlier
+  price (by more than `threshold_pct`, if set)
+- back_in_stock: checks found a price again after they had stopped finding one
+
+The built-in 24 hour drop alert (PRICE_DROP_ALERT_THRESHOLD, state in
+trackers.drop_alert_armed) is evaluated the same way over recently checked trackers.
+"""
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from sqlalchemy import Interval, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from config import ALERT_REARM_PERCENT, ALERT_RULES_INTERVAL_MINUTES, PRICE_DROP_ALERT_THRESHOLD
+from models import AlertRule, NotificationOutbox, PriceHistory, Tracker, User
+from utils import calculate_price_change_percentage
+from .outbox import outbox_values
+
+RULE_KINDS = ("percent_drop", "all_time_low", "back_in_stock")
+
+# Columns every evaluation needs to address an alert
+TARGET_COLUMNS = (
+    User.id.label("user_id"),
+    User.email.label("recipient"),
+    User.alert_delivery,
+    Tracker.id.label("tracker_id"),
+    Tracker.product_title,
+    Tracker.product_url,
+    Tracker.last_price,
+    Tracker.last_checked_at,
+)
+
+
+@dataclass
+class RoundResult:
+    """Everything one evaluation round decided, written back by apply()."""
+    now: datetime
+    alerts: List[Dict[str, Any]] = field(default_factory=list)
+    rule_updates: List[Dict[str, Any]] = field(default_factory=list)
+    tracker_updates: List[Dict[str, Any]] = field(default_factory=list)
+    stats: Counter = field(default_factory=Counter)
+
+    def alert(self, row, old_price, new_price, reason: str):
+        self.alerts.append(outbox_values(
+            user_id=row.user_id,
+            recipient=row.recipient,
+            alert_delivery=row.alert_delivery,
+            tracker_id=row.tracker_id,
+            product_title=row.product_title,
+            product_url=row.product_url,
+            old_price=old_price,
+            new_price=new_price,
+            reason=reason,
+            now=self.now,
+        ))
+
+    @property
+    def immediate(self) -> int:
+        return sum(not values["digest"] for values in self.alerts)
+
+    def apply(self, db: Session):
+        """Write outbox rows and state changes (caller commits)."""
+        if self.alerts:
+            db.execute(insert(NotificationOutbox).values(self.alerts))
+        if self.rule_updates:
+            db.execute(update(AlertRule), self.rule_updates)
+        if self.tracker_updates:
+            db.execute(update(Tracker), self.tracker_updates)
+
+
+def _floats(values) -> np.ndarray:
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+
+def _step(armed: np.ndarray, triggered: np.ndarray, cleared: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized armed -> fired -> re-armed transition. Returns (fire, rearm) masks."""
+    return armed & triggered, ~armed & cleared
+
+
+def _rearm_level(threshold):
+    """Drop (in percent) a fired alert must recover to before it can fire again."""
+    return np.maximum(threshold - ALERT_REARM_PERCENT, threshold / 2)
+
+
+def _drop_step(armed: np.ndarray, change: np.ndarray, threshold) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Transition for drop alerts given the percent change from the reference price.
+    Returns (fire, rearm, suppressed) masks; suppressed means triggered while disarmed.
+    """
+    triggered = change <= -threshold
+    fire, rearm = _step(armed, triggered, change > -_rearm_level(threshold))
+    return fire, rearm, ~armed & triggered
+
+
+def _rule_query(kind: str, *columns):
+    """Active rules of a kind joined to their tracker and owner, limited to fresh prices."""
+    watermark = func.coalesce(AlertRule.evaluated_at, AlertRule.created_at)
+    return (
+        select(
+            AlertRule.id.label("rule_id"),
+            AlertRule.armed,
+            AlertRule.threshold_pct,
+            AlertRule.window_days,
+            AlertRule.last_fired_at,
+            *TARGET_COLUMNS,
+            *columns,
+        )
+        .join(Tracker, Tracker.id == AlertRule.tracker_id)
+        .join(User, User.id == Tracker.user_id)
+        .where(
+            AlertRule.kind == kind,
+            AlertRule.active.is_(True),
+            Tracker.active.is_(True),
+            Tracker.deleted_at.is_(None),
+            User.deleted_at.is_(None),
+            Tracker.last_price.isnot(None),
+            Tracker.last_checked_at > watermark,
+        )
+    )
+
+
+def _record_rules(result: RoundResult, rows, fire: np.ndarray, armed: np.ndarray):
+    """Queue rule state updates; evaluated_at advances to the price each rule has now seen."""
+    for row, fired, now_armed in zip(rows, fire, armed):
+        result.rule_updates.append({
+            "id": row.rule_id,
+            "armed": bool(now_armed),
+            "last_fired_at": result.now if fired else row.last_fired_at,
+            "evaluated_at": row.last_checked_at,
+        })
+
+
+def _evaluate_percent_drop(db: Session, result: RoundResult):
+    since = result.now - func.make_interval(0, 0, 0, AlertRule.window_days, type_=Interval)
+    peak = (
+        select(func.max(PriceHistory.price))
+        .where(PriceHistory.tracker_id == Tracker.id, PriceHistory.checked_at >= since)
+        .scalar_subquery()
+    )
+    rows = db.execute(_rule_query("percent_drop", peak.label("reference"))).all()
+    if not rows:
+        return
+
+    armed = np.array([row.armed for row in rows], dtype=bool)
+    threshold = _floats(row.threshold_pct for row in rows)
+    reference = _floats(row.reference for row in rows)
+    change = (_floats(row.last_price for row in rows) - reference) / reference * 100
+    fire, rearm, suppressed = _drop_step(armed, change, threshold)
+
+    for i in np.flatnonzero(fire):
+        row = rows[i]
+        result.alert(
+            row, row.reference, row.last_price,
+            f"Price dropped {abs(round(change[i], 2))}% from its {row.window_days}-day high",
+        )
+    result.stats["percent_drop.sent"] += int(fire.sum())
+    # _rule_query only returns prices newer than the rule's evaluated_at, so each
+    # checked price is counted once however many rounds the rule stays disarmed
+    result.stats["percent_drop.suppressed"] += int(suppressed.sum())
+    _record_rules(result, rows, fire, (armed & ~fire) | rearm)
+
+
+def _evaluate_all_time_low(db: Session, result: RoundResult):
+    watermark = func.coalesce(AlertRule.evaluated_at, AlertRule.created_at)
+    recent_low = (
+        select(func.min(PriceHistory.price))
+        .where(PriceHistory.tracker_id == Tracker.id, PriceHistory.checked_at > watermark)
+        .scalar_subquery()
+    )
+    prior_low = (
+        select(func.min(PriceHistory.price))
+        .where(PriceHistory.tracker_id == Tracker.id, PriceHistory.checked_at <= watermark)
+        .scalar_subquery()
+    )
+    rows = db.execute(
+        _rule_query("all_time_low", recent_low.label("recent_low"), prior_low.label("prior_low"))
+    ).all()
+    if not rows:
+        return
+
+    margin = np.nan_to_num(_floats(row.threshold_pct for row in rows)) / 100
+    fire = _floats(row.recent_low for row in rows) < _floats(row.prior_low for row in rows) * (1 - margin)
+
+    for i in np.flatnonzero(fire):
+        row = rows[i]
+        result.alert(row, row.prior_low, row.recent_low, "New all-time low")
+    result.stats["all_time_low.sent"] += int(fire.sum())
+    _record_rules(result, rows, fire, np.ones(len(rows), dtype=bool))
+
+
+def _evaluate_back_in_stock(db: Session, result: RoundResult):
+    watermark = func.coalesce(AlertRule.evaluated_at, AlertRule.created_at)
+    rows = db.execute(
+        _rule_query("back_in_stock", (Tracker.back_in_stock_at > watermark).label("restocked"))
+    ).all()
+    if not rows:
+        return
+
+    fire = np.array([bool(row.restocked) for row in rows], dtype=bool)
+    for i in np.flatnonzero(fire):
+        result.alert(rows[i], None, rows[i].last_price, "Back in stock")
+    result.stats["back_in_stock.sent"] += int(fire.sum())
+    _record_rules(result, rows, fire, np.ones(len(rows), dtype=bool))
+
+
+def _evaluate_builtin_drop(db: Session, result: RoundResult):
+    """The built-in alert: price at least PRICE_DROP_ALERT_THRESHOLD below the last price from a day ago."""
+    yesterday = result.now - timedelta(days=1)
+    reference = (
+        select(PriceHistory.price)
+        .where(PriceHistory.tracker_id == Tracker.id, PriceHistory.checked_at <= yesterday)
+        .order_by(PriceHistory.checked_at.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    # Overlapping windows are harmless: rounds run one at a time (tasks.alerts),
+    # so the armed flag written by the previous round stops a second alert
+    recent = result.now - timedelta(minutes=2 * ALERT_RULES_INTERVAL_MINUTES)
+    # Only prices checked since the previous round count as suppressed, otherwise
+    # the overlap would count every disarmed tracker twice
+    previous_round = result.now - timedelta(minutes=ALERT_RULES_INTERVAL_MINUTES)
+    rows = db.execute(
+        select(Tracker.drop_alert_armed.label("armed"), *TARGET_COLUMNS, reference.label("reference"))
+        .join(User, User.id == Tracker.user_id)
+        .where(
+            Tracker.active.is_(True),
+            Tracker.deleted_at.is_(None),
+            User.deleted_at.is_(None),
+            Tracker.last_price.isnot(None),
+            Tracker.last_checked_at >= recent,
+        )
+    ).all()
+    if not rows:
+        return
+
+    armed = np.array([row.armed for row in rows], dtype=bool)
+    reference = _floats(row.reference for row in rows)
+    change = (_floats(row.last_price for row in rows) - reference) / reference * 100
+    fire, rearm, suppressed = _drop_step(armed, change, PRICE_DROP_ALERT_THRESHOLD)
+
+    for i in np.flatnonzero(fire):
+        row = rows[i]
+        drop_pct = calculate_price_change_percentage(row.reference, row.last_price)
+        result.alert(row, row.reference, row.last_price, f"Price dropped {abs(drop_pct)}% since yesterday")
+    result.stats["price_drop.sent"] += int(fire.sum())
+    fresh = np.array([row.last_checked_at > previous_round for row in rows], dtype=bool)
+    result.stats["price_drop.suppressed"] += int((suppressed & fresh).sum())
+    for i in np.flatnonzero(fire | rearm):
+        result.tracker_updates.append({"id": rows[i].tracker_id, "drop_alert_armed": bool(rearm[i])})
+
+
+def evaluate_alert_rules(db: Session, now: datetime) -> RoundResult:
+    """Evaluate every rule kind and the built-in drop alert. Call result.apply(db) to persist."""
+    result = RoundResult(now=now)
+    _evaluate_builtin_drop(db, result)
+    _evaluate_percent_drop(db, result)
+    _evaluate_all_time_low(db, result)
+    _evaluate_back_in_stock(db, result)
+    return result
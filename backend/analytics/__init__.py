@@ -0,0 +1,18 @@
+"""
+Analytics package exports.
+"""
+from .price_stats import (
+    compute_price_stats,
+    get_tracker_stats,
+    get_trackers_stats,
+    load_price_series,
+    stats_cache,
+)
+
+__all__ = [
+    "compute_price_stats",
+    "get_tracker_stats",
+    "get_trackers_stats",
+    "load_price_series",
+    "stats_cache",
+]
@@ -0,0 +1,225 @@
+"""
+Vectorized price statistics for trackers.
+
+All-time sample count, low and high come from SQL aggregates. Only the last
+STATS_WINDOW_DAYS of history (anchored at the latest sample) is loaded, as two
+columnar NumPy arrays (epoch seconds and prices, ascending), and the 7 and 30
+day trailing averages, 30 day volatility and the 0-100 "good time to buy"
+score are computed from it in whole-array passes. A cache miss therefore reads
+a bounded number of rows however long the history is.
+
+Windows are anchored at the latest sample rather than wall-clock time, so a
+result only changes when check_price writes a new point. Results are cached
+per (tracker_id, last_checked_at); the write bumps last_checked_at, which makes
+the next lookup miss without any cross-process invalidation.
+"""
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import ANALYTICS_CACHE_SIZE
+from models import PriceHistory, Tracker
+
+DAY_SECONDS = 86400.0
+STATS_WINDOW_DAYS = 30  # longest window any statistic looks at
+EPOCH = datetime(1970, 1, 1)  # checked_at is naive UTC
+
+EMPTY_STATS = {
+    "sample_count": 0,
+    "current_price": None,
+    "all_time_low": None,
+    "all_time_high": None,
+    "moving_avg_7d": None,
+    "moving_avg_30d": None,
+    "volatility_30d": None,
+    "buy_score": None,
+    "computed_through": None,
+}
+
+
+class StatsCache:
+    """Bounded LRU cache of computed stats keyed by tracker and data version."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: "OrderedDict[int, Tuple[Optional[datetime], dict]]" = OrderedDict()
+
+    def get(self, tracker_id: int, version: Optional[datetime]) -> Optional[dict]:
+        entry = self._data.get(tracker_id)
+        if entry is None or entry[0] != version:
+            return None
+        self._data.move_to_end(tracker_id)
+        return entry[1]
+
+    def set(self, tracker_id: int, version: Optional[datetime], stats: dict):
+        self._data[tracker_id] = (version, stats)
+        self._data.move_to_end(tracker_id)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def invalidate(self, tracker_id: int):
+        self._data.pop(tracker_id, None)
+
+
+stats_cache = StatsCache(ANALYTICS_CACHE_SIZE)
+
+
+def _trailing_mean(times: np.ndarray, cumsum: np.ndarray, window_seconds: float) -> float:
+    """Mean of samples within `window_seconds` of the last sample, via prefix sums."""
+    start = int(np.searchsorted(times, times[-1] - window_seconds, side="left"))
+    total = cumsum[-1] - (cumsum[start - 1] if start > 0 else 0.0)
+    return float(total / (len(times) - start))
+
+
+def compute_price_stats(
+    times: np.ndarray, prices: np.ndarray, totals: Optional[Tuple[int, float, float]] = None
+) -> dict:
+    """
+    Compute tracker statistics from ascending columnar arrays.
+    
+    Args:
+        times: Sample times as epoch seconds (float64, ascending)
+        prices: Prices (float64), same length as times
+        totals: (sample_count, all_time_low, all_time_high) over the whole history
+            when the arrays only hold its last STATS_WINDOW_DAYS; computed from
+            the arrays when omitted
+        
+    Returns:
+        Dict matching schemas.PriceStatsResponse
+    """
+    if len(prices) == 0:
+        return dict(EMPTY_STATS)
+
+    current = float(prices[-1])
+    if totals is None:
+        n, low, high = len(prices), float(prices.min()), float(prices.max())
+    else:
+        n, low, high = int(totals[0]), float(totals[1]), float(totals[2])
+    cumsum = np.cumsum(prices, dtype=np.float64)
+    ma7 = _trailing_mean(times, cumsum, 7 * DAY_SECONDS)
+    ma30 = _trailing_mean(times, cumsum, 30 * DAY_SECONDS)
+
+    # 30 day window: volatility (std of log returns, in percent) and range position
+    start30 = int(np.searchsorted(times, times[-1] - 30 * DAY_SECONDS, side="left"))
+    window = prices[start30:]
+    volatility = None
+    if len(window) > 1 and window.min() > 0:
+        volatility = float(np.diff(np.log(window)).std() * 100)
+    low30 = float(window.min())
+    high30 = float(window.max())
+
+    # Buy score: cheap relative to the recent range, below the 30d average, near the all-time low
+    range_position = 0.5 if high30 == low30 else (current - low30) / (high30 - low30)
+    below_average = np.clip((ma30 - current) / ma30 / 0.10, -1.0, 1.0) if ma30 > 0 else 0.0
+    near_low = low / current if current > 0 else 0.0
+    score = 100 * (0.5 * (1 - range_position) + 0.3 * (below_average + 1) / 2 + 0.2 * near_low)
+
+    return {
+        "sample_count": n,
+        "current_price": current,
+        "all_time_low": low,
+        "all_time_high": high,
+        "moving_avg_7d": round(ma7, 2),
+        "moving_avg_30d": round(ma30, 2),
+        "volatility_30d": round(volatility, 4) if volatility is not None else None,
+        "buy_score": int(round(float(np.clip(score, 0, 100)))),
+        "computed_through": EPOCH + timedelta(seconds=float(times[-1])),
+    }
+
+
+def _to_arrays(rows) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Convert (tracker_id, checked_at, price) rows to columnar arrays."""
+    count = len(rows)
+    ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=count)
+    times = np.fromiter(((r[1] - EPOCH).total_seconds() for r in rows), dtype=np.float64, count=count)
+    prices = np.fromiter((r[2] for r in rows), dtype=np.float64, count=count)
+    return ids, times, prices
+
+
+async def load_price_series(db: AsyncSession, tracker_id: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Load a tracker's history as ascending (times, prices) arrays."""
+    rows = (await db.execute(
+        select(PriceHistory.tracker_id, PriceHistory.checked_at, PriceHistory.price)
+        .where(PriceHistory.tracker_id == tracker_id)
+        .order_by(PriceHistory.checked_at.asc())
+    )).all()
+    _, times, prices = _to_arrays(rows)
+    return times, prices
+
+
+async def _load_stats(db: AsyncSession, trackers: Dict[int, Tracker]) -> Dict[int, dict]:
+    """
+    Compute and cache stats for `trackers` with two queries: per-tracker
+    aggregates, then the last STATS_WINDOW_DAYS of each history split at
+    tracker_id boundaries.
+    """
+    tracker_ids = list(trackers)
+    totals = {
+        row.tracker_id: (row.count, row.low, row.high)
+        for row in (await db.execute(
+            select(
+                PriceHistory.tracker_id,
+                func.count().label("count"),
+                func.min(PriceHistory.price).label("low"),
+                func.max(PriceHistory.price).label("high"),
+            )
+            .where(PriceHistory.tracker_id.in_(tracker_ids))
+            .group_by(PriceHistory.tracker_id)
+        )).all()
+    }
+
+    latest = (
+        select(PriceHistory.tracker_id, func.max(PriceHistory.checked_at).label("latest"))
+        .where(PriceHistory.tracker_id.in_(tracker_ids))
+        .group_by(PriceHistory.tracker_id)
+        .subquery("latest")
+    )
+    rows = (await db.execute(
+        select(PriceHistory.tracker_id, PriceHistory.checked_at, PriceHistory.price)
+        .join(latest, latest.c.tracker_id == PriceHistory.tracker_id)
+        .where(PriceHistory.checked_at >= latest.c.latest - timedelta(days=STATS_WINDOW_DAYS))
+        .order_by(PriceHistory.tracker_id, PriceHistory.checked_at.asc())
+    )).all()
+
+    results: Dict[int, dict] = {}
+    ids, times, prices = _to_arrays(rows)
+    bounds = np.flatnonzero(np.diff(ids)) + 1
+    for chunk_ids, chunk_times, chunk_prices in zip(
+        np.split(ids, bounds), np.split(times, bounds), np.split(prices, bounds)
+    ):
+        if len(chunk_ids):
+            tracker_id = int(chunk_ids[0])
+            results[tracker_id] = compute_price_stats(chunk_times, chunk_prices, totals[tracker_id])
+    for tracker_id, tracker in trackers.items():
+        stats = results.setdefault(tracker_id, dict(EMPTY_STATS))
+        stats_cache.set(tracker_id, tracker.last_checked_at, stats)
+    return results
+
+
+async def get_tracker_stats(db: AsyncSession, tracker: Tracker) -> dict:
+    """Return cached stats for a tracker, computing them on a miss."""
+    stats = stats_cache.get(tracker.id, tracker.last_checked_at)
+    if stats is None:
+        stats = (await _load_stats(db, {tracker.id: tracker}))[tracker.id]
+    return stats
+
+
+async def get_trackers_stats(db: AsyncSession, trackers: Iterable[Tracker]) -> Dict[int, dict]:
+    """Return stats for many trackers; cache misses are loaded together (see _load_stats)."""
+    trackers = list(trackers)
+    results: Dict[int, dict] = {}
+    missing = {}
+    for tracker in trackers:
+        stats = stats_cache.get(tracker.id, tracker.last_checked_at)
+        if stats is None:
+            missing[tracker.id] = tracker
+        else:
+            results[tracker.id] = stats
+
+    if missing:
+        results.update(await _load_stats(db, missing))
+    return {tracker.id: results[tracker.id] for tracker in trackers}
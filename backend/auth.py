@@ -1,52 +1,69 @@
 """
 Authentication utilities for SaleScout.
 Handles JWT token creation/validation and password hashing.
+
+Token -> user identity resolution is cached (bounded in-process TTL cache,
+optionally shared through Redis), so routes that depend on
+get_current_identity do not touch the database to authenticate.
 """
+import hashlib
+import json
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from fastapi.security.http import HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
-from database import get_db
+from config import (
+    SECRET_KEY,
+    ALGORITHM,
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    AUTH_CACHE_TTL_SECONDS,
+    AUTH_CACHE_MAX_SIZE,
+    AUTH_CACHE_REDIS_URL,
+)
+from database import get_async_db, get_async_read_db
 from models import User
-
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from passwords import (
+    PasswordHashTimeout,
+    hasher_pool,
+    hash_password,  # noqa: F401 - re-exported for scripts and benchmarks
+    verify_password,  # noqa: F401
+)
+from profiling import span
+from schemas import UserResponse
+from utils import TTLCache, get_redis
 
 # HTTP Bearer token security
 security = HTTPBearer()
 
+# token hash -> (UserResponse, token exp as epoch seconds)
+auth_cache = TTLCache(max_size=AUTH_CACHE_MAX_SIZE, ttl=AUTH_CACHE_TTL_SECONDS)
 
-def hash_password(password: str) -> str:
-    """
-    Hash a plain text password using bcrypt.
-    
-    Args:
-        password: Plain text password
-        
-    Returns:
-        Hashed password string
-    """
-    return pwd_context.hash(password)
+
+def _hashing_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service busy, please retry",
+        headers={"Retry-After": "1"},
+    )
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def hash_password_async(password: str) -> str:
     """
-    Verify a plain text password against a hashed password.
+    Hash a password on the dedicated bcrypt process pool.
     
-    Args:
-        plain_password: Plain text password to verify
-        hashed_password: Hashed password to compare against
-        
-    Returns:
-        True if passwords match, False otherwise
+    Raises:
+        HTTPException: 503 if the hashing queue is saturated or times out
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return await hasher_pool.hash(password)
+    except PasswordHashTimeout:
+        raise _hashing_unavailable()
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -97,24 +114,13 @@ def decode_access_token(token: str) -> dict:
         )
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+async def _resolve_user(token: str, db: AsyncSession) -> User:
     """
-    Dependency to get the current authenticated user from JWT token.
+    Resolve the User referenced by a JWT token using the given session.
     
-    Args:
-        credentials: HTTP Bearer credentials containing the JWT token
-        db: Database session
-        
-    Returns:
-        Current authenticated User object
-        
     Raises:
         HTTPException: If token is invalid or user not found
     """
-    token = credentials.credentials
     payload = decode_access_token(token)
     
     email: str = payload.get("sub")
@@ -125,7 +131,10 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(User).filter(User.email == email).first()
+    result = await db.execute(
+        select(User).where(User.email == email, User.deleted_at.is_(None))
+    )
+    user = result.scalar_one_or_none()
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -136,9 +145,132 @@ def get_current_user(
     return user
 
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """
+    Dependency to get the current authenticated user from JWT token.
+    
+    Args:
+        credentials: HTTP Bearer credentials containing the JWT token
+        db: Database session
+        
+    Returns:
+        Current authenticated User object
+        
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    with span("auth"):
+        return await _resolve_user(credentials.credentials, db)
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+async def _get_cached_identity(key: str) -> Optional[Tuple[UserResponse, int]]:
+    """Look up a token in the local cache, then in Redis when configured."""
+    entry = auth_cache.get(key)
+    if entry is not None or not AUTH_CACHE_REDIS_URL:
+        return entry
+    try:
+        raw = await get_redis(AUTH_CACHE_REDIS_URL).get(f"auth:token:{key}")
+    except Exception as exc:  # noqa: BLE001
+        print(f"Auth cache lookup failed: {exc}")
+        return None
+    if raw is None:
+        return None
+    data = json.loads(raw)
+    entry = (UserResponse.model_validate(data["user"]), data["exp"])
+    auth_cache.set(key, entry, ttl=data["exp"] - time.time())
+    return entry
+
+
+async def _cache_identity(key: str, identity: UserResponse, exp: int):
+    """Store a resolved identity locally and in Redis, never past the token expiry."""
+    ttl = min(AUTH_CACHE_TTL_SECONDS, exp - time.time())
+    if ttl <= 0:
+        return
+    auth_cache.set(key, (identity, exp), ttl=ttl)
+    if not AUTH_CACHE_REDIS_URL:
+        return
+    try:
+        redis = get_redis(AUTH_CACHE_REDIS_URL)
+        payload = json.dumps({"user": identity.model_dump(mode="json"), "exp": exp})
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.set(f"auth:token:{key}", payload, ex=int(ttl) or 1)
+            pipe.sadd(f"auth:user:{identity.id}", key)
+            pipe.expire(f"auth:user:{identity.id}", ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+            await pipe.execute()
+    except Exception as exc:  # noqa: BLE001
+        print(f"Auth cache store failed: {exc}")
+
+
+async def invalidate_user_auth(user_id: int):
+    """
+    Drop cached identities for a user (e.g. after account deletion).
+    
+    Other uvicorn workers may keep a local entry for up to AUTH_CACHE_TTL_SECONDS.
+    """
+    auth_cache.delete_where(lambda entry: entry[0].id == user_id)
+    if not AUTH_CACHE_REDIS_URL:
+        return
+    try:
+        redis = get_redis(AUTH_CACHE_REDIS_URL)
+        keys = await redis.smembers(f"auth:user:{user_id}")
+        await redis.delete(f"auth:user:{user_id}", *(f"auth:token:{k}" for k in keys))
+    except Exception as exc:  # noqa: BLE001
+        print(f"Auth cache invalidation failed: {exc}")
+
+
+async def get_current_identity(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_read_db)
+) -> UserResponse:
+    """
+    Dependency returning the authenticated user's identity (id, email, timestamps).
+    
+    Served from the token cache when possible; on a miss the token is decoded and
+    the user is resolved through the read session (replica when available).
+    Use get_current_user instead when the route needs to modify the User row.
+    
+    Args:
+        credentials: HTTP Bearer credentials containing the JWT token
+        db: Read-only database session, only used on a cache miss
+        
+    Returns:
+        UserResponse for the authenticated user
+        
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    with span("auth"):
+        return await resolve_identity(credentials.credentials, db)
+
+
+async def resolve_identity(token: str, db: AsyncSession) -> UserResponse:
+    """
+    Resolve a raw JWT to a cached UserResponse, querying `db` only on a cache miss.
+    Used directly by routes that cannot take the Bearer dependency (e.g. SSE).
+    """
+    key = _token_key(token)
+    entry = await _get_cached_identity(key)
+    if entry is not None and entry[1] > time.time():
+        return entry[0]
+
+    exp = decode_access_token(token).get("exp", 0)
+    identity = UserResponse.model_validate(await _resolve_user(token, db))
+    await _cache_identity(key, identity, exp)
+    return identity
+
+
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
     """
     Authenticate a user by email and password.
+    Bcrypt verification runs on the dedicated hashing pool; hashes created with an
+    outdated cost are replaced with a fresh hash on successful login.
     
     Args:
         db: Database session
@@ -148,9 +280,19 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     Returns:
         User object if authentication successful, None otherwise
     """
-    user = db.query(User).filter(User.email == email).first()
+    result = await db.execute(
+        select(User).where(User.email == email, User.deleted_at.is_(None))
+    )
+    user = result.scalar_one_or_none()
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    try:
+        valid, new_hash = await hasher_pool.verify_and_update(password, user.password_hash)
+    except PasswordHashTimeout:
+        raise _hashing_unavailable()
+    if not valid:
         return None
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
     return user
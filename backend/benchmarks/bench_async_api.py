@@ -0,0 +1,156 @@
+"""
+Benchmark: sync vs async request handling for tracker reads.
+
+Serves the same "list trackers for the authenticated user" workload twice on
+one uvicorn instance:
+- /sync/trackers   def handler + SessionLocal (blocking engine, threadpool)
+- /async/trackers  async handler + AsyncSessionLocal (asyncpg, event loop)
+
+Both endpoints resolve the user from the JWT with a DB lookup, just like
+auth.get_current_user, and then load the user's trackers.
+
+Usage (from backend/, with Postgres reachable via DATABASE_URL):
+    python -m benchmarks.bench_async_api --concurrency 64 --duration 10
+"""
+import argparse
+import asyncio
+import threading
+import time
+from typing import List
+
+import httpx
+import uvicorn
+from fastapi import Depends, FastAPI
+from fastapi.security import HTTPBearer
+from fastapi.security.http import HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from auth import create_access_token, decode_access_token, hash_password
+from database import SessionLocal, get_async_db, get_db, init_db
+from models import Tracker, User
+from schemas import TrackerResponse
+
+BENCH_EMAIL = "bench-async-api@salescout.local"
+
+security = HTTPBearer()
+app = FastAPI()
+
+
+def _sync_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+) -> User:
+    email = decode_access_token(credentials.credentials)["sub"]
+    return db.query(User).filter(User.email == email).first()
+
+
+async def _async_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    email = decode_access_token(credentials.credentials)["sub"]
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalar_one()
+
+
+@app.get("/sync/trackers", response_model=List[TrackerResponse])
+def sync_trackers(db: Session = Depends(get_db), user: User = Depends(_sync_user)):
+    trackers = db.query(Tracker).filter(Tracker.user_id == user.id).all()
+    return [TrackerResponse.model_validate(t) for t in trackers]
+
+
+@app.get("/async/trackers", response_model=List[TrackerResponse])
+async def async_trackers(db: AsyncSession = Depends(get_async_db), user: User = Depends(_async_user)):
+    result = await db.execute(select(Tracker).where(Tracker.user_id == user.id))
+    return [TrackerResponse.model_validate(t) for t in result.scalars().all()]
+
+
+def seed(trackers: int) -> str:
+    """Create (or reuse) the benchmark user with N trackers and return a token."""
+    init_db()
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == BENCH_EMAIL).first()
+        if not user:
+            user = User(email=BENCH_EMAIL, password_hash=hash_password("benchmark-pass"))
+            db.add(user)
+            db.flush()
+        existing = db.query(Tracker).filter(Tracker.user_id == user.id).count()
+        for i in range(existing, trackers):
+            db.add(Tracker(
+                user_id=user.id,
+                product_url=f"https://www.amazon.in/dp/BENCH{i:05d}",
+                product_title=f"Benchmark product {i}",
+                target_price=999.0,
+                last_price=1099.0,
+            ))
+        db.commit()
+        return create_access_token({"sub": user.email})
+    finally:
+        db.close()
+
+
+async def hammer(base_url: str, path: str, token: str, concurrency: int, duration: float) -> dict:
+    """Issue requests from `concurrency` workers for `duration` seconds."""
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def worker():
+            nonlocal errors
+            headers = {"Authorization": f"Bearer {token}"}
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                resp = await client.get(path, headers=headers)
+                if resp.status_code != 200:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    latencies.sort()
+    count = len(latencies)
+    return {
+        "requests": count,
+        "errors": errors,
+        "rps": count / duration,
+        "p50_ms": latencies[int(count * 0.50)] * 1000 if count else 0.0,
+        "p99_ms": latencies[min(count - 1, int(count * 0.99))] * 1000 if count else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--trackers", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    token = seed(args.trackers)
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        for label, path in (("sync", "/sync/trackers"), ("async", "/async/trackers")):
+            stats = asyncio.run(hammer(base_url, path, token, args.concurrency, args.duration))
+            print(
+                f"{label:>5}: {stats['rps']:8.1f} req/s  "
+                f"p50 {stats['p50_ms']:6.1f} ms  p99 {stats['p99_ms']:6.1f} ms  "
+                f"({stats['requests']} requests, {stats['errors']} errors)"
+            )
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
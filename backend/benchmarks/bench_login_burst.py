@@ -0,0 +1,121 @@
+"""
+Benchmark: login burst latency and its effect on other routes.
+
+Against a running API, fires a burst of concurrent logins while a second set
+of clients keeps polling a cheap authenticated route. Reports p50/p99 for the
+logins and for the background route, plus the background route's baseline
+latency without the burst.
+
+Compare configurations by restarting the API with different settings, e.g.
+PASSWORD_HASH_WORKERS=0 (threadpool, the previous behaviour) versus
+PASSWORD_HASH_WORKERS=4, or different BCRYPT_ROUNDS.
+
+Usage (from backend/):
+    python -m benchmarks.bench_login_burst --base-url http://localhost:8000 \\
+        --logins 200 --login-concurrency 50 --background-concurrency 10
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+import httpx
+
+BENCH_EMAIL = "bench-login@salescout.local"
+BENCH_PASSWORD = "benchmark-pass"
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))] * 1000
+
+
+async def ensure_user(client: httpx.AsyncClient) -> str:
+    resp = await client.post("/auth/register", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+    if resp.status_code == 400:
+        resp = await client.post("/auth/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+    resp.raise_for_status()
+    return resp.json()["access_token"]
+
+
+async def poll_background(client: httpx.AsyncClient, path: str, token: str, stop: asyncio.Event, out: List[float]):
+    headers = {"Authorization": f"Bearer {token}"}
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get(path, headers=headers)
+        out.append(time.perf_counter() - start)
+
+
+async def login_burst(client: httpx.AsyncClient, total: int, concurrency: int, out: List[float]) -> int:
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+    failures = 0
+
+    async def worker():
+        nonlocal failures
+        while not queue.empty():
+            queue.get_nowait()
+            start = time.perf_counter()
+            resp = await client.post("/auth/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+            out.append(time.perf_counter() - start)
+            if resp.status_code != 200:
+                failures += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return failures
+
+
+async def run(args):
+    limits = httpx.Limits(max_connections=args.login_concurrency + args.background_concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        token = await ensure_user(client)
+
+        async def background_phase(seconds: float) -> List[float]:
+            samples: List[float] = []
+            stop = asyncio.Event()
+            pollers = [
+                asyncio.create_task(poll_background(client, args.background_path, token, stop, samples))
+                for _ in range(args.background_concurrency)
+            ]
+            await asyncio.sleep(seconds)
+            stop.set()
+            await asyncio.gather(*pollers)
+            return samples
+
+        baseline = await background_phase(args.baseline_seconds)
+
+        login_samples: List[float] = []
+        background: List[float] = []
+        stop = asyncio.Event()
+        pollers = [
+            asyncio.create_task(poll_background(client, args.background_path, token, stop, background))
+            for _ in range(args.background_concurrency)
+        ]
+        start = time.perf_counter()
+        failures = await login_burst(client, args.logins, args.login_concurrency, login_samples)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await asyncio.gather(*pollers)
+
+    print(f"logins:          {args.logins} in {elapsed:.2f}s ({args.logins / elapsed:.1f}/s), {failures} failed")
+    print(f"login latency:   p50 {percentile(login_samples, 0.5):7.1f} ms  p99 {percentile(login_samples, 0.99):7.1f} ms")
+    print(f"{args.background_path} baseline: p50 {percentile(baseline, 0.5):7.1f} ms  p99 {percentile(baseline, 0.99):7.1f} ms")
+    print(f"{args.background_path} in burst: p50 {percentile(background, 0.5):7.1f} ms  p99 {percentile(background, 0.99):7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--login-concurrency", type=int, default=50)
+    parser.add_argument("--background-concurrency", type=int, default=10)
+    parser.add_argument("--background-path", default="/trackers")
+    parser.add_argument("--baseline-seconds", type=float, default=5.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""
+Benchmark: offline end-to-end pipeline (scheduler -> check_price -> notifications).
+
+Seeds a benchmark user with N trackers, starts benchmarks.fakeshop (product
+pages with configurable latency / error rate / price changes, reached through
+HTTP_PROXY) and an SMTP sink, then for each worker configuration:
+
+1. starts a Celery worker consuming the default and notifications queues
+2. marks every tracker due now and runs enqueue_due_trackers
+3. waits until every tracker has been checked and the outbox is drained
+
+and reports checks per second, end-to-end latency (due -> checked, from
+trackers.last_check_lag_seconds), check_price run time (from the worker's
+Prometheus histogram), Postgres write rates (pg_stat_database deltas) and
+email delivery.
+
+Requires Postgres (DATABASE_URL) and Redis (CELERY_BROKER_URL). Use a scratch
+database and Redis DB: enqueue_due_trackers schedules every due tracker in the
+database, and any other worker on the broker would take part in the run.
+Failed fetches go through check_price's Celery retry delay, so with a non-zero
+--error-rate raise --timeout or expect incomplete runs.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pipeline --trackers 2000 --latency-ms 200 \\
+        --workers prefork:4,prefork:16,threads:32
+"""
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import numpy as np
+from prometheus_client.parser import text_string_to_metric_families
+from sqlalchemy import delete, func, insert, select, text, update
+
+from database import SessionLocal, init_db
+from models import NotificationOutbox, Tracker, User
+from tasks.check_price import celery_app, enqueue_due_trackers
+from benchmarks.fakeshop import FakeShop, SMTPSink, amazon_url, base_price, flipkart_url
+
+BENCH_EMAIL = "bench-pipeline@salescout.local"
+CHECK_TASK = "tasks.check_price.check_price"
+
+
+def seed(trackers: int, alert_rate: float, amazon_share: float) -> int:
+    """Recreate the benchmark user with N trackers. Returns the user id."""
+    init_db()
+    rng = random.Random(7)
+    db = SessionLocal()
+    try:
+        db.execute(delete(User).where(User.email == BENCH_EMAIL))
+        user_id = db.execute(
+            insert(User).values(email=BENCH_EMAIL, password_hash="!bench").returning(User.id)
+        ).scalar_one()
+        rows = []
+        for i in range(trackers):
+            product_id = f"BENCH{i:07d}"
+            url = amazon_url(product_id) if rng.random() < amazon_share else flipkart_url(product_id)
+            # Alerting trackers have a target above the starting price, so their first check fires
+            factor = 1.05 if rng.random() < alert_rate else 0.5
+            rows.append({
+                "user_id": user_id,
+                "product_url": url,
+                "product_title": product_id,
+                "target_price": round(base_price(product_id) * factor, 2),
+                "polling_interval_minutes": 60,
+                "next_check_at": datetime(2100, 1, 1),
+            })
+        for start in range(0, len(rows), 5000):
+            db.execute(insert(Tracker).values(rows[start:start + 5000]))
+        db.commit()
+        return user_id
+    finally:
+        db.close()
+
+
+def reset_trackers(user_id: int) -> datetime:
+    """Make every benchmark tracker due now and clear the previous run's results."""
+    db = SessionLocal()
+    try:
+        db.execute(delete(NotificationOutbox).where(NotificationOutbox.user_id == user_id))
+        due_at = datetime.utcnow()
+        db.execute(
+            update(Tracker)
+            .where(Tracker.user_id == user_id)
+            .values(
+                next_check_at=due_at,
+                last_checked_at=None,
+                last_price=None,
+                last_check_lag_seconds=None,
+                target_alert_armed=True,
+            )
+        )
+        db.commit()
+        return due_at
+    finally:
+        db.close()
+
+
+def write_counters() -> Tuple[int, int, int]:
+    db = SessionLocal()
+    try:
+        row = db.execute(text(
+            "SELECT xact_commit, tup_inserted, tup_updated FROM pg_stat_database "
+            "WHERE datname = current_database()"
+        )).one()
+        return tuple(row)
+    finally:
+        db.close()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_worker(pool: str, concurrency: int, env: Dict[str, str]) -> Tuple[subprocess.Popen, str]:
+    hostname = f"bench-pipeline-{pool}-{concurrency}@{socket.gethostname()}"
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "celery", "-A", "tasks.check_price", "worker",
+            "--pool", pool, "--concurrency", str(concurrency),
+            "-Q", "celery,notifications", "--hostname", hostname,
+            "--loglevel", "WARNING", "--without-gossip", "--without-mingle",
+        ],
+        env=env,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if celery_app.control.ping(destination=[hostname], timeout=1.0):
+            return proc, hostname
+        if proc.poll() is not None:
+            break
+    proc.kill()
+    raise RuntimeError(f"Celery worker {hostname} did not start")
+
+
+def stop_worker(proc: subprocess.Popen):
+    proc.terminate()
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def histogram_quantiles(metrics_url: str, task: str, quantiles=(0.5, 0.99)) -> List[float]:
+    """Estimate quantiles of the worker's task run time histogram (linear within a bucket)."""
+    body = urllib.request.urlopen(metrics_url, timeout=5).read().decode()
+    buckets = []
+    for family in text_string_to_metric_families(body):
+        if family.name != "salescout_task_duration_seconds":
+            continue
+        for sample in family.samples:
+            labels = sample.labels
+            if sample.name.endswith("_bucket") and labels.get("task") == task and labels.get("state") == "SUCCESS":
+                buckets.append((float(labels["le"]), sample.value))
+    buckets.sort()
+    if not buckets or buckets[-1][1] == 0:
+        return [0.0 for _ in quantiles]
+    total = buckets[-1][1]
+    estimates = []
+    for q in quantiles:
+        rank = q * total
+        lower_bound, lower_count = 0.0, 0.0
+        for bound, count in buckets:
+            if count >= rank:
+                if bound == float("inf"):
+                    estimates.append(lower_bound)
+                else:
+                    share = (rank - lower_count) / (count - lower_count) if count > lower_count else 1.0
+                    estimates.append(lower_bound + (bound - lower_bound) * share)
+                break
+            lower_bound, lower_count = bound, count
+    return estimates
+
+
+def wait_for_run(user_id: int, due_at: datetime, trackers: int, timeout: float) -> Dict:
+    """Poll until every tracker is checked and its alerts are out, or the timeout passes."""
+    deadline = time.monotonic() + timeout
+    db = SessionLocal()
+    try:
+        checked = 0
+        while time.monotonic() < deadline:
+            checked = db.execute(
+                select(func.count()).where(Tracker.user_id == user_id, Tracker.last_checked_at >= due_at)
+            ).scalar()
+            if checked >= trackers:
+                break
+            time.sleep(0.5)
+        checks_done = datetime.utcnow()
+        pending = 0
+        while time.monotonic() < deadline:
+            pending = db.execute(
+                select(func.count()).where(
+                    NotificationOutbox.user_id == user_id, NotificationOutbox.status == "pending"
+                )
+            ).scalar()
+            if pending == 0:
+                break
+            time.sleep(0.5)
+        last_checked, lags = db.execute(
+            select(func.max(Tracker.last_checked_at), func.array_agg(Tracker.last_check_lag_seconds))
+            .where(Tracker.user_id == user_id, Tracker.last_checked_at >= due_at)
+        ).one()
+        sent = db.execute(
+            select(func.count()).where(NotificationOutbox.user_id == user_id, NotificationOutbox.status == "sent")
+        ).scalar()
+        return {
+            "checked": checked,
+            "last_checked_at": last_checked or checks_done,
+            "lags": np.array(lags or [], dtype=float),
+            "pending_alerts": pending,
+            "sent_alerts": sent,
+        }
+    finally:
+        db.close()
+
+
+def run_config(pool: str, concurrency: int, user_id: int, args, shop: FakeShop, sink: SMTPSink) -> Dict:
+    metrics_port = free_port()
+    smtp_host, smtp_port = sink.address
+    env = dict(
+        os.environ,
+        HTTP_PROXY=shop.url,
+        http_proxy=shop.url,
+        NO_PROXY="",
+        no_proxy="",
+        SMTP_HOST=smtp_host,
+        SMTP_PORT=str(smtp_port),
+        SMTP_USE_TLS="False",
+        SMTP_USER="",
+        DB_ROLE="worker",
+        CELERY_METRICS_PORT=str(metrics_port),
+        PROMETHEUS_MULTIPROC_DIR=tempfile.mkdtemp(prefix="bench-pipeline-"),
+    )
+    proc, _ = start_worker(pool, concurrency, env)
+    try:
+        due_at = reset_trackers(user_id)
+        commits_before, inserted_before, updated_before = write_counters()
+        messages_before = sink.messages
+        started = time.perf_counter()
+        enqueue_due_trackers()
+        enqueue_seconds = time.perf_counter() - started
+        result = wait_for_run(user_id, due_at, args.trackers, args.timeout)
+        elapsed = time.perf_counter() - started
+        # pg_stat counters are flushed asynchronously
+        time.sleep(1.0)
+        commits_after, inserted_after, updated_after = write_counters()
+        service_p50, service_p99 = histogram_quantiles(f"http://127.0.0.1:{metrics_port}/metrics", CHECK_TASK)
+    finally:
+        stop_worker(proc)
+
+    check_seconds = max((result["last_checked_at"] - due_at).total_seconds(), 1e-9)
+    lags = result["lags"]
+    return {
+        "config": f"{pool}:{concurrency}",
+        "checked": result["checked"],
+        "checks_per_second": result["checked"] / check_seconds,
+        "enqueue_seconds": enqueue_seconds,
+        "e2e_p50": float(np.percentile(lags, 50)) if lags.size else 0.0,
+        "e2e_p99": float(np.percentile(lags, 99)) if lags.size else 0.0,
+        "service_p50": service_p50,
+        "service_p99": service_p99,
+        "commits_per_second": (commits_after - commits_before) / elapsed,
+        "inserts_per_second": (inserted_after - inserted_before) / elapsed,
+        "updates_per_second": (updated_after - updated_before) / elapsed,
+        "alerts_sent": result["sent_alerts"],
+        "alerts_pending": result["pending_alerts"],
+        "emails_received": sink.messages - messages_before,
+    }
+
+
+def parse_workers(spec: str) -> List[Tuple[str, int]]:
+    configs = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        pool, concurrency = item.split(":")
+        configs.append((pool, int(concurrency)))
+    return configs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trackers", type=int, default=1000)
+    parser.add_argument("--workers", default="prefork:4,prefork:8,threads:16",
+                        help="comma-separated pool:concurrency worker configurations")
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--price-change-rate", type=float, default=0.2)
+    parser.add_argument("--alert-rate", type=float, default=0.05,
+                        help="share of trackers whose target price is hit on the first check")
+    parser.add_argument("--amazon-share", type=float, default=0.6)
+    parser.add_argument("--page-kb", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=600.0, help="per configuration, in seconds")
+    args = parser.parse_args()
+
+    user_id = seed(args.trackers, args.alert_rate, args.amazon_share)
+    results = []
+    with FakeShop(args.latency_ms, args.error_rate, args.price_change_rate, args.page_kb) as shop, SMTPSink() as sink:
+        for pool, concurrency in parse_workers(args.workers):
+            print(f"running {pool}:{concurrency} ...", flush=True)
+            results.append(run_config(pool, concurrency, user_id, args, shop, sink))
+        print(f"fake shop: {shop.requests} requests, {shop.errors} errors; "
+              f"SMTP sink: {sink.messages} messages over {sink.connections} connections")
+
+    print(f"\n{args.trackers} trackers, {args.latency_ms:.0f} ms page latency, error rate {args.error_rate}")
+    print(f"{'config':<14}{'checked':>9}{'checks/s':>10}{'e2e p50':>10}{'e2e p99':>10}"
+          f"{'run p50':>10}{'run p99':>10}{'commit/s':>10}{'ins/s':>9}{'upd/s':>9}{'emails':>8}")
+    for r in results:
+        print(
+            f"{r['config']:<14}{r['checked']:>9}{r['checks_per_second']:>10.1f}"
+            f"{r['e2e_p50']:>9.2f}s{r['e2e_p99']:>9.2f}s{r['service_p50']:>9.2f}s{r['service_p99']:>9.2f}s"
+            f"{r['commits_per_second']:>10.1f}{r['inserts_per_second']:>9.1f}{r['updates_per_second']:>9.1f}"
+            f"{r['emails_received']:>8}"
+        )
+        if r["checked"] < args.trackers or r["alerts_pending"]:
+            print(f"{'':<14}incomplete: {args.trackers - r['checked']} unchecked, "
+                  f"{r['alerts_pending']} alerts pending after {args.timeout:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
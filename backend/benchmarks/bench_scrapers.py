@@ -0,0 +1,129 @@
+"""
+Benchmark and regression check: scraper extraction over recorded pages.
+
+Runs scraper.parse_amazon_page / parse_flipkart_page over every page in
+benchmarks/fixtures/pages (expected values in expected.json) and reports, per
+page, the median HTML parse time and selector extraction time, the peak memory
+allocated while parsing (tracemalloc) and the selector that produced each field.
+
+Exits non-zero, for CI, when:
+- an extracted title, price or image URL differs from expected.json
+- with --baseline, a page's median total time is more than --tolerance
+  slower than the saved baseline
+
+Add a page whenever a selector or layout change is made: save the HTML, add its
+expected values to expected.json and refresh the baseline with --save-baseline.
+
+Usage (from backend/):
+    python -m benchmarks.bench_scrapers --repeat 50
+    python -m benchmarks.bench_scrapers --save-baseline benchmarks/fixtures/scraper_baseline.json
+    python -m benchmarks.bench_scrapers --baseline benchmarks/fixtures/scraper_baseline.json --tolerance 0.5
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+from bs4 import BeautifulSoup
+
+from scraper import parse_amazon_page, parse_flipkart_page
+
+PAGES_DIR = Path(__file__).parent / "fixtures" / "pages"
+FIELDS = ("title", "price", "image_url")
+PARSERS = {"amazon": parse_amazon_page, "flipkart": parse_flipkart_page}
+
+
+def measure_page(html: str, platform: str, repeat: int) -> Dict:
+    parse = PARSERS[platform]
+    parse_times: List[float] = []
+    total_times: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        BeautifulSoup(html, "lxml")
+        parse_times.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        data = parse(html)
+        total_times.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    parse(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    parse_ms = statistics.median(parse_times) * 1000
+    total_ms = statistics.median(total_times) * 1000
+    return {
+        "data": data,
+        "parse_ms": parse_ms,
+        "extract_ms": max(total_ms - parse_ms, 0.0),
+        "total_ms": total_ms,
+        "peak_kb": peak / 1024,
+    }
+
+
+def check_fields(data: Dict, expected: Dict) -> List[str]:
+    errors = []
+    for field in FIELDS:
+        got, want = data.get(field), expected.get(field)
+        if field == "price" and got is not None and want is not None:
+            ok = abs(got - want) < 0.005
+        else:
+            ok = got == want
+        if not ok:
+            errors.append(f"{field}: expected {want!r}, got {got!r}")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--baseline", type=Path, help="JSON from --save-baseline to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="allowed slowdown vs. baseline as a fraction (0.5 = 50%% slower)")
+    parser.add_argument("--save-baseline", type=Path, help="write per-page median times to this file")
+    args = parser.parse_args()
+
+    expected = json.loads((PAGES_DIR / "expected.json").read_text(encoding="utf-8"))
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline else {}
+    failures: List[str] = []
+    timings: Dict[str, float] = {}
+
+    print(f"{'page':<32}{'size':>8}{'parse':>9}{'extract':>9}{'total':>9}{'peak':>10}  selectors")
+    for name, want in expected.items():
+        html = (PAGES_DIR / name).read_text(encoding="utf-8")
+        result = measure_page(html, want["platform"], args.repeat)
+        timings[name] = round(result["total_ms"], 4)
+        selectors = result["data"]["selectors"]
+        print(
+            f"{name:<32}{len(html) / 1024:>6.1f}KB{result['parse_ms']:>7.2f}ms{result['extract_ms']:>7.2f}ms"
+            f"{result['total_ms']:>7.2f}ms{result['peak_kb']:>8.0f}KB  "
+            + ", ".join(f"{field}={selectors.get(field, 'none')}" for field in FIELDS)
+        )
+
+        for error in check_fields(result["data"], want):
+            failures.append(f"{name}: {error}")
+        if name in baseline and result["total_ms"] > baseline[name] * (1 + args.tolerance):
+            failures.append(
+                f"{name}: {result['total_ms']:.2f} ms vs. baseline {baseline[name]:.2f} ms "
+                f"(> {args.tolerance:.0%} slower)"
+            )
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(timings, indent=2) + "\n", encoding="utf-8")
+        print(f"\nbaseline written to {args.save_baseline}")
+
+    if failures:
+        print(f"\n{len(failures)} regression(s):")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print(f"\n{len(expected)} pages OK")
+
+
+if __name__ == "__main__":
+    main()
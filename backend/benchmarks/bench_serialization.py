@@ -0,0 +1,107 @@
+"""
+Benchmark: response serialization for large list/history payloads.
+
+Compares, for N rows:
+- current path: ORM-style objects -> PriceHistoryResponse.model_validate per row
+  -> FastAPI response_model validation + JSON dump via JSONResponse
+- fast path: column tuples -> dicts -> orjson (serialization.dumps)
+
+No database is needed; rows are synthesized in memory.
+
+Usage (from backend/):
+    python -m benchmarks.bench_serialization --rows 10000 --repeat 20
+"""
+import argparse
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from schemas import PriceHistoryResponse, TrackerResponse
+from serialization import dumps
+
+HistoryRow = namedtuple("HistoryRow", ["id", "tracker_id", "price", "checked_at"])
+
+
+def make_rows(count: int):
+    start = datetime(2024, 1, 1)
+    return [
+        HistoryRow(i, 1, 1000.0 + (i % 97) * 1.5, start + timedelta(minutes=5 * i))
+        for i in range(count)
+    ]
+
+
+def make_trackers(count: int):
+    now = datetime(2024, 1, 1)
+    return [
+        SimpleNamespace(
+            id=i, user_id=1, product_url=f"https://www.amazon.in/dp/B{i:09d}",
+            product_title=f"Product {i}", image_url=None, target_price=999.0,
+            polling_interval_minutes=60, last_price=1099.0, last_checked_at=now,
+            active=True, created_at=now, updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def pydantic_path(objects, model, adapter: TypeAdapter) -> bytes:
+    validated = [model.model_validate(o) for o in objects]  # handler
+    value = adapter.validate_python(validated)  # response_model check
+    return JSONResponse(content=adapter.dump_python(value, mode="json")).body
+
+
+def fast_path(rows) -> bytes:
+    return dumps([row._asdict() for row in rows])
+
+
+def fast_path_objects(objects, fields: List[str]) -> bytes:
+    return dumps([{name: getattr(o, name) for name in fields} for o in objects])
+
+
+def timed(repeat: int, fn, *args) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(label: str, rows: int, slow: float, fast: float):
+    print(
+        f"{label:<9} pydantic {slow * 1000:8.2f} ms ({rows / slow:10,.0f} rows/s)   "
+        f"orjson {fast * 1000:7.2f} ms ({rows / fast:11,.0f} rows/s)   {slow / fast:5.1f}x"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    history_adapter = TypeAdapter(List[PriceHistoryResponse])
+    report(
+        "history",
+        args.rows,
+        timed(args.repeat, pydantic_path, rows, PriceHistoryResponse, history_adapter),
+        timed(args.repeat, fast_path, rows),
+    )
+
+    trackers = make_trackers(args.rows)
+    tracker_adapter = TypeAdapter(List[TrackerResponse])
+    report(
+        "trackers",
+        args.rows,
+        timed(args.repeat, pydantic_path, trackers, TrackerResponse, tracker_adapter),
+        timed(args.repeat, fast_path_objects, trackers, list(TrackerResponse.model_fields)),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Offline stand-ins for the outside world, for benchmarks.
+
+FakeShop serves product pages rendered from the layouts in
+benchmarks/fixtures/templates. It runs as an HTTP forward proxy: point
+HTTP_PROXY at it and plain-http Amazon/Flipkart URLs reach it with their real
+hostnames, so the scrapers' platform detection and selectors run unchanged and
+nothing leaves the machine. Latency, error rate and price changes are
+configurable.
+
+SMTPSink accepts and counts messages without delivering them.
+
+Both run in background threads:
+
+    with FakeShop(latency_ms=150, error_rate=0.02) as shop, SMTPSink() as sink:
+        os.environ["HTTP_PROXY"] = shop.url
+        ...
+"""
+import random
+import re
+import socketserver
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+TEMPLATE_DIR = Path(__file__).parent / "fixtures" / "templates"
+
+FILLER = (
+    "Powerful performance with the latest generation processor, all-day battery life, "
+    "a bright high-resolution display and fast charging in the box. "
+)
+
+
+def amazon_url(product_id: str) -> str:
+    # Plain http so requests sends it through HTTP_PROXY instead of tunnelling TLS
+    return f"http://www.amazon.in/dp/{product_id}"
+
+
+def flipkart_url(product_id: str) -> str:
+    return f"http://www.flipkart.com/bench-item/p/itm{product_id.lower()}?pid={product_id}"
+
+
+def base_price(product_id: str) -> int:
+    """Deterministic starting price in whole rupees."""
+    return 499 + zlib.crc32(product_id.encode()) % 50000
+
+
+def _render(template: str, values: Dict[str, str]) -> bytes:
+    return re.sub(r"\{\{(\w+)\}\}", lambda m: values[m.group(1)], template).encode()
+
+
+class FakeShop:
+    """
+    Threaded fake product-page server.
+
+    Args:
+        latency_ms: mean response delay (uniform between 0.5x and 1.5x)
+        error_rate: fraction of requests answered with 503
+        price_change_rate: chance that a product's price moves (by 1-10%, either way) per request
+        page_kb: approximate page size; filler text is added up to it
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        error_rate: float = 0.0,
+        price_change_rate: float = 0.0,
+        page_kb: int = 64,
+        seed: int = 42,
+    ):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.price_change_rate = price_change_rate
+        self.filler = FILLER * max(1, page_kb * 1024 // len(FILLER))
+        self.templates = {
+            platform: (TEMPLATE_DIR / f"{platform}.html").read_text(encoding="utf-8")
+            for platform in ("amazon", "flipkart")
+        }
+        self.prices: Dict[str, int] = {}
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _route(self, url: str) -> Optional[Tuple[str, str]]:
+        parsed = urlparse(url)
+        if "amazon" in parsed.netloc:
+            match = re.search(r"/dp/(\w+)", parsed.path)
+            return ("amazon", match.group(1)) if match else None
+        if "flipkart" in parsed.netloc:
+            pid = parse_qs(parsed.query).get("pid")
+            return ("flipkart", pid[0]) if pid else None
+        return None
+
+    def _next_price(self, product_id: str) -> Tuple[int, bool, float]:
+        """(current price after a possible change, whether to fail, response delay in seconds)."""
+        with self._lock:
+            self.requests += 1
+            price = self.prices.get(product_id) or base_price(product_id)
+            if self._rng.random() < self.price_change_rate:
+                price = max(1, round(price * (1 + self._rng.choice((-1, 1)) * self._rng.uniform(0.01, 0.10))))
+            self.prices[product_id] = price
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+            delay = self.latency_ms * self._rng.uniform(0.5, 1.5) / 1000
+        return price, fail, delay
+
+    def page(self, url: str) -> Tuple[int, bytes]:
+        route = self._route(url)
+        if route is None:
+            return 404, b"not found"
+        platform, product_id = route
+        price, fail, delay = self._next_price(product_id)
+        if delay:
+            time.sleep(delay)
+        if fail:
+            return 503, b"service unavailable"
+        return 200, _render(self.templates[platform], {
+            "product_id": product_id,
+            "title": f"Bench Product {product_id}",
+            "image_url": f"https://images.example.com/{product_id}.jpg",
+            "price": f"{price:,}.00",
+            "price_whole": f"{price:,}",
+            "list_price": f"{round(price * 1.25):,}",
+            "filler": self.filler,
+        })
+
+    def __enter__(self):
+        shop = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                # Proxied requests carry the absolute URL; direct ones use the Host header
+                url = self.path if "://" in self.path else f"http://{self.headers.get('Host')}{self.path}"
+                status, body = shop.page(url)
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class SMTPSink:
+    """Minimal SMTP server that accepts every message and counts it."""
+
+    def __init__(self):
+        self.messages = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server: Optional[socketserver.ThreadingTCPServer] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address[:2]
+
+    def __enter__(self):
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str):
+                self.wfile.write(line.encode() + b"\r\n")
+
+            def handle(self):
+                with sink._lock:
+                    sink.connections += 1
+                self.reply("220 sink ESMTP")
+                for raw in self.rfile:
+                    command = raw.decode("latin-1").strip().upper()
+                    if command.startswith("EHLO"):
+                        self.reply("250-sink")
+                        self.reply("250 8BITMIME")
+                    elif command.startswith("DATA"):
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        for line in self.rfile:
+                            if line in (b".\r\n", b".\n"):
+                                break
+                        with sink._lock:
+                            sink.messages += 1
+                        self.reply("250 OK")
+                    elif command.startswith("QUIT"):
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        # HELO, MAIL, RCPT, RSET, NOOP
+                        self.reply("250 OK")
+
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,249 @@
+"""
+Load test: scripted API scenarios with per-route throughput and latency.
+
+Logs in a pool of users created by benchmarks.seed_data, then runs
+--concurrency virtual users for --duration seconds. Each picks a scenario by
+weight, runs it, and starts over:
+
+- login:     POST /auth/login
+- dashboard: GET /trackers/dashboard, GET /auth/me
+- history:   GET /trackers/{id}, a page of /trackers/{id}/history and a
+             30-day downsampled range of it
+- crud:      POST /trackers, PUT /trackers/{id}, GET /trackers, DELETE /trackers/{id}
+
+An optional login burst runs first. Results are per route template
+(requests/s, errors, p50/p95/p99/max) and can be written as JSON with --json
+to compare runs before and after an index, cache or query change.
+
+Run the API with rate limiting off (empty RATE_LIMIT_REDIS_URL), otherwise
+it will mostly measure 429s.
+
+Usage (from backend/, after seeding):
+    python -m benchmarks.load_test --base-url http://localhost:8000 --users 500 \\
+        --concurrency 100 --duration 60 --mix login=5,dashboard=35,history=45,crud=15
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from benchmarks.seed_data import DEFAULT_PASSWORD, EMAIL_TEMPLATE
+
+
+class Recorder:
+    """Latency samples and error counts per route template."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def call(self, client: httpx.AsyncClient, route: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            resp = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.samples[route].append(time.perf_counter() - started)
+            self.errors[route] += 1
+            return None
+        self.samples[route].append(time.perf_counter() - started)
+        if resp.status_code >= 400:
+            self.errors[route] += 1
+        return resp
+
+    def report(self, elapsed: float) -> Dict[str, Dict]:
+        report = {}
+        for route in sorted(self.samples):
+            values = np.array(self.samples[route]) * 1000
+            report[route] = {
+                "requests": int(values.size),
+                "rps": values.size / elapsed,
+                "errors": self.errors[route],
+                "p50_ms": float(np.percentile(values, 50)),
+                "p95_ms": float(np.percentile(values, 95)),
+                "p99_ms": float(np.percentile(values, 99)),
+                "max_ms": float(values.max()),
+            }
+        return report
+
+
+class VirtualUser:
+    def __init__(self, index: int, token: str, tracker_ids: List[int]):
+        self.email = EMAIL_TEMPLATE.format(index)
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.tracker_ids = tracker_ids
+
+
+async def login(client: httpx.AsyncClient, recorder: Recorder, email: str, password: str) -> Optional[str]:
+    resp = await recorder.call(
+        client, "POST /auth/login", "POST", "/auth/login", json={"email": email, "password": password}
+    )
+    if resp is None or resp.status_code != 200:
+        return None
+    return resp.json()["access_token"]
+
+
+async def scenario_login(client, recorder, user: VirtualUser, password: str, rng: random.Random):
+    await login(client, recorder, user.email, password)
+
+
+async def scenario_dashboard(client, recorder, user: VirtualUser, password: str, rng: random.Random):
+    await recorder.call(client, "GET /trackers/dashboard", "GET", "/trackers/dashboard", headers=user.headers)
+    await recorder.call(client, "GET /auth/me", "GET", "/auth/me", headers=user.headers)
+
+
+async def scenario_history(client, recorder, user: VirtualUser, password: str, rng: random.Random):
+    if not user.tracker_ids:
+        return
+    tracker_id = rng.choice(user.tracker_ids)
+    await recorder.call(client, "GET /trackers/{id}", "GET", f"/trackers/{tracker_id}", headers=user.headers)
+    await recorder.call(
+        client, "GET /trackers/{id}/history?limit", "GET", f"/trackers/{tracker_id}/history",
+        params={"limit": 100}, headers=user.headers,
+    )
+    since = (datetime.utcnow() - timedelta(days=30)).isoformat()
+    await recorder.call(
+        client, "GET /trackers/{id}/history?points", "GET", f"/trackers/{tracker_id}/history",
+        params={"from": since, "points": 200}, headers=user.headers,
+    )
+
+
+async def scenario_crud(client, recorder, user: VirtualUser, password: str, rng: random.Random):
+    product_id = f"LTCRUD{rng.randrange(10 ** 8):08d}"
+    resp = await recorder.call(
+        client, "POST /trackers", "POST", "/trackers", headers=user.headers,
+        json={"product_url": f"https://www.amazon.in/dp/{product_id}", "target_price": 999.0},
+    )
+    if resp is None or resp.status_code != 201:
+        return
+    tracker_id = resp.json()["id"]
+    await recorder.call(
+        client, "PUT /trackers/{id}", "PUT", f"/trackers/{tracker_id}",
+        json={"target_price": 899.0}, headers=user.headers,
+    )
+    await recorder.call(client, "GET /trackers", "GET", "/trackers", headers=user.headers)
+    await recorder.call(client, "DELETE /trackers/{id}", "DELETE", f"/trackers/{tracker_id}", headers=user.headers)
+
+
+SCENARIOS = {
+    "login": scenario_login,
+    "dashboard": scenario_dashboard,
+    "history": scenario_history,
+    "crud": scenario_crud,
+}
+
+
+def parse_mix(spec: str) -> Tuple[List[str], List[float]]:
+    names, weights = [], []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, weight = item.split("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        names.append(name)
+        weights.append(float(weight))
+    return names, weights
+
+
+async def setup_users(client: httpx.AsyncClient, count: int, password: str, concurrency: int) -> List[VirtualUser]:
+    """Log in `count` seeded users and load their tracker ids (not recorded)."""
+    recorder = Recorder()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def prepare(index: int):
+        async with semaphore:
+            token = await login(client, recorder, EMAIL_TEMPLATE.format(index), password)
+            if token is None:
+                return None
+            resp = await client.get("/trackers", headers={"Authorization": f"Bearer {token}"})
+            return VirtualUser(index, token, [tracker["id"] for tracker in resp.json()])
+
+    users = [user for user in await asyncio.gather(*(prepare(i) for i in range(count))) if user]
+    if not users:
+        raise RuntimeError("No seeded user could log in; run benchmarks.seed_data first")
+    return users
+
+
+async def login_burst(client, recorder: Recorder, users: List[VirtualUser], total: int, concurrency: int, password: str):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            await login(client, recorder, users[i % len(users)].email, password)
+
+    await asyncio.gather(*(one(i) for i in range(total)))
+
+
+async def run(args) -> Dict:
+    names, weights = parse_mix(args.mix)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        print(f"logging in {args.users} users ...", flush=True)
+        users = await setup_users(client, args.users, args.password, args.concurrency)
+
+        results = {}
+        if args.login_burst:
+            recorder = Recorder()
+            started = time.perf_counter()
+            await login_burst(client, recorder, users, args.login_burst, args.concurrency, args.password)
+            results["login_burst"] = recorder.report(time.perf_counter() - started)
+
+        recorder = Recorder()
+        deadline = time.monotonic() + args.duration
+
+        async def virtual_user(n: int):
+            rng = random.Random(args.seed + n)
+            user = users[n % len(users)]
+            while time.monotonic() < deadline:
+                scenario = SCENARIOS[rng.choices(names, weights)[0]]
+                await scenario(client, recorder, user, args.password, rng)
+
+        print(f"running {args.concurrency} virtual users for {args.duration:.0f}s ...", flush=True)
+        started = time.perf_counter()
+        await asyncio.gather(*(virtual_user(n) for n in range(args.concurrency)))
+        results["mixed"] = recorder.report(time.perf_counter() - started)
+    return results
+
+
+def print_report(title: str, report: Dict[str, Dict]):
+    print(f"\n{title}")
+    print(f"{'route':<38}{'requests':>9}{'req/s':>9}{'errors':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for route, r in report.items():
+        print(
+            f"{route:<38}{r['requests']:>9}{r['rps']:>9.1f}{r['errors']:>8}"
+            f"{r['p50_ms']:>7.1f}ms{r['p95_ms']:>7.1f}ms{r['p99_ms']:>7.1f}ms{r['max_ms']:>7.0f}ms"
+        )
+    total = sum(r["requests"] for r in report.values())
+    print(f"{'total':<38}{total:>9}{sum(r['rps'] for r in report.values()):>9.1f}"
+          f"{sum(r['errors'] for r in report.values()):>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=200, help="seeded users to log in (load-0 .. load-N-1)")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--mix", default="login=5,dashboard=35,history=45,crud=15")
+    parser.add_argument("--login-burst", type=int, default=0, help="logins to fire before the mixed phase")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if "login_burst" in results:
+        print_report(f"login burst ({args.login_burst} logins)", results["login_burst"])
+    print_report(f"mixed ({args.mix}, {args.concurrency} virtual users, {args.duration:.0f}s)", results["mixed"])
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"args": vars(args), "results": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Synthetic data generator for load tests (benchmarks.load_test).
+
+Creates N users (load-<i>@salescout.local, all with the same password) and M
+trackers spread over them with a long-tailed distribution (most users track
+a handful of products, a few track hundreds), then fills price_history for
+every tracker from its creation until now at its polling interval:
+
+- polling intervals weighted towards 60 minutes (15 min .. 24 h)
+- creation times uniform over the last --days
+- prices: per-tracker base, a 45-day seasonal swing, 1% noise and a 15%
+  sale every 30 days
+
+History is generated inside Postgres (INSERT ... SELECT over generate_series,
+one statement per chunk of trackers), so hundreds of millions of rows load at
+server speed without streaming them from Python. --drop-index drops the
+history index during the load and rebuilds it afterwards, which is much
+faster for large loads.
+
+Use a scratch database. Estimate the row count first with --dry-run:
+    python -m benchmarks.seed_data --users 20000 --trackers 200000 --days 365 --dry-run
+    python -m benchmarks.seed_data --users 20000 --trackers 200000 --days 365 --drop-index
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Tuple
+
+import numpy as np
+from sqlalchemy import delete, insert, text
+
+from database import SessionLocal, init_db
+from models import Tracker, User
+from passwords import hash_password
+
+EMAIL_TEMPLATE = "load-{}@salescout.local"
+DEFAULT_PASSWORD = "loadtest-pass"
+INTERVALS = np.array([15, 30, 60, 180, 360, 1440])
+INTERVAL_WEIGHTS = np.array([0.05, 0.10, 0.50, 0.15, 0.10, 0.10])
+HISTORY_INDEX = "ix_price_history_tracker_checked"
+
+# Price of one sample: seasonal swing, noise, and a sale window every 30 days
+HISTORY_SQL = text("""
+INSERT INTO price_history (tracker_id, price, checked_at)
+SELECT t.id,
+       round((
+           t.target_price / 0.85
+           * (1 + 0.08 * sin(extract(epoch FROM ts) / 3888000.0 * 2 * pi() + t.id))
+           * (1 + (random() - 0.5) * 0.02)
+           * CASE WHEN ((extract(epoch FROM ts)::bigint / 172800) + t.id) % 15 = 0 THEN 0.85 ELSE 1 END
+       )::numeric, 2)::float,
+       ts + random() * interval '90 seconds'
+FROM trackers t
+CROSS JOIN LATERAL generate_series(
+    t.created_at, :now, make_interval(mins => t.polling_interval_minutes)
+) AS ts
+WHERE t.id BETWEEN :low AND :high
+""")
+
+LAST_PRICE_SQL = text("""
+UPDATE trackers t
+SET last_price = h.price, last_checked_at = h.checked_at
+FROM trackers src
+CROSS JOIN LATERAL (
+    SELECT price, checked_at FROM price_history
+    WHERE tracker_id = src.id ORDER BY checked_at DESC LIMIT 1
+) h
+WHERE t.id = src.id AND src.id BETWEEN :low AND :high
+""")
+
+
+def trackers_per_user(users: int, trackers: int, rng: np.random.Generator) -> np.ndarray:
+    """Long-tailed split of `trackers` over `users` (every user gets at least one)."""
+    weights = rng.lognormal(mean=0.0, sigma=1.2, size=users)
+    counts = np.floor(weights / weights.sum() * (trackers - users)).astype(int) + 1
+    counts[np.argsort(-weights)[: trackers - counts.sum()]] += 1
+    return counts
+
+
+def seed_users(db, users: int, password: str) -> np.ndarray:
+    password_hash = hash_password(password)
+    now = datetime.utcnow()
+    ids = []
+    for start in range(0, users, 5000):
+        rows = [
+            {"email": EMAIL_TEMPLATE.format(i), "password_hash": password_hash, "created_at": now}
+            for i in range(start, min(start + 5000, users))
+        ]
+        ids.extend(db.execute(insert(User).values(rows).returning(User.id)).scalars().all())
+    db.commit()
+    return np.array(ids)
+
+
+def seed_trackers(db, user_ids: np.ndarray, trackers: int, days: int, rng: np.random.Generator):
+    now = datetime.utcnow()
+    counts = trackers_per_user(len(user_ids), trackers, rng)
+    owners = np.repeat(user_ids, counts)
+    intervals = rng.choice(INTERVALS, size=trackers, p=INTERVAL_WEIGHTS)
+    ages = rng.uniform(0, days * 86400, size=trackers)
+    base_prices = np.round(rng.lognormal(mean=7.5, sigma=1.1, size=trackers), 0) + 99
+    targets = np.round(base_prices * rng.uniform(0.75, 0.95, size=trackers), 2)
+    amazon = rng.random(trackers) < 0.6
+
+    for start in range(0, trackers, 5000):
+        rows = []
+        for i in range(start, min(start + 5000, trackers)):
+            product_id = f"LT{i:08d}"
+            rows.append({
+                "user_id": int(owners[i]),
+                "product_url": (
+                    f"https://www.amazon.in/dp/{product_id}" if amazon[i]
+                    else f"https://www.flipkart.com/product/p/itm{i}?pid={product_id}"
+                ),
+                "product_title": f"Load test product {product_id}",
+                "target_price": float(targets[i]),
+                "polling_interval_minutes": int(intervals[i]),
+                "active": True,
+                "created_at": now - timedelta(seconds=float(ages[i])),
+            })
+        db.execute(insert(Tracker).values(rows))
+    db.commit()
+
+
+def expected_history_rows(trackers: int, days: int) -> int:
+    # Mean age is days / 2
+    return int(trackers * (days / 2) * 1440 * float((INTERVAL_WEIGHTS / INTERVALS).sum()))
+
+
+def seed_history(db, chunk: int) -> Tuple[int, int]:
+    """Generate history for every load-test tracker. Returns the tracker id range."""
+    now = datetime.utcnow()
+    low, high = db.execute(text(
+        "SELECT min(t.id), max(t.id) FROM trackers t JOIN users u ON u.id = t.user_id "
+        "WHERE u.email LIKE 'load-%@salescout.local'"
+    )).one()
+    started = time.perf_counter()
+    inserted = 0
+    for start in range(low, high + 1, chunk):
+        result = db.execute(HISTORY_SQL, {"now": now, "low": start, "high": start + chunk - 1})
+        db.commit()
+        inserted += result.rowcount
+        rate = inserted / (time.perf_counter() - started)
+        print(f"  trackers {start}-{min(start + chunk - 1, high)}: {inserted:,} rows ({rate:,.0f} rows/s)", flush=True)
+    return low, high
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--trackers", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=90, help="history depth for the oldest trackers")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--chunk", type=int, default=500, help="trackers per history INSERT")
+    parser.add_argument("--drop-index", action="store_true", help="rebuild the history index after loading")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--dry-run", action="store_true", help="only print the expected history row count")
+    args = parser.parse_args()
+
+    if args.trackers < args.users:
+        parser.error("--trackers must be at least --users")
+    print(f"expected price_history rows: ~{expected_history_rows(args.trackers, args.days):,}")
+    if args.dry_run:
+        return
+
+    init_db()
+    rng = np.random.default_rng(args.seed)
+    db = SessionLocal()
+    try:
+        print("removing previous load-test users ...", flush=True)
+        db.execute(delete(User).where(User.email.like(EMAIL_TEMPLATE.format("%"))))
+        db.commit()
+
+        print(f"creating {args.users} users and {args.trackers} trackers ...", flush=True)
+        user_ids = seed_users(db, args.users, args.password)
+        seed_trackers(db, user_ids, args.trackers, args.days, rng)
+
+        if args.drop_index:
+            db.execute(text(f"DROP INDEX IF EXISTS {HISTORY_INDEX}"))
+            db.commit()
+        print("generating price history ...", flush=True)
+        low, high = seed_history(db, args.chunk)
+        if args.drop_index:
+            print("rebuilding history index ...", flush=True)
+            db.execute(text(
+                f"CREATE INDEX {HISTORY_INDEX} ON price_history (tracker_id, checked_at, id)"
+            ))
+            db.commit()
+
+        print("updating last_price / last_checked_at ...", flush=True)
+        for start in range(low, high + 1, args.chunk * 10):
+            db.execute(LAST_PRICE_SQL, {"low": start, "high": start + args.chunk * 10 - 1})
+            db.commit()
+        db.execute(text("ANALYZE users, trackers, price_history"))
+        db.commit()
+        print("done")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
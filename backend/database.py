@@ -1,21 +1,226 @@
 """
 Database connection and session management.
 Uses SQLAlchemy ORM with PostgreSQL.
+
+Three engines are configured:
+- a sync engine (psycopg2) used by Celery tasks and scripts via SessionLocal
+- an async engine (asyncpg) used by the FastAPI routes via AsyncSessionLocal
+- an optional async replica engine used by read-only routes via get_async_read_db
+
+Pool sizing comes from the role profile in config (DB_ROLE), and every pool
+records how long callers wait to check out a connection.
 """
-from sqlalchemy import create_engine
+import asyncio
+import threading
+import time
+import uuid
+from typing import Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
-from config import DATABASE_URL
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from config import (
+    DATABASE_URL,
+    ASYNC_DATABASE_URL,
+    ASYNC_DATABASE_REPLICA_URL,
+    DB_REPLICA_MAX_LAG_SECONDS,
+    DB_REPLICA_LAG_CHECK_INTERVAL,
+    DB_ROLE,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_PGBOUNCER_MODE,
+    DB_USE_NULLPOOL,
+)
+
+
+class PoolCheckoutStats:
+    """Thread-safe accumulator for connection checkout wait times."""
+
+    BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.bucket_counts = [0] * (len(self.BUCKETS) + 1)
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            for i, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    self.bucket_counts[i] += 1
+                    break
+            else:
+                self.bucket_counts[-1] += 1
+
+    def cumulative_buckets(self):
+        """Prometheus-style ([(upper bound, cumulative count), ..., ("+Inf", count)], sum)."""
+        with self._lock:
+            counts = list(self.bucket_counts)
+            total = self.total_seconds
+        buckets, cumulative = [], 0
+        for bound, count in zip(self.BUCKETS, counts):
+            cumulative += count
+            buckets.append((str(bound), cumulative))
+        buckets.append(("+Inf", cumulative + counts[-1]))
+        return buckets, total
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.count,
+                "wait_seconds_total": round(self.total_seconds, 6),
+                "wait_seconds_avg": round(self.total_seconds / self.count, 6) if self.count else 0.0,
+                "wait_seconds_max": round(self.max_seconds, 6),
+                "wait_buckets": {
+                    **{f"le_{b}": c for b, c in zip(self.BUCKETS, self.bucket_counts)},
+                    "le_inf": self.bucket_counts[-1],
+                },
+            }
+
+
+pool_checkout_stats = {
+    "sync": PoolCheckoutStats(),
+    "async": PoolCheckoutStats(),
+    "replica": PoolCheckoutStats(),
+}
+
+
+def _timed_pool(pool_cls, stats: PoolCheckoutStats):
+    """Subclass a pool so each checkout records its wait time."""
+
+    class TimedPool(pool_cls):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                stats.observe(time.perf_counter() - start)
+
+    TimedPool.__name__ = f"Timed{pool_cls.__name__}"
+    return TimedPool
+
+
+def _engine_options(queue_pool_cls, stats: PoolCheckoutStats) -> dict:
+    """Build engine kwargs from the role pool profile."""
+    if DB_USE_NULLPOOL:
+        return {"poolclass": _timed_pool(NullPool, stats), "pool_pre_ping": DB_POOL_PRE_PING}
+    return {
+        "poolclass": _timed_pool(queue_pool_cls, stats),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def _async_connect_args() -> dict:
+    """asyncpg options; PgBouncer transaction pooling cannot keep prepared statements."""
+    if not DB_PGBOUNCER_MODE:
+        return {}
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+    }
+
 
 # Create SQLAlchemy engine
 engine = create_engine(
     DATABASE_URL,
-    pool_pre_ping=True,  # Test connection before use
-    echo=False  # Set to True for SQL logging
+    echo=False,  # Set to True for SQL logging
+    **_engine_options(QueuePool, pool_checkout_stats["sync"]),
 )
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for the API event loop
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=False,
+    connect_args=_async_connect_args(),
+    **_engine_options(AsyncAdaptedQueuePool, pool_checkout_stats["async"]),
+)
+
+# Async session factory; objects stay usable after commit (no lazy reloads)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# Optional replica engine for read-only routes
+async_replica_engine = None
+AsyncReplicaSessionLocal = None
+if ASYNC_DATABASE_REPLICA_URL:
+    async_replica_engine = create_async_engine(
+        ASYNC_DATABASE_REPLICA_URL,
+        echo=False,
+        connect_args=_async_connect_args(),
+        **_engine_options(AsyncAdaptedQueuePool, pool_checkout_stats["replica"]),
+    )
+    AsyncReplicaSessionLocal = async_sessionmaker(
+        bind=async_replica_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
+class ReplicaLagGuard:
+    """
+    Caches the measured replica lag and decides whether reads may use the replica.
+    Lag is re-measured at most once per DB_REPLICA_LAG_CHECK_INTERVAL; a failed
+    measurement marks the replica unusable until the next check.
+    """
+
+    # Zero when fully replayed; otherwise seconds since the last replayed transaction
+    LAG_QUERY = text(
+        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    )
+
+    def __init__(self, max_lag_seconds: float, check_interval: float):
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.lag_seconds: Optional[float] = None
+        self.checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _measure(self) -> Optional[float]:
+        try:
+            async with async_replica_engine.connect() as conn:
+                result = await conn.execute(self.LAG_QUERY)
+                return float(result.scalar() or 0.0)
+        except Exception as exc:  # noqa: BLE001
+            print(f"Replica lag check failed: {exc}")
+            return None
+
+    async def replica_usable(self) -> bool:
+        if async_replica_engine is None:
+            return False
+        if time.monotonic() - self.checked_at >= self.check_interval:
+            async with self._lock:
+                # Another request may have refreshed while we waited
+                if time.monotonic() - self.checked_at >= self.check_interval:
+                    self.lag_seconds = await self._measure()
+                    self.checked_at = time.monotonic()
+        return self.lag_seconds is not None and self.lag_seconds <= self.max_lag_seconds
+
+
+replica_guard = ReplicaLagGuard(DB_REPLICA_MAX_LAG_SECONDS, DB_REPLICA_LAG_CHECK_INTERVAL)
+
 # Base class for ORM models
 Base = declarative_base()
 
@@ -32,6 +237,56 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """
+    Async dependency providing an AsyncSession to routes.
+    Usage: async def route(..., db: AsyncSession = Depends(get_async_db)):
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def open_read_session() -> AsyncSession:
+    """
+    Open a read-only AsyncSession: the replica when configured and within the
+    lag budget, else the primary. The caller must close it.
+    """
+    use_replica = await replica_guard.replica_usable()
+    session_factory = AsyncReplicaSessionLocal if use_replica else AsyncSessionLocal
+    db = session_factory()
+    db.info["replica"] = use_replica
+    return db
+
+
+async def get_async_read_db():
+    """
+    Async dependency for read-only routes (see open_read_session).
+    Usage: async def route(..., db: AsyncSession = Depends(get_async_read_db)):
+    """
+    db = await open_read_session()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+def get_pool_stats() -> dict:
+    """
+    Report pool profile and checkout wait-time metrics for both engines.
+    """
+    return {
+        "role": DB_ROLE,
+        "pgbouncer_mode": DB_PGBOUNCER_MODE,
+        "sync": {"pool": engine.pool.status(), **pool_checkout_stats["sync"].snapshot()},
+        "async": {"pool": async_engine.pool.status(), **pool_checkout_stats["async"].snapshot()},
+        "replica": None if async_replica_engine is None else {
+            "pool": async_replica_engine.pool.status(),
+            "lag_seconds": replica_guard.lag_seconds,
+            **pool_checkout_stats["replica"].snapshot(),
+        },
+    }
+
+
 def init_db():
     """
     Create all database tables.
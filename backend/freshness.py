@@ -0,0 +1,147 @@
+"""
+Tracker freshness: how far price checks run behind their polling schedule.
+
+A tracker's check is due at `next_check_at` when set (staggered bulk imports),
+otherwise `polling_interval_minutes` after its last check, or at creation if it
+has never been checked. check_price records the lag between that due time and
+the completed check in trackers.last_check_lag_seconds and in the
+salescout_polling_lag_seconds histogram, labelled by platform and interval
+class; the scheduler records how late checks were when it enqueued them.
+
+freshness_report() answers "who is behind right now" for GET /health/freshness:
+lag percentiles per platform / interval class over each tracker's latest check,
+and the trackers that are most overdue at the moment.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import Interval, case, func, select
+from sqlalchemy.orm import Session
+
+from config import POLLING_LAG_SLO_SECONDS
+from models import Tracker
+from utils import get_platform_from_url
+
+# (upper bound in minutes, label); longer intervals are ">24h"
+INTERVAL_CLASSES = ((15, "<=15m"), (60, "<=1h"), (360, "<=6h"), (1440, "<=24h"))
+
+
+def interval_class(minutes: int) -> str:
+    for bound, label in INTERVAL_CLASSES:
+        if minutes <= bound:
+            return label
+    return ">24h"
+
+
+def check_due_at(tracker: Tracker) -> datetime:
+    """When the tracker's next check is due (see module docstring)."""
+    if tracker.next_check_at:
+        return tracker.next_check_at
+    if tracker.last_checked_at:
+        return tracker.last_checked_at + timedelta(minutes=tracker.polling_interval_minutes)
+    return tracker.created_at
+
+
+def lag_labels(tracker: Tracker):
+    """(platform, interval class) metric labels for a tracker."""
+    return get_platform_from_url(tracker.product_url) or "other", interval_class(tracker.polling_interval_minutes)
+
+
+def _due_expression():
+    """SQL equivalent of check_due_at()."""
+    return func.coalesce(
+        Tracker.next_check_at,
+        Tracker.last_checked_at
+        + func.make_interval(0, 0, 0, 0, 0, Tracker.polling_interval_minutes, type_=Interval),
+        Tracker.created_at,
+    )
+
+
+def _platform_expression():
+    """SQL equivalent of get_platform_from_url(): match on the URL's host."""
+    host = func.lower(func.split_part(Tracker.product_url, "/", 3))
+    return case(
+        (host.contains("amazon"), "amazon"),
+        (host.contains("flipkart"), "flipkart"),
+        else_="other",
+    )
+
+
+def _interval_class_expression():
+    return case(
+        *[(Tracker.polling_interval_minutes <= bound, label) for bound, label in INTERVAL_CLASSES],
+        else_=">24h",
+    )
+
+
+def _lag_summary(db: Session) -> List[Dict]:
+    platform = _platform_expression().label("platform")
+    klass = _interval_class_expression().label("interval_class")
+    lag = Tracker.last_check_lag_seconds
+    rows = db.execute(
+        select(
+            platform,
+            klass,
+            func.count().label("trackers"),
+            func.percentile_cont(0.5).within_group(lag).label("p50"),
+            func.percentile_cont(0.95).within_group(lag).label("p95"),
+            func.max(lag).label("max"),
+            func.count().filter(lag <= POLLING_LAG_SLO_SECONDS).label("within_slo"),
+        )
+        .where(Tracker.active.is_(True), Tracker.deleted_at.is_(None), lag.isnot(None))
+        .group_by(platform, klass)
+        .order_by(platform, klass)
+    ).all()
+    return [
+        {
+            "platform": row.platform,
+            "interval_class": row.interval_class,
+            "trackers": row.trackers,
+            "p50_seconds": round(row.p50, 1),
+            "p95_seconds": round(row.p95, 1),
+            "max_seconds": round(row.max, 1),
+            "within_slo_ratio": round(row.within_slo / row.trackers, 4),
+        }
+        for row in rows
+    ]
+
+
+def _most_overdue(db: Session, now: datetime, limit: int) -> List[Dict]:
+    due = _due_expression().label("due_at")
+    rows = db.execute(
+        select(
+            Tracker.id,
+            Tracker.user_id,
+            Tracker.product_url,
+            Tracker.polling_interval_minutes,
+            Tracker.last_checked_at,
+            Tracker.last_check_lag_seconds,
+            due,
+        )
+        .where(Tracker.active.is_(True), Tracker.deleted_at.is_(None), due < now)
+        .order_by(due)
+        .limit(limit)
+    ).all()
+    return [
+        {
+            "tracker_id": row.id,
+            "user_id": row.user_id,
+            "platform": get_platform_from_url(row.product_url) or "other",
+            "polling_interval_minutes": row.polling_interval_minutes,
+            "due_at": row.due_at,
+            "overdue_seconds": round((now - row.due_at).total_seconds(), 1),
+            "last_checked_at": row.last_checked_at,
+            "last_check_lag_seconds": row.last_check_lag_seconds,
+        }
+        for row in rows
+    ]
+
+
+def freshness_report(db: Session, limit: int = 20) -> Dict:
+    """Lag percentiles of the latest checks and the `limit` most overdue trackers."""
+    now = datetime.utcnow()
+    return {
+        "slo_seconds": POLLING_LAG_SLO_SECONDS,
+        "lag": _lag_summary(db),
+        "most_overdue": _most_overdue(db, now, limit),
+    }
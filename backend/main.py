@@ -2,23 +2,49 @@
 SaleScout Backend - FastAPI Application
 Product price monitoring and alert system.
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from config import FRONTEND_URL, DEBUG
-from database import init_db
+from config import FRONTEND_URL, DEBUG, PROFILING_ENABLED
+from database import init_db, engine, async_engine, async_replica_engine, get_pool_stats, SessionLocal
+from utils import close_redis_clients
+from serialization import FastJSONResponse
+from passwords import hasher_pool
+from realtime import price_hub
+from rate_limit import RateLimitMiddleware
+from metrics import RequestMetricsMiddleware, render_metrics
+from profiling import ProfilingMiddleware, instrument_engine
 from routers.users import router as users_router
+from routers.dashboard import router as dashboard_router
 from routers.trackers import router as trackers_router
 from routers.price_history import router as price_history_router
+from routers.stream import router as stream_router
+from routers.export import router as export_router
+from routers.alerts import router as alerts_router
+from tasks.notifications import get_outbox_stats
+from freshness import freshness_report
 
 # Create FastAPI application
 app = FastAPI(
     title="SaleScout API",
     description="Product price monitoring and alert system for Amazon & Flipkart",
     version="1.0.0",
-    debug=DEBUG
+    debug=DEBUG,
+    default_response_class=FastJSONResponse,
 )
 
+# Rate limiting per route group; added before CORS so 429 responses still carry CORS headers
+app.add_middleware(RateLimitMiddleware)
+
+# Request latency per route template; wraps the rate limiter, so rate-limited requests are counted too
+app.add_middleware(RequestMetricsMiddleware)
+
+# Opt-in SQL accounting, Server-Timing header and sampled profiler captures per request
+if PROFILING_ENABLED:
+    for profiled_engine in (engine, async_engine.sync_engine, getattr(async_replica_engine, "sync_engine", None)):
+        instrument_engine(profiled_engine)
+    app.add_middleware(ProfilingMiddleware)
+
 # CORS middleware configuration
 app.add_middleware(
     CORSMiddleware,
@@ -26,6 +52,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Retry-After", "Server-Timing"],
 )
 
 
@@ -38,15 +65,26 @@ def on_startup():
 
 
 @app.on_event("shutdown")
-def on_shutdown():
+async def on_shutdown():
     """Cleanup on application shutdown."""
+    await async_engine.dispose()
+    if async_replica_engine is not None:
+        await async_replica_engine.dispose()
+    await price_hub.close()
+    await close_redis_clients()
+    hasher_pool.shutdown()
     print("👋 Shutting down SaleScout API")
 
 
 # Include routers
 app.include_router(users_router)
+# Registered before trackers_router so /trackers/dashboard wins over /trackers/{tracker_id}
+app.include_router(dashboard_router)
 app.include_router(trackers_router)
 app.include_router(price_history_router)
+app.include_router(stream_router)
+app.include_router(export_router)
+app.include_router(alerts_router)
 
 
 # Root endpoint
@@ -71,6 +109,47 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/db", tags=["Root"])
+def database_pool_health():
+    """
+    Connection pool profile and checkout wait-time metrics.
+    """
+    return get_pool_stats()
+
+
+@app.get("/health/notifications", tags=["Root"])
+def notification_outbox_health():
+    """
+    Notification outbox backlog: pending/failed rows and oldest pending age.
+    """
+    db = SessionLocal()
+    try:
+        return get_outbox_stats(db)
+    finally:
+        db.close()
+
+
+@app.get("/health/freshness", tags=["Root"])
+def tracker_freshness(limit: int = Query(20, ge=1, le=200)):
+    """
+    Polling lag against POLLING_LAG_SLO_SECONDS and the most overdue trackers.
+    """
+    db = SessionLocal()
+    try:
+        return freshness_report(db, limit)
+    finally:
+        db.close()
+
+
+@app.get("/metrics", tags=["Root"], include_in_schema=False)
+def prometheus_metrics():
+    """
+    Prometheus scrape endpoint.
+    """
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -0,0 +1,167 @@
+"""
+Prometheus metrics for the API and Celery workers.
+
+Metric objects are module-level and shared by the API and workers; the API
+serves them on GET /metrics and workers through a small HTTP exporter started
+by tasks.monitoring. With several processes (uvicorn workers, Celery prefork
+children) set PROMETHEUS_MULTIPROC_DIR so the values are aggregated across
+processes.
+
+DB pool checkout waits are not re-instrumented: PoolCheckoutStats already
+records them and PoolCheckoutCollector exposes its buckets at scrape time.
+"""
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import HistogramMetricFamily
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from database import pool_checkout_stats
+
+SCRAPE_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+
+# Scraping
+SCRAPE_DURATION = Histogram(
+    "salescout_scrape_duration_seconds",
+    "Time to fetch and parse a product page",
+    ["platform", "strategy", "outcome"],
+    buckets=SCRAPE_BUCKETS,
+)
+SELECTOR_HITS = Counter(
+    "salescout_scrape_selector_hits_total",
+    "CSS selector that produced a field; selector='none' when every selector missed",
+    ["platform", "field", "selector"],
+)
+
+# Scheduling and queues
+ENQUEUE_DURATION = Histogram(
+    "salescout_enqueue_due_trackers_duration_seconds",
+    "Duration of one enqueue_due_trackers run",
+)
+ENQUEUED_CHECKS = Counter(
+    "salescout_enqueued_checks_total",
+    "Price checks enqueued by the scheduler",
+)
+LAG_BUCKETS = (30.0, 60.0, 120.0, 300.0, 600.0, 1200.0, 1800.0, 3600.0, 7200.0, 21600.0)
+POLLING_LAG = Histogram(
+    "salescout_polling_lag_seconds",
+    "Time from a tracker's check being due to the check completing",
+    ["platform", "interval_class"],
+    buckets=LAG_BUCKETS,
+)
+ENQUEUE_LAG = Histogram(
+    "salescout_enqueue_lag_seconds",
+    "How overdue a tracker's check was when the scheduler enqueued it",
+    ["platform", "interval_class"],
+    buckets=LAG_BUCKETS,
+)
+QUEUE_LAG = Histogram(
+    "salescout_task_queue_lag_seconds",
+    "Time between a task being published and a worker starting it",
+    ["task"],
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0),
+)
+TASK_DURATION = Histogram(
+    "salescout_task_duration_seconds",
+    "Celery task run time",
+    ["task", "state"],
+    buckets=SCRAPE_BUCKETS,
+)
+
+# Alerts and notifications
+ALERTS = Counter(
+    "salescout_alerts_total",
+    "Alert rule outcomes; suppressed = condition true but already fired",
+    ["rule", "outcome"],
+)
+NOTIFICATIONS = Counter(
+    "salescout_notifications_total",
+    "Outbox emails by delivery outcome (a digest counts once)",
+    ["outcome"],
+)
+NOTIFICATION_SEND_DURATION = Histogram(
+    "salescout_notification_batch_send_seconds",
+    "Time to send one outbox batch over the SMTP pool",
+)
+
+# API
+HTTP_REQUEST_DURATION = Histogram(
+    "salescout_http_request_duration_seconds",
+    "API request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+
+class PoolCheckoutCollector:
+    """Expose database.pool_checkout_stats as salescout_db_pool_checkout_seconds."""
+
+    def collect(self):
+        family = HistogramMetricFamily(
+            "salescout_db_pool_checkout_seconds",
+            "Wait for a pooled DB connection",
+            labels=["pool"],
+        )
+        for name, stats in pool_checkout_stats.items():
+            buckets, total = stats.cumulative_buckets()
+            family.add_metric([name], buckets, total)
+        yield family
+
+
+REGISTRY.register(PoolCheckoutCollector())
+
+
+def metrics_registry():
+    """Registry to expose: aggregated across processes when PROMETHEUS_MULTIPROC_DIR is set."""
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    # Checkout stats are per process; this reports the serving process's pools
+    registry.register(PoolCheckoutCollector())
+    return registry
+
+
+def render_metrics():
+    """Return (body, content type) for a metrics scrape."""
+    return generate_latest(metrics_registry()), CONTENT_TYPE_LATEST
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware observing request latency per route template (not raw path)."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code),
+            ).observe(time.perf_counter() - started)
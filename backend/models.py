@@ -3,7 +3,7 @@ SQLAlchemy ORM models for SaleScout.
 Defines User, Tracker, and PriceHistory tables.
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, Index, false, true
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -19,9 +19,16 @@ class User(Base):
     password_hash = Column(String(255), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Alert delivery: "immediate" (one email per alert) or "digest" (combined per DIGEST_WINDOW_MINUTES)
+    alert_delivery = Column(String(20), default="immediate", server_default="immediate", nullable=False)
+    # Set when the account is queued for background purge; hidden from auth from then on
+    deleted_at = Column(DateTime, nullable=True)
 
     # Relationship: one user can have many trackers
-    trackers = relationship("Tracker", back_populates="owner", cascade="all, delete-orphan")
+    # passive_deletes: rely on ON DELETE CASCADE instead of loading children
+    trackers = relationship(
+        "Tracker", back_populates="owner", cascade="all, delete-orphan", passive_deletes=True
+    )
 
     def __repr__(self):
         return f"<User(id={self.id}, email={self.email})>"
@@ -45,6 +52,18 @@ class Tracker(Base):
     target_price = Column(Float, nullable=False)
     last_price = Column(Float, nullable=True)
     last_checked_at = Column(DateTime, nullable=True)
+    # Explicit time of the next check; overrides the polling interval when set (bulk imports)
+    next_check_at = Column(DateTime, nullable=True)
+    # Seconds the most recent check completed after it was due (see freshness)
+    last_check_lag_seconds = Column(Float, nullable=True)
+    
+    # Alert state per rule: armed until the alert fires, re-armed once the price
+    # recovers past the hysteresis band (see tasks.check_price)
+    target_alert_armed = Column(Boolean, default=True, server_default=true(), nullable=False)
+    drop_alert_armed = Column(Boolean, default=True, server_default=true(), nullable=False)
+    # Availability: false once checks stop finding a price; back_in_stock_at marks the return
+    in_stock = Column(Boolean, default=True, server_default=true(), nullable=False)
+    back_in_stock_at = Column(DateTime, nullable=True)
     
     # Configuration
     polling_interval_minutes = Column(Integer, default=60, nullable=False)
@@ -53,10 +72,18 @@ class Tracker(Base):
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Set when the tracker is queued for background purge; hidden from the API from then on
+    deleted_at = Column(DateTime, nullable=True)
 
     # Relationships
     owner = relationship("User", back_populates="trackers")
-    price_history = relationship("PriceHistory", back_populates="tracker", cascade="all, delete-orphan")
+    # passive_deletes: rely on ON DELETE CASCADE instead of loading every history row
+    price_history = relationship(
+        "PriceHistory", back_populates="tracker", cascade="all, delete-orphan", passive_deletes=True
+    )
+    alert_rules = relationship(
+        "AlertRule", back_populates="tracker", cascade="all, delete-orphan", passive_deletes=True
+    )
 
     def __repr__(self):
         return f"<Tracker(id={self.id}, product_title={self.product_title}, last_price={self.last_price})>"
@@ -67,6 +94,10 @@ class PriceHistory(Base):
     PriceHistory model - stores historical price data for each tracker.
     """
     __tablename__ = "price_history"
+    __table_args__ = (
+        # Serves per-tracker range scans and keyset pagination on checked_at
+        Index("ix_price_history_tracker_checked", "tracker_id", "checked_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tracker_id = Column(Integer, ForeignKey("trackers.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -80,3 +111,70 @@ class PriceHistory(Base):
 
     def __repr__(self):
         return f"<PriceHistory(id={self.id}, tracker_id={self.tracker_id}, price={self.price})>"
+
+
+class NotificationOutbox(Base):
+    """
+    NotificationOutbox model - alert emails written in the same transaction as the
+    price update that triggered them and delivered later by tasks.notifications.
+    """
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        # Serves the sender's "pending and due" scan
+        Index("ix_notification_outbox_pending", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    tracker_id = Column(Integer, ForeignKey("trackers.id", ondelete="SET NULL"), nullable=True)
+
+    # Message
+    recipient = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    body = Column(Text, nullable=False)
+    # Digest rows wait out the user's window and are sent together as one email
+    digest = Column(Boolean, default=False, server_default=false(), nullable=False)
+
+    # Delivery state: pending -> sent | failed
+    status = Column(String(20), default="pending", nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<NotificationOutbox(id={self.id}, recipient={self.recipient}, status={self.status})>"
+
+
+class AlertRule(Base):
+    """
+    AlertRule model - a user-defined alert condition on a tracker, evaluated in
+    bulk by tasks.alerts (see alerts.rules for the supported kinds).
+    """
+    __tablename__ = "alert_rules"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    tracker_id = Column(Integer, ForeignKey("trackers.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # Definition
+    kind = Column(String(30), nullable=False)  # percent_drop | all_time_low | back_in_stock
+    threshold_pct = Column(Float, nullable=True)
+    window_days = Column(Integer, nullable=True)
+    active = Column(Boolean, default=True, nullable=False)
+
+    # Evaluation state
+    armed = Column(Boolean, default=True, nullable=False)
+    last_fired_at = Column(DateTime, nullable=True)
+    evaluated_at = Column(DateTime, nullable=True)  # prices checked after this are "fresh"
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Relationship
+    tracker = relationship("Tracker", back_populates="alert_rules")
+
+    def __repr__(self):
+        return f"<AlertRule(id={self.id}, tracker_id={self.tracker_id}, kind={self.kind})>"
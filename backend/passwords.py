@@ -0,0 +1,119 @@
+"""
+Password hashing for SaleScout.
+
+bcrypt is CPU bound, so the API runs it in a dedicated, bounded process pool
+instead of the shared Starlette threadpool: a login burst then queues behind
+its own workers rather than starving tracker and history routes.
+
+This module is imported by the pool's child processes, so it only depends on
+passlib and config.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from config import (
+    BCRYPT_ROUNDS,
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_QUEUE_SIZE,
+    PASSWORD_HASH_TIMEOUT_SECONDS,
+)
+
+# Hashes with a different cost than BCRYPT_ROUNDS report needs_update and are
+# transparently re-hashed on the next successful login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+
+class PasswordHashTimeout(Exception):
+    """Raised when hashing work cannot be queued or finished in time."""
+
+
+def hash_password(password: str) -> str:
+    """Hash a plain text password using bcrypt."""
+    return pwd_context.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a plain text password against a bcrypt hash."""
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and, if the stored hash uses outdated settings, return a new hash.
+    
+    Returns:
+        (valid, new_hash) where new_hash is None when no rehash is needed
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasherPool:
+    """
+    Process pool for bcrypt work with a bounded queue and per-call timeout.
+    
+    Calls are rejected at once when `queue_size` jobs are already queued or running.
+    
+    PASSWORD_HASH_WORKERS=0 falls back to the default threadpool executor.
+    """
+
+    def __init__(self, workers: int, queue_size: int, timeout: float):
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(queue_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers and self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                # spawn: never fork a process that runs an event loop and DB pools
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        # A slot is held until the worker finishes the job, not until the caller
+        # stops waiting: a timed-out bcrypt call keeps running in the pool, and
+        # freeing its slot early would let the backlog grow without limit.
+        if self._slots.locked():
+            raise PasswordHashTimeout("Password hashing queue is full")
+        await self._slots.acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self._get_executor(), fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise PasswordHashTimeout("Password hashing timed out")
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self._run(verify_and_update, plain_password, hashed_password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hasher_pool = PasswordHasherPool(
+    workers=PASSWORD_HASH_WORKERS,
+    queue_size=PASSWORD_HASH_QUEUE_SIZE,
+    timeout=PASSWORD_HASH_TIMEOUT_SECONDS,
+)
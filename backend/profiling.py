@@ -0,0 +1,246 @@
+"""
+Opt-in per-request and per-task profiling (PROFILING_ENABLED).
+
+For every API request / Celery task a Profile collects:
+- SQL statement count, total DB time and the slowest statement, from engine
+  cursor events (instrument_engine)
+- named spans: "auth" (identity resolution) and "serialize" (JSON rendering);
+  the rest of the request is reported as "handler"
+
+Requests get a Server-Timing header (visible in browser dev tools) and every
+request / task is logged as one JSON line. A request sent with
+`X-Profile: <PROFILING_SECRET>` (or `X-Profile: 1` with DEBUG), or a random
+PROFILING_SAMPLE_RATE share of requests and tasks, also runs under a profiler;
+the output is written to PROFILING_DIR (pyinstrument HTML when pyinstrument is
+installed, otherwise a cProfile .prof file for snakeviz / pstats). cProfile
+sees the whole event loop, so concurrent requests show up in an API capture;
+pyinstrument attributes async time correctly.
+
+The profiler hook is interpreter wide, so only one capture runs at a time per
+process; requests and tasks that would start another are timed but not captured.
+
+With PROFILING_ENABLED off nothing is registered and span() is a no-op.
+"""
+import cProfile
+import hmac
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config import (
+    DEBUG,
+    PROFILING_DIR,
+    PROFILING_ENABLED,
+    PROFILING_LOG_MIN_MS,
+    PROFILING_SAMPLE_RATE,
+    PROFILING_SECRET,
+)
+
+CAPTURE_HEADER = b"x-profile"
+SLOW_QUERY_CHARS = 300
+
+_current: ContextVar[Optional["Profile"]] = ContextVar("salescout_profile", default=None)
+
+# Held while a profiler capture is running (see module docstring)
+_capture_lock = threading.Lock()
+
+
+class Profile:
+    """Timings collected for one request or task."""
+
+    def __init__(self, name: str, capture: bool = False, async_mode: bool = False):
+        self.name = name
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.slowest_sql: Optional[str] = None
+        self.slowest_sql_seconds = 0.0
+        self.spans: Dict[str, float] = {}
+        self.capture_path: Optional[str] = None
+        self._capture = None
+        if capture and _capture_lock.acquire(blocking=False):
+            try:
+                self._capture = _start_capture(async_mode)
+            except BaseException:
+                _capture_lock.release()
+                raise
+
+    def record_query(self, statement: str, seconds: float):
+        self.sql_count += 1
+        self.sql_seconds += seconds
+        if seconds > self.slowest_sql_seconds:
+            self.slowest_sql_seconds = seconds
+            self.slowest_sql = statement[:SLOW_QUERY_CHARS]
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        total_ms = self.elapsed() * 1000
+        spans_ms = {name: seconds * 1000 for name, seconds in self.spans.items()}
+        parts = [f'db;dur={self.sql_seconds * 1000:.2f};desc="{self.sql_count} queries"']
+        parts += [f"{name};dur={ms:.2f}" for name, ms in spans_ms.items()]
+        parts.append(f"handler;dur={max(total_ms - sum(spans_ms.values()), 0.0):.2f}")
+        parts.append(f"total;dur={total_ms:.2f}")
+        return ", ".join(parts)
+
+    def log_record(self, **fields) -> dict:
+        record = {
+            "event": "profile",
+            "name": self.name,
+            "duration_ms": round(self.elapsed() * 1000, 2),
+            "sql_count": self.sql_count,
+            "sql_ms": round(self.sql_seconds * 1000, 2),
+            "slowest_sql_ms": round(self.slowest_sql_seconds * 1000, 2),
+            "slowest_sql": self.slowest_sql,
+        }
+        record.update({f"{name}_ms": round(seconds * 1000, 2) for name, seconds in self.spans.items()})
+        record.update(fields)
+        if self.capture_path:
+            record["profile_file"] = self.capture_path
+        return record
+
+
+def current_profile() -> Optional[Profile]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str):
+    """Add the wall time of the block to the current profile's `name` span."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.spans[name] = profile.spans.get(name, 0.0) + time.perf_counter() - started
+
+
+def _start_capture(async_mode: bool):
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+    profiler = Profiler(async_mode="enabled" if async_mode else "disabled")
+    profiler.start()
+    return profiler
+
+
+def _stop_capture(profiler):
+    try:
+        if isinstance(profiler, cProfile.Profile):
+            profiler.disable()
+        else:
+            profiler.stop()
+    finally:
+        _capture_lock.release()
+
+
+def _save_capture(profiler, name: str) -> str:
+    _stop_capture(profiler)
+    os.makedirs(PROFILING_DIR, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_")[:80]
+    stem = os.path.join(PROFILING_DIR, f"{time.strftime('%Y%m%dT%H%M%S')}-{slug}-{uuid.uuid4().hex[:6]}")
+    if isinstance(profiler, cProfile.Profile):
+        path = f"{stem}.prof"
+        profiler.dump_stats(path)
+    else:
+        path = f"{stem}.html"
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(profiler.output_html())
+    return path
+
+
+def start_profile(name: str, capture: bool = False, async_mode: bool = False) -> Tuple[Profile, Token]:
+    """Make a new Profile current; pair with finish_profile()."""
+    profile = Profile(name, capture=capture or random.random() < PROFILING_SAMPLE_RATE, async_mode=async_mode)
+    return profile, _current.set(profile)
+
+
+def finish_profile(profile: Profile, token: Token, **fields):
+    """Stop any capture, emit the JSON log line and restore the previous profile."""
+    try:
+        if profile._capture is not None:
+            profile.capture_path = _save_capture(profile._capture, profile.name)
+        if profile.capture_path or profile.elapsed() * 1000 >= PROFILING_LOG_MIN_MS:
+            print(json.dumps(profile.log_record(**fields)), flush=True)
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("salescout_query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["salescout_query_started"].pop()
+    profile = _current.get()
+    if profile is not None:
+        profile.record_query(statement, time.perf_counter() - started)
+
+
+def instrument_engine(engine):
+    """Attach SQL accounting to a sync Engine (for an AsyncEngine pass engine.sync_engine)."""
+    if engine is None or not PROFILING_ENABLED:
+        return
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _capture_requested(headers) -> bool:
+    """True when the request may ask for a capture: the shared secret, or "1" in DEBUG."""
+    value = next((value for name, value in headers if name == CAPTURE_HEADER), None)
+    if value is None:
+        return False
+    if PROFILING_SECRET:
+        return hmac.compare_digest(value, PROFILING_SECRET.encode())
+    return DEBUG and value == b"1"
+
+
+class ProfilingMiddleware:
+    """ASGI middleware: per-request Profile, Server-Timing header and JSON log line."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not PROFILING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        profile, token = start_profile(
+            f"{scope['method']} {scope['path']}", capture=_capture_requested(scope["headers"]), async_mode=True
+        )
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", profile.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            if route is not None:
+                profile.name = f"{scope['method']} {route.path}"
+            finish_profile(profile, token, kind="request", status=status_code, path=scope["path"])
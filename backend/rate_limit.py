@@ -0,0 +1,147 @@
+"""
+Per-user / per-IP API rate limiting.
+
+Requests are classified into route groups (auth, tracker_write, history_read,
+default) and limited with GCRA (generic cell rate algorithm) in Redis: each
+(group, client) pair keeps a single "theoretical arrival time" key that a Lua
+script checks and advances atomically, so a decision costs one round trip and
+one small key regardless of the window size.
+
+Clients are identified by the JWT subject when a valid bearer token is present
+and by the client IP otherwise. If Redis is unavailable, requests are allowed.
+"""
+import math
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config import RATE_LIMIT_REDIS_URL, RATE_LIMITS
+from auth import decode_access_token
+from serialization import FastJSONResponse
+from utils import TTLCache, get_redis
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# KEYS[1] = bucket key; ARGV[1] = emission interval (ms), ARGV[2] = period (ms)
+# Returns 0 when allowed, otherwise milliseconds until the next request is allowed.
+GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+local emission = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local new_tat = tat + emission
+local wait = new_tat - period - now
+if wait > 0 then return wait end
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+return 0
+"""
+
+# bearer token -> JWT subject, so each token is verified once rather than per request
+_subject_cache = TTLCache(max_size=10000, ttl=300)
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Parse "group=requests/seconds,..." into {group: (emission_ms, period_ms)}.
+
+    Example:
+        "auth=10/60" -> {"auth": (6000, 60000)}
+    """
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        group, rate = item.split("=")
+        count, seconds = rate.split("/")
+        period_ms = int(float(seconds) * 1000)
+        limits[group.strip()] = (max(period_ms // int(count), 1), period_ms)
+    return limits
+
+
+def route_group(method: str, path: str) -> str:
+    """Classify a request into a rate limit group."""
+    if path.startswith(("/auth/login", "/auth/register")):
+        return "auth"
+    if path.startswith("/trackers") and method in WRITE_METHODS:
+        return "tracker_write"
+    if method == "GET" and (path.endswith("/history") or path.startswith("/export")):
+        return "history_read"
+    return "default"
+
+
+def _token_subject(token: str) -> Optional[str]:
+    subject = _subject_cache.get(token)
+    if subject is None:
+        try:
+            subject = decode_access_token(token).get("sub")
+        except HTTPException:
+            return None
+        if subject is None:
+            return None
+        _subject_cache.set(token, subject)
+    return subject
+
+
+def client_key(scope: Scope, group: str) -> str:
+    """Rate limit identity: JWT subject when authenticated, otherwise client IP."""
+    if group != "auth":
+        token = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, credentials = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer":
+                    token = credentials
+                break
+        if token is None and b"token=" in scope.get("query_string", b""):
+            # EventSource clients pass the token as a query parameter
+            for pair in scope["query_string"].decode("latin-1").split("&"):
+                if pair.startswith("token="):
+                    token = pair[len("token="):]
+        if token:
+            subject = _token_subject(token)
+            if subject is not None:
+                return f"user:{subject}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """ASGI middleware enforcing RATE_LIMITS; answers 429 with Retry-After."""
+
+    def __init__(self, app: ASGIApp, redis_url: str = RATE_LIMIT_REDIS_URL, limits: str = RATE_LIMITS):
+        self.app = app
+        self.redis_url = redis_url
+        self.limits = parse_limits(limits)
+        self._script = None
+
+    async def _wait_ms(self, key: str, emission_ms: int, period_ms: int) -> int:
+        if self._script is None:
+            self._script = get_redis(self.redis_url).register_script(GCRA_SCRIPT)
+        try:
+            return int(await self._script(keys=[key], args=[emission_ms, period_ms]))
+        except Exception as exc:  # noqa: BLE001
+            print(f"Rate limiter unavailable, allowing request: {exc}")
+            return 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.redis_url or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        group = route_group(scope["method"], scope["path"])
+        limit = self.limits.get(group)
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        wait_ms = await self._wait_ms(f"ratelimit:{group}:{client_key(scope, group)}", *limit)
+        if wait_ms > 0:
+            response = FastJSONResponse(
+                {"detail": "Too many requests", "code": "rate_limited"},
+                status_code=429,
+                headers={"Retry-After": str(math.ceil(wait_ms / 1000))},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
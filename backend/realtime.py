@@ -0,0 +1,122 @@
+"""
+Real-time price update fan-out over Redis pub/sub.
+
+check_price publishes a compact JSON event to `price-updates:user:<id>` when a
+tracker's price changes. Each API process runs one PriceUpdateHub with a
+single pattern subscription and hands events to the local connections of the
+matching user. Every connection has a bounded queue; when a slow client falls
+behind, the oldest events are dropped (prices are latest-value data).
+"""
+import asyncio
+import json
+from datetime import datetime
+from typing import Dict, Optional, Set
+
+import redis
+
+from config import PRICE_EVENTS_REDIS_URL, STREAM_QUEUE_SIZE
+from utils import get_redis
+
+CHANNEL_PREFIX = "price-updates:user:"
+
+_sync_client: Optional[redis.Redis] = None
+
+
+def publish_price_update_sync(
+    user_id: int,
+    tracker_id: int,
+    price: float,
+    old_price: Optional[float],
+    checked_at: datetime,
+):
+    """Publish a price change event from a Celery task. Failures are logged only."""
+    global _sync_client
+    if not PRICE_EVENTS_REDIS_URL:
+        return
+    event = {
+        "tracker_id": tracker_id,
+        "price": price,
+        "old_price": old_price,
+        "checked_at": checked_at.isoformat(),
+    }
+    try:
+        if _sync_client is None:
+            _sync_client = redis.Redis.from_url(PRICE_EVENTS_REDIS_URL)
+        _sync_client.publish(f"{CHANNEL_PREFIX}{user_id}", json.dumps(event, separators=(",", ":")))
+    except Exception as exc:  # noqa: BLE001
+        print(f"Price update publish failed: {exc}")
+
+
+class PriceUpdateHub:
+    """Per-process fan-out of Redis price events to connected clients."""
+
+    def __init__(self, url: str, queue_size: int):
+        self.url = url
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._reader: Optional[asyncio.Task] = None
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read_loop())
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue):
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    @property
+    def connections(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def _offer(self, queue: asyncio.Queue, data: str):
+        if queue.full():
+            queue.get_nowait()
+            self.dropped += 1
+        queue.put_nowait(data)
+        self.delivered += 1
+
+    def _dispatch(self, channel: str, data: str):
+        try:
+            user_id = int(channel[len(CHANNEL_PREFIX):])
+        except ValueError:
+            return
+        for queue in self._subscribers.get(user_id, ()):
+            self._offer(queue, data)
+
+    async def _read_loop(self):
+        while True:
+            pubsub = get_redis(self.url).pubsub()
+            try:
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None:
+                        self._dispatch(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                print(f"Price update subscription failed, reconnecting: {exc}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.close()
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except (asyncio.CancelledError, Exception):  # noqa: BLE001
+                pass
+            self._reader = None
+
+
+price_hub = PriceUpdateHub(PRICE_EVENTS_REDIS_URL, STREAM_QUEUE_SIZE)
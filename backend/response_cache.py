@@ -0,0 +1,163 @@
+"""
+ETag and Redis-backed response caching for read endpoints.
+
+Every user and tracker has a version counter in Redis. Writes (tracker CRUD in
+the API, check_price in Celery) bump the counters after committing. A cached
+read derives a strong ETag from the request path, the user and the current
+versions of its scopes, so:
+- If-None-Match with the current ETag is answered 304 without touching the DB
+- optionally, the serialized body is stored under the ETag and replayed
+
+Bumps also leave a short-lived "recently written" marker. Responses built from
+the read replica while a marker exists are not cached, because the replica may
+not have replayed the write yet.
+"""
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import redis
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import (
+    RESPONSE_CACHE_REDIS_URL,
+    RESPONSE_CACHE_STORE_BODY,
+    RESPONSE_CACHE_TTL_SECONDS,
+    DB_REPLICA_MAX_LAG_SECONDS,
+    DB_REPLICA_LAG_CHECK_INTERVAL,
+)
+from serialization import FastJSONResponse
+from utils import get_redis
+
+Scope = Tuple[str, int]  # ("user", id) or ("tracker", id)
+
+# Long enough for a replica within the lag budget to have replayed the write
+RECENT_WRITE_SECONDS = int(DB_REPLICA_MAX_LAG_SECONDS + DB_REPLICA_LAG_CHECK_INTERVAL) + 1
+
+_sync_client: Optional[redis.Redis] = None
+
+
+def _version_key(scope: Scope) -> str:
+    return f"cache:ver:{scope[0]}:{scope[1]}"
+
+
+def _recent_key(scope: Scope) -> str:
+    return f"cache:recent:{scope[0]}:{scope[1]}"
+
+
+def _bump_commands(pipe, scopes: Iterable[Scope]):
+    for scope in scopes:
+        pipe.incr(_version_key(scope))
+        pipe.set(_recent_key(scope), 1, ex=RECENT_WRITE_SECONDS)
+
+
+async def bump_versions(*scopes: Scope):
+    """Invalidate cached reads for the given scopes (call after commit)."""
+    if not RESPONSE_CACHE_REDIS_URL:
+        return
+    try:
+        async with get_redis(RESPONSE_CACHE_REDIS_URL).pipeline(transaction=False) as pipe:
+            _bump_commands(pipe, scopes)
+            await pipe.execute()
+    except Exception as exc:  # noqa: BLE001
+        print(f"Response cache bump failed: {exc}")
+
+
+def bump_versions_sync(*scopes: Scope):
+    """Blocking variant of bump_versions for Celery tasks."""
+    global _sync_client
+    if not RESPONSE_CACHE_REDIS_URL:
+        return
+    try:
+        if _sync_client is None:
+            _sync_client = redis.Redis.from_url(RESPONSE_CACHE_REDIS_URL)
+        pipe = _sync_client.pipeline(transaction=False)
+        _bump_commands(pipe, scopes)
+        pipe.execute()
+    except Exception as exc:  # noqa: BLE001
+        print(f"Response cache bump failed: {exc}")
+
+
+class CachedRead:
+    """
+    Result of a cache lookup for one request.
+    
+    Usage in a route:
+        cache = await CachedRead.lookup(request, db, user_id, [("user", user_id)])
+        if cache.response is not None:
+            return cache.response
+        ...build data...
+        return await cache.respond(data)
+    """
+
+    def __init__(self, etag: Optional[str] = None, cacheable: bool = False):
+        self.etag = etag
+        self.cacheable = cacheable
+        self.response: Optional[Response] = None
+
+    @classmethod
+    async def lookup(
+        cls, request: Request, db: AsyncSession, user_id: int, scopes: List[Scope]
+    ) -> "CachedRead":
+        if not RESPONSE_CACHE_REDIS_URL:
+            return cls()
+        client = get_redis(RESPONSE_CACHE_REDIS_URL)
+        try:
+            values = await client.mget(
+                [_version_key(s) for s in scopes] + [_recent_key(s) for s in scopes]
+            )
+        except Exception as exc:  # noqa: BLE001
+            print(f"Response cache lookup failed: {exc}")
+            return cls()
+
+        versions = values[:len(scopes)]
+        recently_written = any(values[len(scopes):])
+        if recently_written and db.info.get("replica"):
+            return cls()
+
+        query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+        fingerprint = f"{request.url.path}?{query}|{user_id}|" + ",".join(v or "0" for v in versions)
+        cache = cls(etag=f'"{hashlib.sha256(fingerprint.encode()).hexdigest()[:32]}"', cacheable=True)
+
+        if cache.etag in _parse_if_none_match(request.headers.get("if-none-match")):
+            cache.response = Response(status_code=304, headers={"ETag": cache.etag})
+            return cache
+
+        if RESPONSE_CACHE_STORE_BODY:
+            try:
+                raw = await client.get(f"cache:body:{cache.etag}")
+            except Exception:  # noqa: BLE001
+                raw = None
+            if raw is not None:
+                stored = json.loads(raw)
+                cache.response = Response(
+                    content=stored["body"],
+                    media_type="application/json",
+                    headers={**stored["headers"], "ETag": cache.etag},
+                )
+        return cache
+
+    async def respond(self, data: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+        """Serialize `data` with orjson, attach the ETag and store the body when enabled."""
+        headers = dict(headers or {})
+        response = FastJSONResponse(content=data, headers=headers)
+        if not self.cacheable:
+            return response
+        response.headers["ETag"] = self.etag
+        if RESPONSE_CACHE_STORE_BODY:
+            try:
+                await get_redis(RESPONSE_CACHE_REDIS_URL).set(
+                    f"cache:body:{self.etag}",
+                    json.dumps({"body": response.body.decode(), "headers": headers}),
+                    ex=RESPONSE_CACHE_TTL_SECONDS,
+                )
+            except Exception as exc:  # noqa: BLE001
+                print(f"Response cache store failed: {exc}")
+        return response
+
+
+def _parse_if_none_match(value: Optional[str]) -> List[str]:
+    if not value:
+        return []
+    return [tag.strip() for tag in value.split(",")]
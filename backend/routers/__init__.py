@@ -4,9 +4,17 @@ Router package initialization.
 from .users import router as users_router
 from .trackers import router as trackers_router
 from .price_history import router as price_history_router
+from .dashboard import router as dashboard_router
+from .stream import router as stream_router
+from .export import router as export_router
+from .alerts import router as alerts_router
 
 __all__ = [
 	"users_router",
 	"trackers_router",
 	"price_history_router",
+	"dashboard_router",
+	"stream_router",
+	"export_router",
+	"alerts_router",
 ]
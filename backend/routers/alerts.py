@@ -0,0 +1,106 @@
+"""
+Alert rule routes: user-defined conditions evaluated in bulk by tasks.alerts.
+"""
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_async_db, get_async_read_db
+from models import AlertRule, Tracker
+from schemas import AlertRuleCreate, AlertRuleResponse, AlertRuleUpdate, UserResponse
+from auth import get_current_identity
+
+router = APIRouter(prefix="/alerts", tags=["Alerts"])
+
+
+@router.get("/rules", response_model=List[AlertRuleResponse])
+async def list_alert_rules(
+    tracker_id: Optional[int] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserResponse = Depends(get_current_identity)
+):
+    """
+    List the current user's alert rules, optionally for one tracker.
+    """
+    stmt = select(AlertRule).where(AlertRule.user_id == current_user.id).order_by(AlertRule.id)
+    if tracker_id is not None:
+        stmt = stmt.where(AlertRule.tracker_id == tracker_id)
+    return (await db.execute(stmt)).scalars().all()
+
+
+@router.post("/rules", response_model=AlertRuleResponse, status_code=status.HTTP_201_CREATED)
+async def create_alert_rule(
+    rule_data: AlertRuleCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_identity)
+):
+    """
+    Create an alert rule on one of the user's trackers.
+    
+    Rules only consider prices checked after they are created.
+    """
+    result = await db.execute(
+        select(Tracker.id).where(
+            Tracker.id == rule_data.tracker_id,
+            Tracker.user_id == current_user.id,
+            Tracker.deleted_at.is_(None)
+        )
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Tracker not found")
+
+    rule = AlertRule(user_id=current_user.id, **rule_data.model_dump())
+    db.add(rule)
+    await db.commit()
+    await db.refresh(rule)
+    return rule
+
+
+@router.put("/rules/{rule_id}", response_model=AlertRuleResponse)
+async def update_alert_rule(
+    rule_id: int,
+    rule_data: AlertRuleUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_identity)
+):
+    """
+    Change an alert rule's threshold, window or active flag.
+    
+    A changed threshold or window is a new condition, so the rule is re-armed.
+    """
+    rule = (await db.execute(
+        select(AlertRule).where(AlertRule.id == rule_id, AlertRule.user_id == current_user.id)
+    )).scalar_one_or_none()
+    if rule is None:
+        raise HTTPException(status_code=404, detail="Alert rule not found")
+
+    for name in ("threshold_pct", "window_days"):
+        value = getattr(rule_data, name)
+        if value is not None and value != getattr(rule, name):
+            setattr(rule, name, value)
+            rule.armed = True
+    if rule_data.active is not None:
+        rule.active = rule_data.active
+
+    await db.commit()
+    await db.refresh(rule)
+    return rule
+
+
+@router.delete("/rules/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_alert_rule(
+    rule_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_identity)
+):
+    """
+    Delete an alert rule.
+    """
+    result = await db.execute(
+        delete(AlertRule).where(AlertRule.id == rule_id, AlertRule.user_id == current_user.id)
+    )
+    await db.commit()
+    if result.rowcount == 0:
+        raise HTTPException(status_code=404, detail="Alert rule not found")
+    return None
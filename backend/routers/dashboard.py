@@ -0,0 +1,127 @@
+"""
+Dashboard route: every tracker with a sparkline and recent price summary.
+
+Sparklines, min/max and the 24h reference price for all of a user's trackers
+are computed by Postgres in one set-based query (window functions + grouped
+aggregates), so the dashboard costs two queries regardless of tracker count.
+"""
+from datetime import datetime, timedelta
+from typing import List
+from fastapi import APIRouter, Depends
+from sqlalchemy import and_, func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import DASHBOARD_SPARKLINE_POINTS, DASHBOARD_WINDOW_DAYS
+from database import get_async_read_db
+from models import Tracker, PriceHistory
+from schemas import DashboardTrackerResponse, TrackerResponse, UserResponse
+from auth import get_current_identity
+from utils import calculate_price_change_percentage
+
+router = APIRouter(prefix="/trackers", tags=["Dashboard"])
+
+
+def _summary_query(user_id: int, now: datetime):
+    """Build the per-tracker sparkline/min/max/24h query for a user's trackers."""
+    since = now - timedelta(days=DASHBOARD_WINDOW_DAYS)
+    cutoff = now - timedelta(hours=24)
+    before_cutoff = PriceHistory.checked_at <= cutoff
+
+    window = (
+        select(
+            PriceHistory.tracker_id,
+            PriceHistory.price,
+            PriceHistory.checked_at,
+            func.ntile(DASHBOARD_SPARKLINE_POINTS).over(
+                partition_by=PriceHistory.tracker_id,
+                order_by=PriceHistory.checked_at,
+            ).label("bucket"),
+            # rank within "before cutoff" / "after cutoff", newest first
+            func.row_number().over(
+                partition_by=(PriceHistory.tracker_id, before_cutoff),
+                order_by=PriceHistory.checked_at.desc(),
+            ).label("side_rank"),
+            before_cutoff.label("before_cutoff"),
+        )
+        .join(Tracker, Tracker.id == PriceHistory.tracker_id)
+        .where(
+            Tracker.user_id == user_id,
+            Tracker.deleted_at.is_(None),
+            PriceHistory.checked_at >= since,
+        )
+        .subquery("h")
+    )
+
+    buckets = (
+        select(
+            window.c.tracker_id,
+            window.c.bucket,
+            func.avg(window.c.price).label("price"),
+        )
+        .group_by(window.c.tracker_id, window.c.bucket)
+        .subquery("b")
+    )
+
+    summary = (
+        select(
+            window.c.tracker_id,
+            func.min(window.c.price).label("min_price"),
+            func.max(window.c.price).label("max_price"),
+            func.max(window.c.price).filter(
+                and_(window.c.before_cutoff, window.c.side_rank == 1)
+            ).label("price_24h_ago"),
+        )
+        .group_by(window.c.tracker_id)
+        .subquery("s")
+    )
+
+    return (
+        select(
+            buckets.c.tracker_id,
+            func.array_agg(aggregate_order_by(buckets.c.price, buckets.c.bucket)).label("sparkline"),
+            summary.c.min_price,
+            summary.c.max_price,
+            summary.c.price_24h_ago,
+        )
+        .join(summary, summary.c.tracker_id == buckets.c.tracker_id)
+        .group_by(
+            buckets.c.tracker_id,
+            summary.c.min_price,
+            summary.c.max_price,
+            summary.c.price_24h_ago,
+        )
+    )
+
+
+@router.get("/dashboard", response_model=List[DashboardTrackerResponse])
+async def get_dashboard(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserResponse = Depends(get_current_identity)
+):
+    """
+    List all trackers with a fixed-size sparkline, 24h change and min/max
+    over the last DASHBOARD_WINDOW_DAYS days, in a single round trip.
+    """
+    trackers = (await db.execute(
+        select(Tracker).where(Tracker.user_id == current_user.id, Tracker.deleted_at.is_(None))
+    )).scalars().all()
+    summaries = {
+        row.tracker_id: row
+        for row in await db.execute(_summary_query(current_user.id, datetime.utcnow()))
+    }
+
+    response = []
+    for tracker in trackers:
+        row = summaries.get(tracker.id)
+        change = None
+        if row is not None and row.price_24h_ago is not None and tracker.last_price is not None:
+            change = calculate_price_change_percentage(row.price_24h_ago, tracker.last_price)
+        response.append(DashboardTrackerResponse(
+            **TrackerResponse.model_validate(tracker).model_dump(),
+            sparkline=[round(float(p), 2) for p in row.sparkline] if row is not None else [],
+            change_24h_pct=change,
+            min_price=row.min_price if row is not None else None,
+            max_price=row.max_price if row is not None else None,
+        ))
+    return response
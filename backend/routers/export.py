@@ -0,0 +1,96 @@
+"""
+Routes for exporting price history as NDJSON or CSV.
+
+Rows are read through a server-side cursor (stream_results / yield_per) and
+written straight into a StreamingResponse one batch at a time, so memory use
+stays constant however long the history is. No ORM objects or Pydantic models
+are built per row.
+"""
+import csv
+import io
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator, List, Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from fastapi.security.http import HTTPAuthorizationCredentials
+from sqlalchemy import select
+
+from config import EXPORT_BATCH_SIZE
+from database import AsyncSessionLocal, open_read_session
+from models import Tracker, PriceHistory
+from auth import resolve_identity, security
+from serialization import dumps
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+EXPORT_COLUMNS = ("tracker_id", "product_title", "checked_at", "price")
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+def _export_query(user_id: int, tracker_ids: Optional[List[int]]):
+    stmt = (
+        select(PriceHistory.tracker_id, Tracker.product_title, PriceHistory.checked_at, PriceHistory.price)
+        .join(Tracker, Tracker.id == PriceHistory.tracker_id)
+        .where(Tracker.user_id == user_id, Tracker.deleted_at.is_(None))
+        .order_by(PriceHistory.tracker_id, PriceHistory.checked_at)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    if tracker_ids:
+        stmt = stmt.where(PriceHistory.tracker_id.in_(tracker_ids))
+    return stmt
+
+
+def _ndjson_chunk(rows) -> bytes:
+    return b"".join(dumps(row._asdict()) + b"\n" for row in rows)
+
+
+def _csv_chunk(rows, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows((row.tracker_id, row.product_title, row.checked_at.isoformat(), row.price) for row in rows)
+    return buffer.getvalue()
+
+
+async def _stream_rows(user_id: int, tracker_ids: Optional[List[int]], fmt: ExportFormat) -> AsyncIterator:
+    # The generator owns its session so the cursor lives exactly as long as the stream
+    db = await open_read_session()
+    try:
+        if fmt is ExportFormat.csv:
+            yield _csv_chunk([], header=True)
+        result = await db.stream(_export_query(user_id, tracker_ids))
+        async for rows in result.partitions():
+            yield _csv_chunk(rows) if fmt is ExportFormat.csv else _ndjson_chunk(rows)
+    finally:
+        await db.close()
+
+
+@router.get("/history")
+async def export_price_history(
+    format: ExportFormat = Query(ExportFormat.ndjson),
+    tracker_id: Optional[List[int]] = Query(None, description="Tracker IDs; defaults to all of the user's trackers"),
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+):
+    """
+    Export price history for one, several or all of the user's trackers.
+    
+    - **format**: `ndjson` (one JSON object per line) or `csv`
+    - **tracker_id**: repeat to select trackers; omit to export everything
+    """
+    # Short-lived session: get_current_identity's session would stay open until the stream ends
+    async with AsyncSessionLocal() as db:
+        current_user = await resolve_identity(credentials.credentials, db)
+
+    media_type = "application/x-ndjson" if format is ExportFormat.ndjson else "text/csv"
+    filename = f"salescout-history-{datetime.utcnow():%Y%m%d%H%M%S}.{format.value}"
+    return StreamingResponse(
+        _stream_rows(current_user.id, tracker_id, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,38 +1,196 @@
 """
 Routes for price history retrieval.
+
+History is served newest first and is always bounded:
+- keyset pagination on (checked_at, id) via `limit` and an opaque `cursor`
+  (the next cursor is returned in the X-Next-Cursor header)
+- optional `from` / `to` range filters
+- `points=N` returns a downsample of the whole range instead of a page: Postgres
+  splits the range into N buckets and returns only each bucket's first, last,
+  lowest and highest row (M4), then LTTB trims those candidates to N points
+
+Entries are plain dicts built from column tuples and encoded with orjson; the
+response_model documents the shape without re-validating every row.
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import base64
+import binascii
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import func, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db
-from models import Tracker, PriceHistory, User
-from schemas import PriceHistoryResponse
-from auth import get_current_user
+from config import HISTORY_PAGE_DEFAULT, HISTORY_PAGE_MAX, HISTORY_POINTS_MAX
+from database import get_async_read_db
+from models import Tracker, PriceHistory
+from schemas import PriceHistoryResponse, UserResponse
+from auth import get_current_identity
+from utils import lttb_indices
+from response_cache import CachedRead
 
 router = APIRouter(prefix="/trackers", tags=["Price History"])
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(checked_at: datetime, history_id: int) -> str:
+    """Encode the position after a history row as an opaque cursor."""
+    raw = f"{checked_at.isoformat()}|{history_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor or raise 400."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        checked_at, history_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(checked_at), int(history_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """checked_at is stored as naive UTC; normalize aware query datetimes to match."""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _history_columns(tracker_id: int, start: Optional[datetime], end: Optional[datetime]):
+    """Select plain history columns for a tracker within an optional time range."""
+    stmt = select(
+        PriceHistory.id, PriceHistory.tracker_id, PriceHistory.price, PriceHistory.checked_at
+    ).where(PriceHistory.tracker_id == tracker_id)
+    start, end = to_naive_utc(start), to_naive_utc(end)
+    if start is not None:
+        stmt = stmt.where(PriceHistory.checked_at >= start)
+    if end is not None:
+        stmt = stmt.where(PriceHistory.checked_at <= end)
+    return stmt
+
+
+async def load_history_page(
+    db: AsyncSession,
+    tracker_id: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Load one page of history, newest first.
+    
+    Returns:
+        (entries, next_cursor) where next_cursor is None on the last page
+    """
+    stmt = _history_columns(tracker_id, start, end)
+    if cursor:
+        cursor_at, cursor_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(PriceHistory.checked_at, PriceHistory.id) < tuple_(cursor_at, cursor_id)
+        )
+    stmt = stmt.order_by(PriceHistory.checked_at.desc(), PriceHistory.id.desc()).limit(limit + 1)
+    rows = (await db.execute(stmt)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].checked_at, rows[-1].id)
+    return [row._asdict() for row in rows], next_cursor
+
+
+async def load_downsampled_history(
+    db: AsyncSession,
+    tracker_id: int,
+    points: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[Dict]:
+    """
+    Load the history range reduced to at most `points` entries, newest first.
+    
+    Bucketing happens in SQL (ntile over the range; first, last, min and max
+    price row per bucket), so at most 4 * points rows leave the database however
+    long the history is; LTTB then picks the final points from those candidates.
+    """
+    bucketed = _history_columns(tracker_id, start, end).add_columns(
+        func.ntile(points).over(
+            order_by=(PriceHistory.checked_at, PriceHistory.id)
+        ).label("bucket")
+    ).subquery("h")
+    bucket = bucketed.c.bucket
+    ranked = select(
+        bucketed.c.id,
+        bucketed.c.tracker_id,
+        bucketed.c.price,
+        bucketed.c.checked_at,
+        func.row_number().over(
+            partition_by=bucket, order_by=(bucketed.c.checked_at.asc(), bucketed.c.id.asc())
+        ).label("first_rank"),
+        func.row_number().over(
+            partition_by=bucket, order_by=(bucketed.c.checked_at.desc(), bucketed.c.id.desc())
+        ).label("last_rank"),
+        func.row_number().over(
+            partition_by=bucket, order_by=(bucketed.c.price.asc(), bucketed.c.checked_at)
+        ).label("low_rank"),
+        func.row_number().over(
+            partition_by=bucket, order_by=(bucketed.c.price.desc(), bucketed.c.checked_at)
+        ).label("high_rank"),
+    ).subquery("r")
+    stmt = (
+        select(ranked.c.id, ranked.c.tracker_id, ranked.c.price, ranked.c.checked_at)
+        .where(or_(
+            ranked.c.first_rank == 1, ranked.c.last_rank == 1, ranked.c.low_rank == 1, ranked.c.high_rank == 1
+        ))
+        .order_by(ranked.c.checked_at.asc(), ranked.c.id.asc())
+    )
+    rows = (await db.execute(stmt)).all()
+    xs = [row.checked_at.timestamp() for row in rows]
+    ys = [row.price for row in rows]
+    keep = lttb_indices(xs, ys, points)
+    return [rows[i]._asdict() for i in reversed(keep)]
+
 
 @router.get("/{tracker_id}/history", response_model=List[PriceHistoryResponse])
-def get_price_history(
+async def get_price_history(
     tracker_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    limit: int = Query(HISTORY_PAGE_DEFAULT, ge=1, le=HISTORY_PAGE_MAX),
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    points: Optional[int] = Query(
+        None, ge=2, le=HISTORY_POINTS_MAX, description="Downsample the range to at most N points"
+    ),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserResponse = Depends(get_current_identity)
 ):
     """
     Get price history entries for a tracker owned by the current user.
+    
+    - **limit** / **cursor**: page through history newest first
+    - **from** / **to**: restrict to a time range
+    - **points**: return a shape-preserving downsample of the range (ignores limit/cursor)
+    
+    Supports ETag / If-None-Match.
     """
-    tracker = db.query(Tracker).filter(
-        Tracker.id == tracker_id,
-        Tracker.user_id == current_user.id
-    ).first()
-    if not tracker:
-        raise HTTPException(status_code=404, detail="Tracker not found")
+    cache = await CachedRead.lookup(request, db, current_user.id, [("tracker", tracker_id)])
+    if cache.response is not None:
+        return cache.response
 
-    history = (
-        db.query(PriceHistory)
-        .filter(PriceHistory.tracker_id == tracker.id)
-        .order_by(PriceHistory.checked_at.desc())
-        .all()
+    result = await db.execute(
+        select(Tracker.id).where(
+            Tracker.id == tracker_id,
+            Tracker.user_id == current_user.id,
+            Tracker.deleted_at.is_(None)
+        )
     )
-    return [PriceHistoryResponse.model_validate(h) for h in history]
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Tracker not found")
+
+    if points is not None:
+        return await cache.respond(await load_downsampled_history(db, tracker_id, points, start, end))
+
+    history, next_cursor = await load_history_page(db, tracker_id, limit, cursor, start, end)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return await cache.respond(history, headers=headers)
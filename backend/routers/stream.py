@@ -0,0 +1,63 @@
+"""
+Streaming routes: real-time price updates over Server-Sent Events.
+"""
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPBearer
+from fastapi.security.http import HTTPAuthorizationCredentials
+
+from config import STREAM_HEARTBEAT_SECONDS
+from database import AsyncSessionLocal
+from auth import resolve_identity
+from realtime import price_hub
+
+router = APIRouter(prefix="/stream", tags=["Stream"])
+
+optional_security = HTTPBearer(auto_error=False)
+
+
+@router.get("/prices")
+async def stream_price_updates(
+    request: Request,
+    token: Optional[str] = Query(None, description="JWT, for clients such as EventSource that cannot set headers"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+):
+    """
+    Stream price changes for the current user's trackers as Server-Sent Events.
+    
+    Each event is `event: price` with JSON data
+    `{"tracker_id", "price", "old_price", "checked_at"}`. A comment line is sent
+    every STREAM_HEARTBEAT_SECONDS to keep proxies from closing the connection.
+    """
+    raw_token = credentials.credentials if credentials else token
+    if not raw_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    # Short-lived session: the stream must not pin a pooled connection
+    async with AsyncSessionLocal() as db:
+        user = await resolve_identity(raw_token, db)
+
+    async def event_stream():
+        queue = price_hub.subscribe(user.id)
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    data = await asyncio.wait_for(queue.get(), timeout=STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield f"event: price\ndata: {data}\n\n"
+        finally:
+            price_hub.unsubscribe(user.id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,40 +1,169 @@
 """
 Tracker routes for managing product price tracking.
 """
-from datetime import datetime
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import csv
+import io
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import APIRouter, Body, Depends, File, HTTPException, Query, Request, UploadFile, status
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db
-from models import Tracker, PriceHistory, User
+from config import (
+    PURGE_SYNC_MAX_ROWS,
+    HISTORY_DETAIL_POINTS,
+    HISTORY_POINTS_MAX,
+    BULK_IMPORT_MAX_ITEMS,
+    BULK_IMPORT_SPREAD_MINUTES,
+)
+from database import get_async_db, get_async_read_db
+from models import Tracker, PriceHistory
 from schemas import (
     TrackerCreate,
     TrackerUpdate,
     TrackerResponse,
     TrackerDetailResponse,
-    PriceHistoryResponse,
+    TrackerStatsResponse,
+    TrackerBulkImportError,
+    TrackerBulkImportResponse,
+    UserResponse,
 )
-from auth import get_current_user
+from auth import get_current_identity
+from utils import canonicalize_product_url
+from routers.price_history import load_downsampled_history
+from analytics import get_tracker_stats, get_trackers_stats
+from response_cache import CachedRead, bump_versions
+from tasks.purge import purge_tracker
 
 router = APIRouter(prefix="/trackers", tags=["Trackers"])
 
+# Columns backing TrackerResponse, selected as plain tuples for list responses
+TRACKER_RESPONSE_COLUMNS = [getattr(Tracker, name) for name in TrackerResponse.model_fields]
+
+
+async def _get_owned_tracker(db: AsyncSession, tracker_id: int, user_id: int) -> Tracker:
+    """Load a tracker owned by the given user or raise 404."""
+    result = await db.execute(
+        select(Tracker).where(
+            Tracker.id == tracker_id,
+            Tracker.user_id == user_id,
+            Tracker.deleted_at.is_(None)
+        )
+    )
+    tracker = result.scalar_one_or_none()
+    if not tracker:
+        raise HTTPException(status_code=404, detail="Tracker not found")
+    return tracker
+
+
+async def has_large_history(db: AsyncSession, *criteria) -> bool:
+    """
+    Check whether the price history matching `criteria` exceeds PURGE_SYNC_MAX_ROWS.
+    Probes a single row past the limit instead of counting everything.
+    """
+    result = await db.execute(
+        select(PriceHistory.id)
+        .join(Tracker, Tracker.id == PriceHistory.tracker_id)
+        .where(*criteria)
+        .offset(PURGE_SYNC_MAX_ROWS)
+        .limit(1)
+    )
+    return result.first() is not None
+
+
+def _first_check_times(count: int, now: datetime) -> List[datetime]:
+    """Spread the first checks of `count` new trackers evenly over BULK_IMPORT_SPREAD_MINUTES."""
+    step = timedelta(minutes=BULK_IMPORT_SPREAD_MINUTES) / max(count, 1)
+    return [now + step * i for i in range(count)]
+
+
+async def import_trackers(
+    db: AsyncSession,
+    user_id: int,
+    entries: List[Tuple[int, Dict[str, Any]]],
+) -> TrackerBulkImportResponse:
+    """
+    Validate, deduplicate and insert (row number, raw fields) entries for a user.
+    
+    URLs are canonicalized and compared against the user's existing trackers and
+    each other; the remaining rows are written with a single INSERT ... RETURNING.
+    First checks are staggered via next_check_at and picked up by the beat.
+    """
+    result = TrackerBulkImportResponse()
+    existing = await db.execute(
+        select(Tracker.product_url).where(Tracker.user_id == user_id, Tracker.deleted_at.is_(None))
+    )
+    seen = {canonicalize_product_url(url) for url in existing.scalars()}
+
+    accepted = []
+    for row, fields in entries:
+        try:
+            data = TrackerCreate.model_validate(fields)
+        except ValidationError as exc:
+            error = exc.errors()[0]
+            location = ".".join(str(part) for part in error["loc"])
+            result.errors.append(TrackerBulkImportError(row=row, detail=f"{location}: {error['msg']}"))
+            continue
+        url = canonicalize_product_url(data.product_url)
+        if url in seen:
+            result.duplicates.append(url)
+            continue
+        seen.add(url)
+        accepted.append((url, data))
+
+    if not accepted:
+        return result
+
+    now = datetime.utcnow()
+    values = [
+        {
+            "user_id": user_id,
+            "product_url": url,
+            "product_title": "Pending title fetch",
+            "target_price": data.target_price,
+            "polling_interval_minutes": data.polling_interval_minutes,
+            "active": True,
+            "next_check_at": check_at,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for (url, data), check_at in zip(accepted, _first_check_times(len(accepted), now))
+    ]
+    created = await db.execute(insert(Tracker).values(values).returning(*TRACKER_RESPONSE_COLUMNS))
+    result.created = [TrackerResponse.model_validate(row._asdict()) for row in created]
+    await db.commit()
+    await bump_versions(("user", user_id))
+    return result
+
 
 @router.get("", response_model=List[TrackerResponse])
-def list_trackers(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def list_trackers(
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserResponse = Depends(get_current_identity)
 ):
-    """List all trackers for the current user."""
-    trackers = db.query(Tracker).filter(Tracker.user_id == current_user.id).all()
-    return [TrackerResponse.model_validate(t) for t in trackers]
+    """
+    List all trackers for the current user. Supports ETag / If-None-Match.
+    
+    Fetches column tuples instead of ORM entities and encodes them with orjson.
+    """
+    cache = await CachedRead.lookup(request, db, current_user.id, [("user", current_user.id)])
+    if cache.response is not None:
+        return cache.response
+
+    result = await db.execute(
+        select(*TRACKER_RESPONSE_COLUMNS)
+        .where(Tracker.user_id == current_user.id, Tracker.deleted_at.is_(None))
+    )
+    return await cache.respond([row._asdict() for row in result])
 
 
 @router.post("", response_model=TrackerResponse, status_code=status.HTTP_201_CREATED)
-def create_tracker(
+async def create_tracker(
     tracker_data: TrackerCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_identity)
 ):
     """
     Create a new tracker for a product URL.
@@ -44,7 +173,7 @@ def create_tracker(
     placeholder_title = "Pending title fetch"
     new_tracker = Tracker(
         user_id=current_user.id,
-        product_url=tracker_data.product_url,
+        product_url=canonicalize_product_url(tracker_data.product_url),
         product_title=placeholder_title,
         image_url=None,
         target_price=tracker_data.target_price,
@@ -54,57 +183,123 @@ def create_tracker(
         last_checked_at=None,
     )
     db.add(new_tracker)
-    db.commit()
-    db.refresh(new_tracker)
+    await db.commit()
+    await db.refresh(new_tracker)
+    await bump_versions(("user", current_user.id))
     return TrackerResponse.model_validate(new_tracker)
 
 
+@router.post("/bulk", response_model=TrackerBulkImportResponse, status_code=status.HTTP_201_CREATED)
+async def bulk_create_trackers(
+    entries: List[Dict[str, Any]] = Body(..., max_length=BULK_IMPORT_MAX_ITEMS),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_identity)
+):
+    """
+    Create many trackers from a JSON array of tracker objects
+    (`product_url`, `target_price`, optional `polling_interval_minutes`).
+    
+    Invalid entries and URLs already tracked are reported instead of failing the
+    whole import. First price checks are spread over the next few minutes.
+    """
+    return await import_trackers(db, current_user.id, list(enumerate(entries, start=1)))
+
+
+@router.post("/bulk/csv", response_model=TrackerBulkImportResponse, status_code=status.HTTP_201_CREATED)
+async def bulk_create_trackers_csv(
+    file: UploadFile = File(..., description="CSV with a header row: product_url,target_price[,polling_interval_minutes]"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_identity)
+):
+    """
+    Create many trackers from an uploaded CSV file. Same semantics as `POST /trackers/bulk`.
+    """
+    try:
+        text = (await file.read()).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="CSV must be UTF-8 encoded")
+
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames or "product_url" not in reader.fieldnames:
+        raise HTTPException(status_code=400, detail="CSV header must include product_url and target_price")
+
+    entries = []
+    for row, fields in enumerate(reader, start=1):
+        if row > BULK_IMPORT_MAX_ITEMS:
+            raise HTTPException(status_code=413, detail=f"At most {BULK_IMPORT_MAX_ITEMS} trackers per import")
+        # Empty optional cells fall back to schema defaults
+        entries.append((row, {key: value for key, value in fields.items() if key and value not in (None, "")}))
+    return await import_trackers(db, current_user.id, entries)
+
+
+@router.get("/stats", response_model=List[TrackerStatsResponse])
+async def get_trackers_statistics(
+    ids: Optional[List[int]] = Query(None, description="Tracker IDs; defaults to all of the user's trackers"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserResponse = Depends(get_current_identity)
+):
+    """
+    Get price statistics for several trackers in one request.
+    """
+    stmt = select(Tracker).where(Tracker.user_id == current_user.id, Tracker.deleted_at.is_(None))
+    if ids:
+        stmt = stmt.where(Tracker.id.in_(ids))
+    trackers = (await db.execute(stmt)).scalars().all()
+    stats = await get_trackers_stats(db, trackers)
+    return [TrackerStatsResponse(tracker_id=tracker_id, stats=s) for tracker_id, s in stats.items()]
+
+
 @router.get("/{tracker_id}", response_model=TrackerDetailResponse)
-def get_tracker(
+async def get_tracker(
     tracker_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    points: int = Query(
+        HISTORY_DETAIL_POINTS, ge=2, le=HISTORY_POINTS_MAX,
+        description="Maximum number of history points (downsampled)"
+    ),
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserResponse = Depends(get_current_identity)
 ):
     """
     Get tracker details including price history.
+    
+    History is newest first and downsampled to at most **points** entries;
+    use `GET /trackers/{id}/history` for raw pages. Supports ETag / If-None-Match.
     """
-    tracker = db.query(Tracker).filter(
-        Tracker.id == tracker_id,
-        Tracker.user_id == current_user.id
-    ).first()
-    if not tracker:
-        raise HTTPException(status_code=404, detail="Tracker not found")
+    cache = await CachedRead.lookup(request, db, current_user.id, [("tracker", tracker_id)])
+    if cache.response is not None:
+        return cache.response
 
-    # Load price history ordered by newest first
-    history = (
-        db.query(PriceHistory)
-        .filter(PriceHistory.tracker_id == tracker.id)
-        .order_by(PriceHistory.checked_at.desc())
-        .all()
-    )
+    tracker = await _get_owned_tracker(db, tracker_id, current_user.id)
+    history = await load_downsampled_history(db, tracker.id, points, start, end)
+    stats = await get_tracker_stats(db, tracker)
 
-    tracker.price_history = history  # attach for response
-    return TrackerDetailResponse.model_validate(tracker)
+    # Build the response explicitly; assigning the relationship would trigger a lazy load
+    return await cache.respond({
+        **TrackerResponse.model_validate(tracker).model_dump(),
+        "price_history": history,
+        "stats": stats,
+    })
 
 
 @router.put("/{tracker_id}", response_model=TrackerResponse)
-def update_tracker(
+async def update_tracker(
     tracker_id: int,
     tracker_data: TrackerUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_identity)
 ):
     """
     Update tracker settings (target price, polling interval, active state).
     """
-    tracker = db.query(Tracker).filter(
-        Tracker.id == tracker_id,
-        Tracker.user_id == current_user.id
-    ).first()
-    if not tracker:
-        raise HTTPException(status_code=404, detail="Tracker not found")
+    tracker = await _get_owned_tracker(db, tracker_id, current_user.id)
 
     if tracker_data.target_price is not None:
+        if tracker_data.target_price != tracker.target_price:
+            # A new target is a new condition; let it alert again
+            tracker.target_alert_armed = True
         tracker.target_price = tracker_data.target_price
     if tracker_data.polling_interval_minutes is not None:
         tracker.polling_interval_minutes = tracker_data.polling_interval_minutes
@@ -112,27 +307,35 @@ def update_tracker(
         tracker.active = tracker_data.active
 
     tracker.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(tracker)
+    await db.commit()
+    await db.refresh(tracker)
+    await bump_versions(("user", current_user.id), ("tracker", tracker.id))
     return TrackerResponse.model_validate(tracker)
 
 
 @router.delete("/{tracker_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_tracker(
+async def delete_tracker(
     tracker_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_identity)
 ):
     """
     Delete a tracker and its price history.
+    
+    History is removed by the database (ON DELETE CASCADE). Trackers with very
+    large histories are hidden immediately and purged in the background.
     """
-    tracker = db.query(Tracker).filter(
-        Tracker.id == tracker_id,
-        Tracker.user_id == current_user.id
-    ).first()
-    if not tracker:
-        raise HTTPException(status_code=404, detail="Tracker not found")
+    tracker = await _get_owned_tracker(db, tracker_id, current_user.id)
+
+    if await has_large_history(db, Tracker.id == tracker.id):
+        tracker.active = False
+        tracker.deleted_at = datetime.utcnow()
+        await db.commit()
+        await bump_versions(("user", current_user.id), ("tracker", tracker.id))
+        purge_tracker.delay(tracker.id)
+        return None
 
-    db.delete(tracker)
-    db.commit()
+    await db.execute(delete(Tracker).where(Tracker.id == tracker.id))
+    await db.commit()
+    await bump_versions(("user", current_user.id), ("tracker", tracker.id))
     return None
@@ -2,19 +2,30 @@
 User and authentication routes for SaleScout API.
 Handles user registration, login, and profile management.
 """
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db
-from models import User
-from schemas import UserCreate, UserLogin, UserResponse, TokenResponse
-from auth import hash_password, authenticate_user, create_access_token, get_current_user
+from database import get_async_db
+from models import Tracker, User
+from schemas import UserCreate, UserLogin, UserPreferencesUpdate, UserResponse, TokenResponse
+from auth import (
+    hash_password_async,
+    authenticate_user,
+    create_access_token,
+    get_current_user,
+    get_current_identity,
+    invalidate_user_auth,
+)
+from routers.trackers import has_large_history
+from tasks.purge import purge_user
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
-def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user account.
     
@@ -24,23 +35,24 @@ def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
     Returns JWT token and user info upon successful registration.
     """
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    result = await db.execute(select(User).where(User.email == user_data.email))
+    existing_user = result.scalar_one_or_none()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    # Create new user
-    hashed_password = hash_password(user_data.password)
+    # Create new user (bcrypt runs on the dedicated hashing pool)
+    hashed_password = await hash_password_async(user_data.password)
     new_user = User(
         email=user_data.email,
         password_hash=hashed_password
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     # Generate access token
     access_token = create_access_token(data={"sub": new_user.email})
@@ -53,7 +65,7 @@ def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse)
-def login_user(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login_user(user_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """
     Login with email and password.
     
@@ -62,7 +74,7 @@ def login_user(user_data: UserLogin, db: Session = Depends(get_db)):
     
     Returns JWT token and user info upon successful authentication.
     """
-    user = authenticate_user(db, user_data.email, user_data.password)
+    user = await authenticate_user(db, user_data.email, user_data.password)
     
     if not user:
         raise HTTPException(
@@ -82,26 +94,63 @@ def login_user(user_data: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: UserResponse = Depends(get_current_identity)):
     """
     Get current authenticated user's information.
     
     Requires authentication (JWT token in Authorization header).
     """
+    return current_user
+
+
+@router.put("/me/preferences", response_model=UserResponse)
+async def update_preferences(
+    preferences: UserPreferencesUpdate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Update notification preferences.
+    
+    - **alert_delivery**: `immediate` sends every alert as it happens; `digest` combines
+      alerts into one email per window
+    """
+    current_user.alert_delivery = preferences.alert_delivery
+    current_user.updated_at = datetime.utcnow()
+    await db.commit()
+    await db.refresh(current_user)
+    await invalidate_user_auth(current_user.id)
     return UserResponse.model_validate(current_user)
 
 
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user_account(
+async def delete_user_account(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete the current user's account.
     
     This will also delete all associated trackers and price history (cascade delete).
+    Accounts with very large histories are disabled immediately and purged in the background.
     Requires authentication.
     """
-    db.delete(current_user)
-    db.commit()
+    if await has_large_history(db, Tracker.user_id == current_user.id):
+        now = datetime.utcnow()
+        current_user.deleted_at = now
+        # Free the (unique) email right away so it can register again before the purge runs
+        current_user.email = f"deleted-{current_user.id}-{int(now.timestamp())}@deleted.invalid"
+        await db.execute(
+            update(Tracker)
+            .where(Tracker.user_id == current_user.id)
+            .values(active=False, deleted_at=now)
+        )
+        await db.commit()
+        await invalidate_user_auth(current_user.id)
+        purge_user.delay(current_user.id)
+        return None
+
+    await db.execute(delete(User).where(User.id == current_user.id))
+    await db.commit()
+    await invalidate_user_auth(current_user.id)
     return None
@@ -3,8 +3,8 @@ Pydantic schemas for request/response validation.
 These ensure type safety and automatic API documentation.
 """
 from datetime import datetime
-from typing import Optional, List
-from pydantic import BaseModel, EmailStr, Field
+from typing import Literal, Optional, List
+from pydantic import BaseModel, EmailStr, Field, model_validator
 
 
 # ============================================================================
@@ -26,9 +26,18 @@ class UserLogin(UserBase):
     password: str
 
 
+AlertDelivery = Literal["immediate", "digest"]
+
+
+class UserPreferencesUpdate(BaseModel):
+    """Schema for updating notification preferences."""
+    alert_delivery: AlertDelivery = Field(..., description="Send each alert at once or combine them into a digest")
+
+
 class UserResponse(UserBase):
     """Schema for user response (no password)."""
     id: int
+    alert_delivery: AlertDelivery = "immediate"
     created_at: datetime
     updated_at: datetime
 
@@ -60,6 +69,29 @@ class PriceHistoryResponse(PriceHistoryBase):
         from_attributes = True
 
 
+# ============================================================================
+# Price Statistics Schemas
+# ============================================================================
+
+class PriceStatsResponse(BaseModel):
+    """Schema for computed tracker price statistics."""
+    sample_count: int
+    current_price: Optional[float] = None
+    all_time_low: Optional[float] = None
+    all_time_high: Optional[float] = None
+    moving_avg_7d: Optional[float] = None
+    moving_avg_30d: Optional[float] = None
+    volatility_30d: Optional[float] = Field(None, description="Std. dev. of log returns over 30 days, in percent")
+    buy_score: Optional[int] = Field(None, ge=0, le=100, description="Higher means a better time to buy")
+    computed_through: Optional[datetime] = None
+
+
+class TrackerStatsResponse(BaseModel):
+    """Schema for one entry of the batch statistics endpoint."""
+    tracker_id: int
+    stats: PriceStatsResponse
+
+
 # ============================================================================
 # Tracker Schemas
 # ============================================================================
@@ -102,8 +134,80 @@ class TrackerResponse(TrackerBase):
 
 
 class TrackerDetailResponse(TrackerResponse):
-    """Extended tracker response with price history."""
+    """Extended tracker response with price history and statistics."""
     price_history: List[PriceHistoryResponse] = []
+    stats: Optional[PriceStatsResponse] = None
+
+    class Config:
+        from_attributes = True
+
+
+class TrackerBulkImportError(BaseModel):
+    """One rejected entry of a bulk import."""
+    row: int = Field(..., description="1-based position in the submitted list or CSV data rows")
+    detail: str
+
+
+class TrackerBulkImportResponse(BaseModel):
+    """Schema for the result of a bulk tracker import."""
+    created: List[TrackerResponse] = []
+    duplicates: List[str] = Field(default_factory=list, description="Canonical URLs already tracked or repeated")
+    errors: List[TrackerBulkImportError] = []
+
+
+class DashboardTrackerResponse(TrackerResponse):
+    """Tracker with a compact price summary for dashboard cards."""
+    sparkline: List[float] = Field(default_factory=list, description="Bucket-averaged prices, oldest first")
+    change_24h_pct: Optional[float] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+
+
+# ============================================================================
+# Alert Rule Schemas
+# ============================================================================
+
+AlertRuleKind = Literal["percent_drop", "all_time_low", "back_in_stock"]
+
+
+class AlertRuleCreate(BaseModel):
+    """
+    Schema for creating an alert rule.
+    
+    - percent_drop: needs threshold_pct and window_days (drop from the window's high)
+    - all_time_low: optional threshold_pct as the minimum margin below the previous low
+    - back_in_stock: no parameters
+    """
+    tracker_id: int
+    kind: AlertRuleKind
+    threshold_pct: Optional[float] = Field(None, gt=0, le=100)
+    window_days: Optional[int] = Field(None, ge=1, le=365)
+
+    @model_validator(mode="after")
+    def check_parameters(self):
+        if self.kind == "percent_drop" and (self.threshold_pct is None or self.window_days is None):
+            raise ValueError("percent_drop rules need threshold_pct and window_days")
+        return self
+
+
+class AlertRuleUpdate(BaseModel):
+    """Schema for updating an alert rule; omitted fields are left unchanged."""
+    threshold_pct: Optional[float] = Field(None, gt=0, le=100)
+    window_days: Optional[int] = Field(None, ge=1, le=365)
+    active: Optional[bool] = None
+
+
+class AlertRuleResponse(BaseModel):
+    """Schema for alert rule response."""
+    id: int
+    tracker_id: int
+    kind: AlertRuleKind
+    threshold_pct: Optional[float]
+    window_days: Optional[int]
+    active: bool
+    armed: bool
+    last_fired_at: Optional[datetime]
+    created_at: datetime
 
     class Config:
         from_attributes = True
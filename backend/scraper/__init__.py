@@ -1,10 +1,12 @@
 """
 Scraper package exports.
 """
-from .amazon_scraper import scrape_amazon, scrape_amazon_playwright
-from .flipkart_scraper import scrape_flipkart
+from .amazon_scraper import parse_amazon_page, scrape_amazon, scrape_amazon_playwright
+from .flipkart_scraper import parse_flipkart_page, scrape_flipkart
 
 __all__ = [
+    "parse_amazon_page",
+    "parse_flipkart_page",
     "scrape_amazon",
     "scrape_amazon_playwright",
     "scrape_flipkart",
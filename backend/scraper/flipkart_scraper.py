@@ -34,7 +34,7 @@ def _fetch_html(url: str) -> str:
     raise FlipkartScrapeError(f"Failed to fetch URL after retries: {last_exc}")
 
 
-def _extract_title(soup: BeautifulSoup) -> Optional[str]:
+def _extract_title(soup: BeautifulSoup, matched: Optional[Dict[str, str]] = None) -> Optional[str]:
     title_selectors = [
         "span.B_NuCI",
         "h1.yhB1nd",
@@ -43,11 +43,13 @@ def _extract_title(soup: BeautifulSoup) -> Optional[str]:
     for selector in title_selectors:
         el = soup.select_one(selector)
         if el and el.get_text(strip=True):
+            if matched is not None:
+                matched["title"] = selector
             return el.get_text(strip=True)
     return None
 
 
-def _extract_image(soup: BeautifulSoup) -> Optional[str]:
+def _extract_image(soup: BeautifulSoup, matched: Optional[Dict[str, str]] = None) -> Optional[str]:
     image_selectors = [
         "img._396cs4._2amPTt._3qGmMb._3exPp9",
         "img._396cs4._2amPTt._3qGmMb",
@@ -57,11 +59,13 @@ def _extract_image(soup: BeautifulSoup) -> Optional[str]:
     for selector in image_selectors:
         el = soup.select_one(selector)
         if el and el.get("src"):
+            if matched is not None:
+                matched["image_url"] = selector
             return el.get("src")
     return None
 
 
-def _extract_price(soup: BeautifulSoup) -> Optional[float]:
+def _extract_price(soup: BeautifulSoup, matched: Optional[Dict[str, str]] = None) -> Optional[float]:
     price_selectors = [
         "div._30jeq3._16Jk6d",
         "div._25b18c div._30jeq3",
@@ -73,24 +77,33 @@ def _extract_price(soup: BeautifulSoup) -> Optional[float]:
         if el and el.get_text(strip=True):
             price_val = clean_price_string(el.get_text())
             if price_val is not None:
+                if matched is not None:
+                    matched["price"] = selector
                 return price_val
     return None
 
 
-def scrape_flipkart(url: str) -> Dict[str, Optional[str]]:
+def parse_flipkart_page(html: str) -> Dict[str, Optional[str]]:
     """
-    Scrape Flipkart product page for title, image, and price.
-    Returns dict with keys: title, image_url, price (float or None).
+    Extract title, image_url and price from Flipkart product page HTML.
+    Also returns selectors: field -> CSS selector that matched.
     """
-    html = _fetch_html(url)
     soup = BeautifulSoup(html, "lxml")
-
-    title = _extract_title(soup)
-    image_url = _extract_image(soup)
-    price = _extract_price(soup)
-
+    matched: Dict[str, str] = {}
     return {
-        "title": title,
-        "image_url": image_url,
-        "price": price,
+        "title": _extract_title(soup, matched),
+        "image_url": _extract_image(soup, matched),
+        "price": _extract_price(soup, matched),
+        "selectors": matched,
     }
+
+
+def scrape_flipkart(url: str) -> Dict[str, Optional[str]]:
+    """
+    Scrape Flipkart product page for title, image, and price.
+    Returns dict with keys: title, image_url, price (float or None), plus
+    strategy and selectors (field -> CSS selector that matched) for metrics.
+    """
+    data = parse_flipkart_page(_fetch_html(url))
+    data["strategy"] = "requests"
+    return data
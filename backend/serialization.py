@@ -0,0 +1,38 @@
+"""
+Fast JSON serialization for API responses.
+
+Large list and history responses are built from plain column tuples/dicts and
+encoded with orjson in one pass, skipping per-row Pydantic validation and
+FastAPI's jsonable_encoder walk.
+"""
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from profiling import span
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(data: Any) -> bytes:
+    """Serialize plain data (dicts, lists, datetimes, numpy values, models) to JSON bytes."""
+    return orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """orjson-backed response that also accepts Pydantic models and Decimals."""
+
+    def render(self, content: Any) -> bytes:
+        with span("serialize"):
+            return dumps(content)
@@ -0,0 +1,47 @@
+"""
+Celery task evaluating alert rules in bulk after each scrape round.
+
+See alerts.rules: each round runs a fixed number of set-based queries no matter
+how many rules or trackers exist, then writes outbox rows and rule state in the
+same transaction.
+
+Rounds never overlap: each holds a transaction-level advisory lock, and a round
+started by beat while the previous one is still running exits without
+evaluating anything. Two concurrent rounds would read the same armed rules and
+both queue the alert.
+"""
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from database import SessionLocal
+from alerts import evaluate_alert_rules
+from metrics import ALERTS
+from tasks.check_price import celery_app, SEND_OUTBOX_TASK
+
+# pg advisory lock key held for the duration of an evaluation round
+ROUND_LOCK_KEY = 0x5A1E5A1E
+
+
+@celery_app.task(name="tasks.alerts.evaluate_rules")
+def evaluate_rules():
+    """
+    Evaluate the built-in drop alert and all user-defined alert rules.
+    Runs every ALERT_RULES_INTERVAL_MINUTES via Celery beat.
+    """
+    db = SessionLocal()
+    try:
+        # Released on commit (or on rollback when the session closes)
+        if not db.execute(select(func.pg_try_advisory_xact_lock(ROUND_LOCK_KEY))).scalar():
+            return "Skipped: previous round still running"
+        result = evaluate_alert_rules(db, datetime.utcnow())
+        result.apply(db)
+        db.commit()
+        for key, count in result.stats.items():
+            # "percent_drop.sent" -> rule="percent_drop", outcome="sent"
+            ALERTS.labels(*key.split(".")).inc(count)
+        if result.immediate:
+            celery_app.send_task(SEND_OUTBOX_TASK)
+        return f"Queued {len(result.alerts)} alerts from {len(result.rule_updates)} rules"
+    finally:
+        db.close()
@@ -3,7 +3,7 @@ Celery configuration for SaleScout.
 Defines broker, backend, and beat schedule.
 """
 from datetime import timedelta
-from config import CELERY_BROKER_URL, CELERY_RESULT_BACKEND
+from config import CELERY_BROKER_URL, CELERY_RESULT_BACKEND, ALERT_RULES_INTERVAL_MINUTES
 
 # Basic Celery configuration
 broker_url = CELERY_BROKER_URL
@@ -14,6 +14,14 @@ accept_content = ["json"]
 task_serializer = "json"
 result_serializer = "json"
 
+# Task modules registered alongside tasks.check_price
+imports = ("tasks.purge", "tasks.notifications", "tasks.alerts")
+
+# Email delivery runs on its own queue so SMTP never holds up scrape workers
+task_routes = {
+    "tasks.notifications.*": {"queue": "notifications"},
+}
+
 # Timezone settings
 enable_utc = True
 timezone = "UTC"
@@ -24,4 +32,14 @@ beat_schedule = {
         "task": "tasks.check_price.enqueue_due_trackers",
         "schedule": timedelta(minutes=5),
     },
+    # Drop alert and user-defined alert rules, evaluated in bulk
+    "evaluate-alert-rules": {
+        "task": "tasks.alerts.evaluate_rules",
+        "schedule": timedelta(minutes=ALERT_RULES_INTERVAL_MINUTES),
+    },
+    # Retries and anything queued while no sender was running
+    "send-notification-outbox": {
+        "task": "tasks.notifications.send_outbox",
+        "schedule": timedelta(minutes=1),
+    },
 }
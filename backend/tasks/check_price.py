@@ -1,26 +1,37 @@
 """
 Celery tasks for price checking and scheduling.
 """
-from datetime import datetime, timedelta
-from typing import Optional
+import time
+from datetime import datetime
+from typing import Optional, Tuple
 
 from celery import Celery
+from celery.signals import worker_process_init
 from sqlalchemy.orm import Session
 
 from config import (
     CELERY_BROKER_URL,
     CELERY_RESULT_BACKEND,
-    PRICE_DROP_ALERT_THRESHOLD,
+    ALERT_REARM_PERCENT,
 )
-from database import SessionLocal
-from models import Tracker, PriceHistory, User
+from database import SessionLocal, engine
+from models import Tracker, PriceHistory, User, NotificationOutbox
 from scraper import scrape_amazon, scrape_flipkart
-from utils import (
-    get_platform_from_url,
-    calculate_price_change_percentage,
-    format_price,
+from utils import get_platform_from_url
+from alerts import outbox_values
+from response_cache import bump_versions_sync
+from freshness import check_due_at, lag_labels
+from metrics import (
+    ALERTS,
+    ENQUEUE_DURATION,
+    ENQUEUE_LAG,
+    ENQUEUED_CHECKS,
+    POLLING_LAG,
+    SCRAPE_DURATION,
+    SELECTOR_HITS,
 )
-from utils.notifications import send_email_notification
+from tasks import monitoring  # noqa: F401 - connects Celery metrics signals
+from realtime import publish_price_update_sync
 
 celery_app = Celery(
     "salescout",
@@ -29,6 +40,15 @@ celery_app = Celery(
 )
 celery_app.config_from_object("tasks.celeryconfig")
 
+# Sent by name: tasks.notifications imports celery_app from this module
+SEND_OUTBOX_TASK = "tasks.notifications.send_outbox"
+
+
+@worker_process_init.connect
+def _reset_db_pool(**kwargs):
+    """Drop connections inherited from the parent after a prefork worker starts."""
+    engine.dispose(close=False)
+
 
 def _get_db_session() -> Session:
     return SessionLocal()
@@ -37,11 +57,26 @@ def _get_db_session() -> Session:
 def _scrape_price(tracker: Tracker) -> Optional[float]:
     platform = get_platform_from_url(tracker.product_url)
     if platform == "amazon":
-        data = scrape_amazon(tracker.product_url)
+        scraper = scrape_amazon
     elif platform == "flipkart":
-        data = scrape_flipkart(tracker.product_url)
+        scraper = scrape_flipkart
     else:
         return None
+
+    started = time.perf_counter()
+    try:
+        data = scraper(tracker.product_url)
+    except Exception:
+        SCRAPE_DURATION.labels(platform, "requests", "error").observe(time.perf_counter() - started)
+        raise
+    outcome = "price" if data.get("price") is not None else "no_price"
+    SCRAPE_DURATION.labels(platform, data.get("strategy", "requests"), outcome).observe(
+        time.perf_counter() - started
+    )
+    selectors = data.get("selectors", {})
+    for field in ("title", "image_url", "price"):
+        SELECTOR_HITS.labels(platform, field, selectors.get(field, "none")).inc()
+
     # Update title/image if available
     if data.get("title"):
         tracker.product_title = data["title"]
@@ -50,10 +85,71 @@ def _scrape_price(tracker: Tracker) -> Optional[float]:
     return data.get("price")
 
 
+def _step_alert(armed: bool, triggered: bool, cleared: bool) -> Tuple[bool, bool]:
+    """
+    Advance one alert rule's state machine.
+    
+    armed --triggered--> fired (send) --cleared--> armed again. Between the
+    trigger and clear levels nothing changes, so a price hovering around the
+    threshold does not re-fire on every poll.
+    
+    Returns:
+        (armed, fire)
+    """
+    if armed and triggered:
+        return False, True
+    if not armed and cleared:
+        return True, False
+    return armed, False
+
+
+def _record_alert(rule: str, fire: bool, suppressed: bool):
+    if fire:
+        ALERTS.labels(rule, "sent").inc()
+    elif suppressed:
+        ALERTS.labels(rule, "suppressed").inc()
+
+
+def _queue_target_alert(db: Session, tracker: Tracker, old_price: Optional[float], price: float, now: datetime) -> int:
+    """
+    Evaluate the target price alert and add an outbox row if it fires.
+    
+    Its state lives on the tracker row, so a suppressed alert costs no extra
+    queries. Drop and user-defined rules are evaluated in bulk by tasks.alerts.
+    Returns 1 if an alert was queued for immediate delivery, else 0.
+    """
+    target_hit = price <= tracker.target_price
+    rearm_above = tracker.target_price * (1 + ALERT_REARM_PERCENT / 100)
+    was_armed = tracker.target_alert_armed
+    tracker.target_alert_armed, fire = _step_alert(was_armed, target_hit, price > rearm_above)
+    _record_alert("target_price", fire, target_hit and not was_armed)
+    if not fire:
+        return 0
+
+    user = db.query(User).filter(User.id == tracker.user_id).first()
+    if not user:
+        return 0
+    values = outbox_values(
+        user_id=user.id,
+        recipient=user.email,
+        alert_delivery=user.alert_delivery,
+        tracker_id=tracker.id,
+        product_title=tracker.product_title,
+        product_url=tracker.product_url,
+        old_price=old_price,
+        new_price=price,
+        reason="Target price reached",
+        now=now,
+    )
+    # Sent only if the surrounding transaction commits
+    db.add(NotificationOutbox(**values))
+    return 0 if values["digest"] else 1
+
+
 @celery_app.task(name="tasks.check_price.check_price", bind=True, max_retries=3, default_retry_delay=120)
 def check_price(self, tracker_id: int):
     """
-    Check price for a tracker, store history, update tracker, and send alerts.
+    Check price for a tracker, store history, update tracker, and queue alerts.
     """
     db = _get_db_session()
     try:
@@ -65,59 +161,52 @@ def check_price(self, tracker_id: int):
         price = _scrape_price(tracker)
 
         if price is None:
+            if self.request.retries >= self.max_retries:
+                # Out of retries: treat as unavailable so a later price counts as back in stock
+                tracker.in_stock = False
+                db.commit()
+                return "Price not found; marked out of stock"
             # Retry if price could not be fetched
             raise self.retry(exc=Exception("Price not found"))
 
+        # One timestamp for the history row and the tracker, so rule watermarks line up
+        now = datetime.utcnow()
+        # Checks run ahead of schedule count as on time
+        lag = max((now - check_due_at(tracker)).total_seconds(), 0.0)
+        POLLING_LAG.labels(*lag_labels(tracker)).observe(lag)
+
         # Save price history
         history = PriceHistory(
             tracker_id=tracker.id,
             price=price,
-            checked_at=datetime.utcnow(),
+            checked_at=now,
         )
         db.add(history)
 
         # Update tracker
         tracker.last_price = price
-        tracker.last_checked_at = datetime.utcnow()
+        tracker.last_checked_at = now
+        tracker.next_check_at = None
+        tracker.last_check_lag_seconds = lag
+        if not tracker.in_stock:
+            tracker.in_stock = True
+            tracker.back_in_stock_at = now
+
+        # Alerts go to the outbox in the same transaction as the price update
+        queued_alerts = _queue_target_alert(db, tracker, old_price, price, now)
         db.commit()
         db.refresh(tracker)
-
-        # Send notifications
-        user = db.query(User).filter(User.id == tracker.user_id).first()
-        if user:
-            # Target price alert
-            if price <= tracker.target_price:
-                send_email_notification(
-                    user_email=user.email,
-                    product_title=tracker.product_title,
-                    old_price=old_price,
-                    new_price=price,
-                    url=tracker.product_url,
-                    reason="Target price reached",
-                )
-
-            # Price drop alert (>= threshold vs yesterday)
-            yesterday = datetime.utcnow() - timedelta(days=1)
-            prev_entry = (
-                db.query(PriceHistory)
-                .filter(
-                    PriceHistory.tracker_id == tracker.id,
-                    PriceHistory.checked_at <= yesterday,
-                )
-                .order_by(PriceHistory.checked_at.desc())
-                .first()
+        bump_versions_sync(("user", tracker.user_id), ("tracker", tracker.id))
+        if price != old_price:
+            publish_price_update_sync(
+                user_id=tracker.user_id,
+                tracker_id=tracker.id,
+                price=price,
+                old_price=old_price,
+                checked_at=tracker.last_checked_at,
             )
-            if prev_entry:
-                drop_pct = calculate_price_change_percentage(prev_entry.price, price)
-                if drop_pct <= -PRICE_DROP_ALERT_THRESHOLD:
-                    send_email_notification(
-                        user_email=user.email,
-                        product_title=tracker.product_title,
-                        old_price=prev_entry.price,
-                        new_price=price,
-                        url=tracker.product_url,
-                        reason=f"Price dropped {abs(drop_pct)}% since yesterday",
-                    )
+        if queued_alerts:
+            celery_app.send_task(SEND_OUTBOX_TASK)
 
         return "Price checked"
     finally:
@@ -131,19 +220,20 @@ def enqueue_due_trackers():
     Runs every 5 minutes via Celery beat.
     """
     db = _get_db_session()
+    started = time.perf_counter()
     try:
         now = datetime.utcnow()
         trackers = db.query(Tracker).filter(Tracker.active == True).all()  # noqa: E712
         queued = 0
         for tracker in trackers:
-            if not tracker.last_checked_at:
-                check_price.delay(tracker.id)
-                queued += 1
-                continue
-            elapsed = now - tracker.last_checked_at
-            if elapsed >= timedelta(minutes=tracker.polling_interval_minutes):
+            # next_check_at (staggered bulk import), else last check + interval, else now
+            due_at = check_due_at(tracker)
+            if due_at <= now:
                 check_price.delay(tracker.id)
+                ENQUEUE_LAG.labels(*lag_labels(tracker)).observe((now - due_at).total_seconds())
                 queued += 1
+        ENQUEUED_CHECKS.inc(queued)
         return f"Enqueued {queued} tracker checks"
     finally:
+        ENQUEUE_DURATION.observe(time.perf_counter() - started)
         db.close()
@@ -0,0 +1,112 @@
+"""
+Celery instrumentation and the worker-side Prometheus exporter.
+
+- Every published task is stamped with its publish time; when a worker starts
+  it, the difference (or the delay past its ETA for countdown/retry tasks) is
+  recorded as queue lag
+- Task run time is recorded per task name and final state
+- The main worker process serves metrics on CELERY_METRICS_PORT; prefork
+  children write to PROMETHEUS_MULTIPROC_DIR when it is set
+- With PROFILING_ENABLED each task run gets the same SQL accounting and
+  sampled profiler captures as API requests (see profiling.py)
+"""
+import os
+import time
+from contextvars import Token
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Tuple
+
+from celery.signals import (
+    before_task_publish,
+    task_postrun,
+    task_prerun,
+    worker_init,
+    worker_process_shutdown,
+    worker_ready,
+)
+from prometheus_client import multiprocess, start_http_server
+
+from config import CELERY_METRICS_PORT, PROFILING_ENABLED
+from database import engine
+from metrics import QUEUE_LAG, TASK_DURATION, metrics_registry
+from profiling import Profile, finish_profile, instrument_engine, start_profile
+
+PUBLISHED_AT_HEADER = "salescout_published_at"
+# Send a task with headers={PROFILE_HEADER: True} to capture a profile of that run
+PROFILE_HEADER = "salescout_profile"
+
+# task id -> perf_counter at start (per worker process)
+_task_started: Dict[str, float] = {}
+
+# task id -> active profile (PROFILING_ENABLED only)
+_task_profiles: Dict[str, Tuple[Profile, Token]] = {}
+
+instrument_engine(engine)
+
+
+@before_task_publish.connect
+def _stamp_publish_time(headers=None, **kwargs):
+    if headers is not None:
+        headers[PUBLISHED_AT_HEADER] = time.time()
+
+
+def _queued_since(request) -> float:
+    """Epoch seconds from which the task was runnable."""
+    if request.eta:
+        return datetime.fromisoformat(request.eta).timestamp()
+    published_at = getattr(request, PUBLISHED_AT_HEADER, None)
+    if published_at is None:
+        published_at = (request.headers or {}).get(PUBLISHED_AT_HEADER)
+    return float(published_at) if published_at is not None else time.time()
+
+
+@task_prerun.connect
+def _observe_queue_lag(task_id=None, task=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+    QUEUE_LAG.labels(task.name).observe(max(time.time() - _queued_since(task.request), 0.0))
+
+
+@task_prerun.connect
+def _start_task_profile(task_id=None, task=None, **kwargs):
+    if PROFILING_ENABLED:
+        request = task.request
+        requested = bool(getattr(request, PROFILE_HEADER, None) or (request.headers or {}).get(PROFILE_HEADER))
+        _task_profiles[task_id] = start_profile(task.name, capture=requested)
+
+
+@task_postrun.connect
+def _finish_task_profile(task_id=None, task=None, state=None, **kwargs):
+    entry = _task_profiles.pop(task_id, None)
+    if entry is not None:
+        finish_profile(*entry, kind="task", state=state or "UNKNOWN", task_id=task_id)
+
+
+@task_postrun.connect
+def _observe_task_duration(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started)
+
+
+@worker_init.connect
+def _reset_multiprocess_dir(**kwargs):
+    """Clear values left by a previous worker run before children start writing."""
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        for stale in path.glob("*.db"):
+            stale.unlink()
+
+
+@worker_ready.connect
+def _start_exporter(**kwargs):
+    if CELERY_METRICS_PORT:
+        start_http_server(CELERY_METRICS_PORT, registry=metrics_registry())
+
+
+@worker_process_shutdown.connect
+def _mark_process_dead(pid=None, **kwargs):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid or os.getpid())
@@ -0,0 +1,146 @@
+"""
+Celery task draining the notification outbox.
+
+Rows are claimed in batches with SELECT ... FOR UPDATE SKIP LOCKED, so several
+senders can run side by side without double-sending, and are delivered over the
+process-wide SMTPConnectionPool. Failed messages are retried with exponential
+backoff and marked failed after NOTIFY_MAX_ATTEMPTS.
+
+Users in digest mode get their alerts queued DIGEST_WINDOW_MINUTES ahead; when
+the first one comes due, everything buffered for that user goes out as one email.
+"""
+import smtplib
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from config import NOTIFY_BATCH_SIZE, NOTIFY_MAX_ATTEMPTS, NOTIFY_RETRY_BASE_SECONDS
+from database import SessionLocal
+from metrics import NOTIFICATION_SEND_DURATION, NOTIFICATIONS
+from models import NotificationOutbox
+from utils import SMTPConnectionPool, build_digest_message, build_email
+from tasks.check_price import celery_app, SEND_OUTBOX_TASK
+
+smtp_pool = SMTPConnectionPool()
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=NOTIFY_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+def _claim_due(db: Session) -> List[List[NotificationOutbox]]:
+    """
+    Lock one batch of due rows and group them into messages.
+    
+    Immediate rows are one message each. Once any digest row of a user is due,
+    all of that user's pending digest rows are swept into a single message.
+    """
+    due = db.execute(
+        select(NotificationOutbox)
+        .where(NotificationOutbox.status == "pending", NotificationOutbox.next_attempt_at <= datetime.utcnow())
+        .order_by(NotificationOutbox.id)
+        .limit(NOTIFY_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+
+    groups = [[row] for row in due if not row.digest]
+    digest_users = {row.user_id for row in due if row.digest}
+    if digest_users:
+        buffered = db.execute(
+            select(NotificationOutbox)
+            .where(
+                NotificationOutbox.status == "pending",
+                NotificationOutbox.digest.is_(True),
+                NotificationOutbox.user_id.in_(digest_users),
+            )
+            .order_by(NotificationOutbox.id)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        by_user: Dict[int, List[NotificationOutbox]] = {}
+        for row in buffered:
+            by_user.setdefault(row.user_id, []).append(row)
+        groups.extend(by_user.values())
+    return groups
+
+
+def _build_group_email(group: List[NotificationOutbox]):
+    if len(group) == 1:
+        subject, body = group[0].subject, group[0].body
+    else:
+        subject, body = build_digest_message([(row.subject, row.body) for row in group])
+    return build_email(group[0].recipient, subject, body)
+
+
+def _deliver_batch(db: Session) -> int:
+    """
+    Claim, send and record one batch of due outbox rows.
+    Returns the number of rows claimed (a digest message covers several rows).
+    """
+    groups = _claim_due(db)
+    if not groups:
+        return 0
+
+    with NOTIFICATION_SEND_DURATION.time():
+        errors = smtp_pool.send_many([_build_group_email(group) for group in groups])
+
+    now = datetime.utcnow()
+    for group, error in zip(groups, errors):
+        for row in group:
+            row.attempts += 1
+            row.last_error = None if error is None else str(error)[:1000]
+            if error is None:
+                row.status = "sent"
+                row.sent_at = now
+            elif row.attempts >= NOTIFY_MAX_ATTEMPTS or isinstance(error, smtplib.SMTPRecipientsRefused):
+                row.status = "failed"
+            else:
+                row.next_attempt_at = now + _retry_delay(row.attempts)
+        if error is None:
+            NOTIFICATIONS.labels("sent").inc()
+        elif group[0].status == "failed":
+            NOTIFICATIONS.labels("failed").inc()
+        else:
+            NOTIFICATIONS.labels("retried").inc()
+    db.commit()
+    return sum(len(group) for group in groups)
+
+
+@celery_app.task(name=SEND_OUTBOX_TASK)
+def send_outbox():
+    """
+    Deliver pending notifications until no due rows are left.
+    Triggered by check_price after it queues alerts, and every minute via beat for retries.
+    """
+    db = SessionLocal()
+    try:
+        claimed = 0
+        while True:
+            count = _deliver_batch(db)
+            claimed += count
+            # Fewer rows than a full batch means nothing due was left unclaimed
+            if count < NOTIFY_BATCH_SIZE:
+                break
+        return f"Processed {claimed} notifications (smtp_connections={smtp_pool.connections_opened})"
+    finally:
+        db.close()
+
+
+def get_outbox_stats(db: Session) -> Dict:
+    """Undelivered outbox rows by status and age of the oldest pending one, for health checks."""
+    counts = dict(
+        db.execute(
+            select(NotificationOutbox.status, func.count())
+            .where(NotificationOutbox.status != "sent")
+            .group_by(NotificationOutbox.status)
+        ).all()
+    )
+    oldest = db.execute(
+        select(func.min(NotificationOutbox.created_at)).where(NotificationOutbox.status == "pending")
+    ).scalar()
+    return {
+        "pending": counts.get("pending", 0),
+        "failed": counts.get("failed", 0),
+        "oldest_pending_seconds": (datetime.utcnow() - oldest).total_seconds() if oldest else 0.0,
+    }
@@ -0,0 +1,67 @@
+"""
+Celery tasks for purging deleted trackers and accounts.
+
+Price history is removed in fixed-size chunks with one short transaction per
+chunk, so a tracker with years of history never holds long locks or loads rows
+into memory. The tracker/user row itself is deleted last.
+"""
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from config import PURGE_CHUNK_SIZE
+from database import SessionLocal
+from models import PriceHistory, Tracker, User
+from tasks.check_price import celery_app
+
+
+def _purge_history_chunks(db: Session, tracker_id: int) -> int:
+    """Delete a tracker's price history chunk by chunk. Returns rows deleted."""
+    total = 0
+    while True:
+        chunk_ids = (
+            select(PriceHistory.id)
+            .where(PriceHistory.tracker_id == tracker_id)
+            .limit(PURGE_CHUNK_SIZE)
+            .scalar_subquery()
+        )
+        result = db.execute(delete(PriceHistory).where(PriceHistory.id.in_(chunk_ids)))
+        db.commit()
+        total += result.rowcount
+        if result.rowcount < PURGE_CHUNK_SIZE:
+            return total
+
+
+@celery_app.task(name="tasks.purge.purge_tracker")
+def purge_tracker(tracker_id: int):
+    """
+    Remove a tracker marked as deleted, along with its price history.
+    """
+    db = SessionLocal()
+    try:
+        deleted = _purge_history_chunks(db, tracker_id)
+        db.execute(delete(Tracker).where(Tracker.id == tracker_id))
+        db.commit()
+        return f"Purged tracker {tracker_id} ({deleted} history rows)"
+    finally:
+        db.close()
+
+
+@celery_app.task(name="tasks.purge.purge_user")
+def purge_user(user_id: int):
+    """
+    Remove an account marked as deleted, along with all its trackers and history.
+    """
+    db = SessionLocal()
+    try:
+        tracker_ids = db.execute(
+            select(Tracker.id).where(Tracker.user_id == user_id)
+        ).scalars().all()
+        deleted = 0
+        for tracker_id in tracker_ids:
+            deleted += _purge_history_chunks(db, tracker_id)
+        # Remaining trackers are now empty; ON DELETE CASCADE removes them
+        db.execute(delete(User).where(User.id == user_id))
+        db.commit()
+        return f"Purged user {user_id} ({len(tracker_ids)} trackers, {deleted} history rows)"
+    finally:
+        db.close()
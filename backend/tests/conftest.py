@@ -0,0 +1,10 @@
+"""
+Shared pytest setup: run from backend/ (`python -m pytest`); modules are
+imported top-level, the same way uvicorn and Celery load them.
+"""
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
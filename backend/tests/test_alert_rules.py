@@ -0,0 +1,53 @@
+"""
+Unit tests for the alert state machines (alerts.rules) without a database.
+"""
+import numpy as np
+
+from alerts.rules import _drop_step, _rearm_level, _step
+from config import ALERT_REARM_PERCENT
+
+
+def run_rounds(changes, threshold):
+    """Feed one tracker through successive rounds; returns the outcome of each."""
+    armed = np.array([True])
+    outcomes = []
+    for change in changes:
+        fire, rearm, suppressed = _drop_step(armed, np.array([change]), np.array([threshold]))
+        outcomes.append("fire" if fire[0] else "suppress" if suppressed[0] else "rearm" if rearm[0] else "-")
+        armed = (armed & ~fire) | rearm
+    return outcomes
+
+
+def test_step_masks():
+    armed = np.array([True, True, False, False])
+    triggered = np.array([True, False, True, False])
+    cleared = np.array([False, True, False, True])
+    fire, rearm = _step(armed, triggered, cleared)
+    assert fire.tolist() == [True, False, False, False]
+    assert rearm.tolist() == [False, False, False, True]
+
+
+def test_drop_fires_suppresses_then_rearms():
+    assert run_rounds([-12.0, -11.0, -10.5, -5.0, -12.0], threshold=10.0) == [
+        "fire", "suppress", "suppress", "rearm", "fire",
+    ]
+
+
+def test_drop_stays_disarmed_inside_hysteresis_band():
+    # Back above the threshold but not by ALERT_REARM_PERCENT yet
+    change = -(10.0 - ALERT_REARM_PERCENT / 2)
+    assert run_rounds([-12.0, change, -12.0], threshold=10.0) == ["fire", "-", "suppress"]
+
+
+def test_small_threshold_can_rearm():
+    # threshold <= ALERT_REARM_PERCENT used to need a positive change (impossible vs. a window high)
+    threshold = ALERT_REARM_PERCENT
+    assert _rearm_level(np.array([threshold]))[0] == threshold / 2
+    assert run_rounds([-threshold, -threshold, 0.0, -threshold], threshold) == [
+        "fire", "suppress", "rearm", "fire",
+    ]
+
+
+def test_missing_reference_never_fires():
+    fire, rearm, suppressed = _drop_step(np.array([True, False]), np.array([np.nan, np.nan]), 5.0)
+    assert not fire.any() and not rearm.any() and not suppressed.any()
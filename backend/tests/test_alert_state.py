@@ -0,0 +1,27 @@
+"""
+Unit tests for the per-check target price alert state (tasks.check_price).
+"""
+import pytest
+
+from tasks.check_price import _step_alert
+
+
+@pytest.mark.parametrize("armed, triggered, cleared, expected", [
+    (True, True, False, (False, True)),     # fires and disarms
+    (True, False, False, (True, False)),    # nothing to do
+    (True, False, True, (True, False)),     # already armed
+    (False, True, False, (False, False)),   # suppressed
+    (False, False, False, (False, False)),  # inside the hysteresis band
+    (False, False, True, (True, False)),    # re-armed
+])
+def test_step_alert(armed, triggered, cleared, expected):
+    assert _step_alert(armed, triggered, cleared) == expected
+
+
+def test_price_hovering_at_target_alerts_once():
+    target, rearm_above = 1000.0, 1020.0
+    armed, sent = True, []
+    for price in [1050, 999, 1001, 998, 1010, 995, 1025, 990]:
+        armed, fire = _step_alert(armed, price <= target, price > rearm_above)
+        sent.append(fire)
+    assert sent == [False, True, False, False, False, False, False, True]
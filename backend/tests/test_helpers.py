@@ -0,0 +1,45 @@
+"""
+Unit tests for product URL canonicalization (utils.canonicalize_product_url).
+"""
+import pytest
+
+from utils.helpers import canonicalize_product_url
+
+CANONICAL_ASIN = "https://www.amazon.in/dp/B0ABC12345"
+CANONICAL_FLIPKART = "https://www.flipkart.com/item/p/itm123?pid=ABC"
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.amazon.in/Some-Slug/dp/B0ABC12345/ref=sr_1_1?tag=x",
+    "https://amazon.in/dp/B0ABC12345",
+    "https://WWW.Amazon.in/dp/b0abc12345/",
+    "https://m.amazon.in/gp/aw/d/B0ABC12345",
+    "https://www.amazon.in/gp/product/B0ABC12345?psc=1",
+    "  https://www.amazon.in/dp/B0ABC12345  ",
+])
+def test_amazon_variants_share_one_url(url):
+    assert canonicalize_product_url(url) == CANONICAL_ASIN
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.flipkart.com/item/p/itm123?pid=ABC&lid=XYZ&marketplace=FLIPKART",
+    "https://m.flipkart.com/item/p/itm123?pid=ABC",
+    "https://flipkart.com/item/p/itm123/?pid=ABC",
+])
+def test_flipkart_variants_share_one_url(url):
+    assert canonicalize_product_url(url) == CANONICAL_FLIPKART
+
+
+def test_amazon_without_asin_keeps_query():
+    url = "https://www.amazon.in/gp/offer-listing?asin=B0ABC12345"
+    assert canonicalize_product_url(url) == url
+
+
+def test_flipkart_without_pid_keeps_query():
+    assert canonicalize_product_url("https://m.flipkart.com/item/p/itm123?q=1") == (
+        "https://www.flipkart.com/item/p/itm123?q=1"
+    )
+
+
+def test_other_hosts_are_left_alone():
+    assert canonicalize_product_url("https://Example.com/x/?y=1") == "https://example.com/x?y=1"
@@ -0,0 +1,59 @@
+"""
+Unit tests for history downsampling (utils.lttb_indices) and keyset cursors.
+"""
+import math
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from routers.price_history import decode_cursor, encode_cursor, to_naive_utc
+from utils import lttb_indices
+
+
+def test_lttb_keeps_short_series():
+    assert lttb_indices([0, 1, 2], [5, 6, 7], 10) == [0, 1, 2]
+    assert lttb_indices([], [], 5) == []
+
+
+def test_lttb_tiny_thresholds():
+    xs = list(range(10))
+    assert lttb_indices(xs, xs, 2) == [0, 9]
+    assert lttb_indices(xs, xs, 1) == [0]
+
+
+def test_lttb_keeps_endpoints_and_size():
+    xs = list(range(1000))
+    ys = [math.sin(x / 20) for x in xs]
+    keep = lttb_indices(xs, ys, 50)
+    assert len(keep) == 50
+    assert keep[0] == 0 and keep[-1] == 999
+    assert keep == sorted(set(keep))
+
+
+def test_lttb_keeps_a_single_spike():
+    xs = list(range(500))
+    ys = [100.0] * 500
+    ys[321] = 10.0
+    assert 321 in lttb_indices(xs, ys, 20)
+
+
+def test_cursor_round_trip():
+    checked_at = datetime(2024, 5, 17, 8, 30, 15, 123456)
+    cursor = encode_cursor(checked_at, 98765)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (checked_at, 98765)
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "Zm9v", encode_cursor(datetime(2024, 1, 1), 1)[:-3]])
+def test_invalid_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+def test_to_naive_utc():
+    aware = datetime(2024, 1, 1, 12, 0, tzinfo=timezone(timedelta(hours=5, minutes=30)))
+    assert to_naive_utc(aware) == datetime(2024, 1, 1, 6, 30)
+    assert to_naive_utc(datetime(2024, 1, 1)) == datetime(2024, 1, 1)
+    assert to_naive_utc(None) is None
@@ -0,0 +1,55 @@
+"""
+Unit tests for analytics.price_stats.compute_price_stats.
+"""
+import numpy as np
+import pytest
+
+from analytics.price_stats import DAY_SECONDS, EMPTY_STATS, STATS_WINDOW_DAYS, compute_price_stats
+
+
+def series(days: int, step_hours: float = 6.0, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    times = np.arange(0, days * DAY_SECONDS, step_hours * 3600.0) + 1.7e9
+    prices = 1000 + np.cumsum(rng.normal(0, 5, size=len(times)))
+    return times, prices
+
+
+def test_empty_series():
+    assert compute_price_stats(np.array([]), np.array([])) == EMPTY_STATS
+
+
+def test_single_sample():
+    stats = compute_price_stats(np.array([1.7e9]), np.array([499.0]))
+    assert stats["sample_count"] == 1
+    assert stats["current_price"] == stats["all_time_low"] == stats["all_time_high"] == 499.0
+    assert stats["moving_avg_7d"] == stats["moving_avg_30d"] == 499.0
+    assert stats["volatility_30d"] is None
+
+
+def test_trailing_averages_are_anchored_at_last_sample():
+    # 40 days at 100, then 10 days at 200, one sample a day
+    times = np.arange(50) * DAY_SECONDS
+    prices = np.where(np.arange(50) < 40, 100.0, 200.0)
+    stats = compute_price_stats(times, prices)
+    assert stats["moving_avg_7d"] == 200.0
+    # samples from day 19 to 49: 21 at 100 and 10 at 200
+    assert stats["moving_avg_30d"] == pytest.approx((21 * 100 + 10 * 200) / 31, abs=0.01)
+    assert (stats["all_time_low"], stats["all_time_high"]) == (100.0, 200.0)
+
+
+def test_buy_score_prefers_low_prices():
+    times = np.arange(60) * DAY_SECONDS
+    falling = compute_price_stats(times, np.linspace(200, 100, 60))
+    rising = compute_price_stats(times, np.linspace(100, 200, 60))
+    assert 0 <= rising["buy_score"] < falling["buy_score"] <= 100
+
+
+def test_windowed_series_with_totals_matches_full_history():
+    times, prices = series(days=400)
+    full = compute_price_stats(times, prices)
+
+    start = np.searchsorted(times, times[-1] - STATS_WINDOW_DAYS * DAY_SECONDS, side="left")
+    windowed = compute_price_stats(
+        times[start:], prices[start:], (len(prices), float(prices.min()), float(prices.max()))
+    )
+    assert windowed == full
@@ -0,0 +1,43 @@
+"""
+Unit tests for rate limit configuration parsing and route grouping (rate_limit).
+"""
+import pytest
+
+from rate_limit import parse_limits, route_group
+
+
+def test_parse_limits():
+    assert parse_limits("auth=10/60, tracker_write=60/60,history_read=120/60") == {
+        "auth": (6000, 60000),
+        "tracker_write": (1000, 60000),
+        "history_read": (500, 60000),
+    }
+
+
+def test_parse_limits_fractional_period_and_empty_items():
+    assert parse_limits("default=4/0.5,,") == {"default": (125, 500)}
+    assert parse_limits("") == {}
+
+
+def test_parse_limits_emission_is_at_least_one_ms():
+    assert parse_limits("default=5000/1") == {"default": (1, 1000)}
+
+
+@pytest.mark.parametrize("spec", ["auth", "auth=10", "auth=ten/60"])
+def test_parse_limits_rejects_malformed_items(spec):
+    with pytest.raises(ValueError):
+        parse_limits(spec)
+
+
+@pytest.mark.parametrize("method, path, group", [
+    ("POST", "/auth/login", "auth"),
+    ("POST", "/auth/register", "auth"),
+    ("GET", "/auth/me", "default"),
+    ("POST", "/trackers", "tracker_write"),
+    ("DELETE", "/trackers/5", "tracker_write"),
+    ("GET", "/trackers/5/history", "history_read"),
+    ("GET", "/export/history", "history_read"),
+    ("GET", "/trackers/5", "default"),
+])
+def test_route_group(method, path, group):
+    assert route_group(method, path) == group
@@ -0,0 +1,54 @@
+"""
+Scraper regression tests over the recorded pages in benchmarks/fixtures/pages.
+
+Each page in expected.json is parsed offline and its title, price, image and
+stock state (a page without a price is out of stock) must match. When a
+selector or layout changes, add the new page and its expected values there.
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from scraper import parse_amazon_page, parse_flipkart_page
+
+PAGES_DIR = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures" / "pages"
+EXPECTED = json.loads((PAGES_DIR / "expected.json").read_text(encoding="utf-8"))
+PARSERS = {"amazon": parse_amazon_page, "flipkart": parse_flipkart_page}
+
+
+@pytest.fixture(params=sorted(EXPECTED), ids=lambda name: name)
+def page(request):
+    name = request.param
+    want = EXPECTED[name]
+    data = PARSERS[want["platform"]]((PAGES_DIR / name).read_text(encoding="utf-8"))
+    return data, want
+
+
+def test_title(page):
+    data, want = page
+    assert data["title"] == want["title"]
+
+
+def test_price(page):
+    data, want = page
+    if want["price"] is None:
+        assert data["price"] is None
+    else:
+        assert data["price"] == pytest.approx(want["price"], abs=0.005)
+
+
+def test_stock(page):
+    data, want = page
+    assert (data["price"] is not None) == want["in_stock"]
+
+
+def test_image_url(page):
+    data, want = page
+    assert data["image_url"] == want["image_url"]
+
+
+def test_every_field_reports_its_selector(page):
+    data, want = page
+    expected_fields = {field for field in ("title", "price", "image_url") if want[field] is not None}
+    assert expected_fields <= set(data["selectors"])
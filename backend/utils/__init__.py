@@ -6,19 +6,30 @@ from .helpers import (
     is_amazon_url,
     is_flipkart_url,
     get_platform_from_url,
+    canonicalize_product_url,
     calculate_price_change_percentage,
     format_price,
     truncate_string
 )
-from .notifications import send_email_notification
+from .downsample import lttb_indices
+from .cache import TTLCache, get_redis, close_redis_clients
+from .notifications import build_alert_message, build_digest_message, build_email, SMTPConnectionPool
 
 __all__ = [
     "clean_price_string",
     "is_amazon_url",
     "is_flipkart_url",
     "get_platform_from_url",
+    "canonicalize_product_url",
     "calculate_price_change_percentage",
     "format_price",
     "truncate_string",
-    "send_email_notification",
+    "lttb_indices",
+    "TTLCache",
+    "get_redis",
+    "close_redis_clients",
+    "build_alert_message",
+    "build_digest_message",
+    "build_email",
+    "SMTPConnectionPool",
 ]
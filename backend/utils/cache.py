@@ -0,0 +1,76 @@
+"""
+Caching utilities for SaleScout: a bounded in-process TTL cache and shared
+async Redis clients.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import redis.asyncio as aioredis
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire after a per-entry TTL.
+    Intended for use from a single event loop (no locking).
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def delete_where(self, predicate: Callable[[Any], bool]) -> int:
+        """Remove every entry whose value matches `predicate`. Returns count removed."""
+        keys = [key for key, (_, value) in self._data.items() if predicate(value)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_redis_clients: Dict[str, aioredis.Redis] = {}
+
+
+def get_redis(url: str) -> aioredis.Redis:
+    """Return a shared async Redis client (connection pool) for a URL."""
+    client = _redis_clients.get(url)
+    if client is None:
+        client = aioredis.from_url(url, decode_responses=True)
+        _redis_clients[url] = client
+    return client
+
+
+async def close_redis_clients():
+    """Close all shared Redis clients (call on application shutdown)."""
+    for client in _redis_clients.values():
+        await client.close()
+    _redis_clients.clear()
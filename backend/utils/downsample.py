@@ -0,0 +1,54 @@
+"""
+Downsampling helpers for price series.
+"""
+from typing import List, Sequence
+
+
+def lttb_indices(xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+    """
+    Pick indices of a shape-preserving subset using Largest-Triangle-Three-Buckets.
+    
+    The first and last points are always kept; every bucket in between contributes
+    the point forming the largest triangle with the previously selected point and
+    the average of the next bucket, which keeps peaks and dips visible.
+    
+    Args:
+        xs: Ascending x values (e.g. epoch seconds)
+        ys: Y values (prices), same length as xs
+        threshold: Maximum number of points to keep
+        
+    Returns:
+        Sorted list of selected indices
+    """
+    n = len(xs)
+    if threshold >= n or n <= 2:
+        return list(range(n))
+    if threshold <= 2:
+        return [0, n - 1][:max(threshold, 1)]
+
+    selected = [0]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        span = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        ax, ay = xs[a], ys[a]
+        best_area = -1.0
+        best = start
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+        selected.append(best)
+        a = best
+
+    selected.append(n - 1)
+    return selected
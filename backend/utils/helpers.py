@@ -3,7 +3,7 @@ Helper utility functions for SaleScout.
 """
 import re
 from typing import Optional
-from urllib.parse import urlparse
+from urllib.parse import urlparse, parse_qs, urlencode
 
 
 def clean_price_string(price_str: str) -> Optional[float]:
@@ -87,6 +87,44 @@ def get_platform_from_url(url: str) -> Optional[str]:
     return None
 
 
+def canonicalize_product_url(url: str) -> str:
+    """
+    Reduce a product URL to a canonical form so the same product is recognised
+    regardless of tracking parameters, slugs, host casing or www./m. subdomains.
+    
+    Examples:
+        "https://www.amazon.in/Some-Slug/dp/B0ABC12345/ref=sr_1_1?tag=x" -> "https://www.amazon.in/dp/B0ABC12345"
+        "https://amazon.in/dp/B0ABC12345" -> "https://www.amazon.in/dp/B0ABC12345"
+        "https://www.amazon.in/gp/offer-listing?asin=B0ABC12345" -> "https://www.amazon.in/gp/offer-listing?asin=B0ABC12345"
+        "https://www.flipkart.com/item/p/itm123?pid=ABC&lid=XYZ" -> "https://www.flipkart.com/item/p/itm123?pid=ABC"
+        "https://m.flipkart.com/item/p/itm123?pid=ABC" -> "https://www.flipkart.com/item/p/itm123?pid=ABC"
+    
+    Args:
+        url: Product URL
+        
+    Returns:
+        Canonical URL string
+    """
+    parsed = urlparse(url.strip())
+    host = re.sub(r'^(?:www|m)\.', '', parsed.netloc.lower())
+    path = parsed.path.rstrip('/')
+
+    if is_amazon_url(url):
+        host = f"www.{host}"
+        match = re.search(r'/(?:dp|gp/product|gp/aw/d)/([A-Z0-9]{10})', path, re.IGNORECASE)
+        if match:
+            return f"https://{host}/dp/{match.group(1).upper()}"
+    elif is_flipkart_url(url):
+        host = f"www.{host}"
+        pid = parse_qs(parsed.query).get('pid')
+        if pid:
+            return f"https://{host}{path}?{urlencode({'pid': pid[0]})}"
+
+    # No product id found: the query may be what identifies the page, so keep it
+    query = f"?{parsed.query}" if parsed.query else ""
+    return f"https://{host}{path}{query}"
+
+
 def calculate_price_change_percentage(old_price: float, new_price: float) -> float:
     """
     Calculate percentage change between two prices.
@@ -1,37 +1,51 @@
 """
 Email notification utilities for SaleScout.
+
+Alerts are not sent from the price check itself: check_price writes them to the
+notification outbox in the same transaction as the price update, and the
+tasks.notifications sender delivers them through SMTPConnectionPool, which keeps
+a few authenticated connections open and reuses them across messages.
 """
-import aiosmtplib
+import smtplib
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from email.message import EmailMessage
+from typing import List, Optional, Tuple
 
-from config import SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, SMTP_FROM_EMAIL
-from utils import format_price
-
+from config import (
+    SMTP_HOST,
+    SMTP_PORT,
+    SMTP_USER,
+    SMTP_PASSWORD,
+    SMTP_FROM_EMAIL,
+    SMTP_USE_TLS,
+    SMTP_POOL_SIZE,
+    SMTP_TIMEOUT_SECONDS,
+    SMTP_IDLE_SECONDS,
+)
+from .helpers import format_price
 
-async def _send_email_async(msg: EmailMessage):
-    await aiosmtplib.send(
-        msg,
-        hostname=SMTP_HOST,
-        port=SMTP_PORT,
-        username=SMTP_USER,
-        password=SMTP_PASSWORD,
-        start_tls=True,
-    )
+ALERT_SUBJECT_PREFIX = "SaleScout Alert: "
+ALERT_FOOTER = "You are receiving this because you set a tracker in SaleScout."
 
 
-def send_email_notification(
-    user_email: str,
+def build_alert_message(
     product_title: str,
     old_price: float | None,
     new_price: float,
     url: str,
     reason: str,
-):
+) -> Tuple[str, str]:
     """
-    Send an email notification to the user about price change/alert.
-    Synchronously dispatches an async SMTP send.
+    Build the subject and plain-text body of a price alert email.
+
+    Returns:
+        (subject, body)
     """
-    subject = f"SaleScout Alert: {reason}"
+    subject = f"{ALERT_SUBJECT_PREFIX}{reason}"
     body_lines = [
         f"Product: {product_title}",
         f"Current Price: {format_price(new_price)}",
@@ -39,19 +53,154 @@ def send_email_notification(
     if old_price is not None:
         body_lines.append(f"Previous Price: {format_price(old_price)}")
     body_lines.append(f"Link: {url}")
-    body_lines.append("\nYou are receiving this because you set a tracker in SaleScout.")
+    body_lines.append(f"\n{ALERT_FOOTER}")
+    return subject, "\n".join(body_lines)
+
+
+def build_digest_message(alerts: List[Tuple[str, str]]) -> Tuple[str, str]:
+    """
+    Combine several (subject, body) alert messages into one digest email.
 
+    Returns:
+        (subject, body)
+    """
+    footer = f"\n\n{ALERT_FOOTER}"
+    sections = [
+        # Per-alert footers are dropped; the digest carries one
+        f"{subject.removeprefix(ALERT_SUBJECT_PREFIX)}\n{body.removesuffix(footer)}"
+        for subject, body in alerts
+    ]
+    separator = "\n\n" + "-" * 40 + "\n\n"
+    return f"SaleScout: {len(alerts)} price alerts", separator.join(sections) + footer
+
+
+def build_email(recipient: str, subject: str, body: str) -> EmailMessage:
     msg = EmailMessage()
     msg["From"] = SMTP_FROM_EMAIL
-    msg["To"] = user_email
+    msg["To"] = recipient
     msg["Subject"] = subject
-    msg.set_content("\n".join(body_lines))
+    msg.set_content(body)
+    return msg
+
+
+class SMTPConnectionPool:
+    """
+    Small pool of persistent, authenticated SMTP connections.
+
+    Connections are opened lazily (connect, STARTTLS, login once) and reused
+    until they have been idle for `idle_seconds` or the server drops them; a
+    message that fails on a stale connection is retried once on a fresh one.
+    """
+
+    def __init__(
+        self,
+        size: int = SMTP_POOL_SIZE,
+        host: str = SMTP_HOST,
+        port: int = SMTP_PORT,
+        username: str = SMTP_USER,
+        password: str = SMTP_PASSWORD,
+        use_tls: bool = SMTP_USE_TLS,
+        timeout: float = SMTP_TIMEOUT_SECONDS,
+        idle_seconds: float = SMTP_IDLE_SECONDS,
+    ):
+        self.size = size
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.idle_seconds = idle_seconds
+        self._idle: List[Tuple[float, smtplib.SMTP]] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self.connections_opened = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                smtp.starttls(context=ssl.create_default_context())
+            if self.username:
+                smtp.login(self.username, self.password)
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+            raise
+        self.connections_opened += 1
+        return smtp
+
+    @staticmethod
+    def _discard(smtp: smtplib.SMTP):
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+
+    def _checkout(self) -> smtplib.SMTP:
+        now = time.monotonic()
+        with self._lock:
+            while self._idle:
+                last_used, smtp = self._idle.pop()
+                if now - last_used < self.idle_seconds:
+                    return smtp
+                # The server has likely timed this session out; don't wait on QUIT
+                smtp.close()
+        return self._connect()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it goes back to the pool unless the connection itself failed."""
+        with self._slots:
+            smtp = self._checkout()
+            reusable = True
+            try:
+                yield smtp
+            except smtplib.SMTPServerDisconnected:
+                reusable = False
+                raise
+            except smtplib.SMTPException:
+                # Protocol-level rejection (e.g. refused recipient); the session is still usable
+                raise
+            except OSError:
+                reusable = False
+                raise
+            finally:
+                if reusable:
+                    with self._lock:
+                        self._idle.append((time.monotonic(), smtp))
+                else:
+                    smtp.close()
+
+    def send(self, msg: EmailMessage):
+        """Send one message, retrying once on a fresh connection if the pooled one went stale."""
+        try:
+            with self.connection() as smtp:
+                smtp.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            with self.connection() as smtp:
+                smtp.send_message(msg)
+
+    def send_many(self, messages: List[EmailMessage]) -> List[Optional[Exception]]:
+        """
+        Send a batch concurrently over the pool's connections.
+
+        Returns:
+            One entry per message: None if sent, otherwise the exception raised
+        """
+        def _send(msg: EmailMessage) -> Optional[Exception]:
+            try:
+                self.send(msg)
+                return None
+            except (smtplib.SMTPException, OSError) as exc:
+                return exc
 
-    # Run async send in a simple loop to avoid event loop issues in Celery workers
-    try:
-        import asyncio
+        if len(messages) <= 1 or self.size <= 1:
+            return [_send(msg) for msg in messages]
+        with ThreadPoolExecutor(max_workers=min(self.size, len(messages))) as executor:
+            return list(executor.map(_send, messages))
 
-        asyncio.run(_send_email_async(msg))
-    except Exception as exc:  # noqa: BLE001
-        # Log or print failure; in real deployment, hook into logging/monitoring
-        print(f"Email send failed: {exc}")
+    def close(self):
+        with self._lock:
+            for _, smtp in self._idle:
+                self._discard(smtp)
+            self._idle.clear()
@@ -8,6 +8,9 @@ export const authApi = {
     apiClient.post('/auth/login', { email, password }),
   getCurrentUser: () =>
     apiClient.get('/auth/me'),
+  // alertDelivery: 'immediate' | 'digest'
+  updatePreferences: (alertDelivery) =>
+    apiClient.put('/auth/me/preferences', { alert_delivery: alertDelivery }),
   deleteAccount: () =>
     apiClient.delete('/auth/me'),
 };
@@ -16,8 +19,11 @@ export const authApi = {
 export const trackerApi = {
   getAll: () =>
     apiClient.get('/trackers'),
-  getById: (id) =>
-    apiClient.get(`/trackers/${id}`),
+  // Trackers with sparkline, 24h change and min/max in one request
+  getDashboard: () =>
+    apiClient.get('/trackers/dashboard'),
+  getById: (id, params = {}) =>
+    apiClient.get(`/trackers/${id}`, { params }),
   create: (productUrl, targetPrice, pollingIntervalMinutes = 60) =>
     apiClient.post('/trackers', {
       product_url: productUrl,
@@ -28,8 +34,18 @@ export const trackerApi = {
     apiClient.put(`/trackers/${id}`, data),
   delete: (id) =>
     apiClient.delete(`/trackers/${id}`),
-  getPriceHistory: (id) =>
-    apiClient.get(`/trackers/${id}/history`),
+  // params: { limit, cursor, from, to, points }; next page cursor is in the X-Next-Cursor header
+  getPriceHistory: (id, params = {}) =>
+    apiClient.get(`/trackers/${id}/history`, { params }),
+};
+
+// Real-time price updates (Server-Sent Events); EventSource cannot set headers,
+// so the token is passed as a query parameter
+export const openPriceStream = () => {
+  const token = localStorage.getItem('access_token');
+  const url = new URL('/stream/prices', apiClient.defaults.baseURL);
+  url.searchParams.set('token', token);
+  return new EventSource(url.toString());
 };
 
 export default {
@@ -1,6 +1,7 @@
 import { useNavigate } from 'react-router-dom'
+import { LineChart, Line, ResponsiveContainer } from 'recharts'
 import { trackerApi } from '../api/endpoints'
-import { formatPrice, formatDate } from '../utils/helpers'
+import { formatPrice, formatDate, getPriceChangeColor } from '../utils/helpers'
 
 export default function TrackerCard({ tracker, onDelete }) {
   const navigate = useNavigate()
@@ -46,6 +47,27 @@ export default function TrackerCard({ tracker, onDelete }) {
           </div>
         </div>
 
+        {tracker.sparkline?.length > 1 && (
+          <div className="h-12 mb-2">
+            <ResponsiveContainer width="100%" height="100%">
+              <LineChart data={tracker.sparkline.map((price, i) => ({ i, price }))}>
+                <Line type="monotone" dataKey="price" stroke="#2563eb" strokeWidth={2} dot={false} />
+              </LineChart>
+            </ResponsiveContainer>
+          </div>
+        )}
+
+        {tracker.change_24h_pct != null && (
+          <p className={`text-sm mb-2 ${getPriceChangeColor(tracker.change_24h_pct)}`}>
+            24h: {tracker.change_24h_pct > 0 ? '+' : ''}{tracker.change_24h_pct}%
+            {tracker.min_price != null && (
+              <span className="text-gray-500 ml-2">
+                Range: {formatPrice(tracker.min_price)} – {formatPrice(tracker.max_price)}
+              </span>
+            )}
+          </p>
+        )}
+
         {tracker.last_checked_at && (
           <p className="text-gray-600 text-xs mb-4">
             Last checked: {formatDate(tracker.last_checked_at)}
@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react'
 import { useAuth } from '../context/AuthContext'
-import { trackerApi } from '../api/endpoints'
+import { trackerApi, openPriceStream } from '../api/endpoints'
 import TrackerCard from '../components/TrackerCard'
 import AddTrackerModal from '../components/AddTrackerModal'
 
@@ -15,10 +15,26 @@ export default function DashboardPage() {
     fetchTrackers()
   }, [])
 
+  // Apply live price changes pushed by the backend instead of polling
+  useEffect(() => {
+    const stream = openPriceStream()
+    stream.addEventListener('price', (event) => {
+      const update = JSON.parse(event.data)
+      setTrackers((current) =>
+        current.map((t) =>
+          t.id === update.tracker_id
+            ? { ...t, last_price: update.price, last_checked_at: update.checked_at }
+            : t
+        )
+      )
+    })
+    return () => stream.close()
+  }, [])
+
   const fetchTrackers = async () => {
     try {
       setLoading(true)
-      const response = await trackerApi.getAll()
+      const response = await trackerApi.getDashboard()
       setTrackers(response.data)
     } catch (err) {
       setError('Failed to load trackers')